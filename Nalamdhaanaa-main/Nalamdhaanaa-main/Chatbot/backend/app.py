@@ -1,128 +1,597 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import joblib
+import hmac
 import os
-import numpy as np
+import time
+
+from batching import BatchTimeoutError, MicroBatcher
+from fact_checks import FactCheckMatcher, validate_record
+from metrics import Metrics
+from ml import json_codec
+from ml.incremental import incremental_scorer
+from ml.predict import get_model_manager, model_stages, model_stop_words, validate_input
+from ml.ranking import top_k_indices
+from prediction_cache import PredictionCache
+from profiling import SamplingProfiler, size_bucket
+from sessions import SessionStore
+from structured_log import StructuredLogger
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() and request.get_json() through orjson (installed when FAST_JSON)"""
+
+    def dumps(self, obj, **kwargs):
+        return json_codec.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_codec.dumps(obj), mimetype=self.mimetype)
 
 app = Flask(__name__)
+if json_codec.FAST_JSON:
+    app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
-# Load trained model pipeline
-MODEL_PATH = "../symptom_classifier.pkl"
-model = joblib.load(MODEL_PATH)
-
-def get_specialty(condition_name):
-    # Simple keyword-based specialty mapping (expand as needed)
-    specialty_mapping = {
-    # Skin related
-    "skin": "Dermatologist",
-    "acne": "Dermatologist",
-    "rash": "Dermatologist",
-    "rashes": "Dermatologist",
-    "sores": "Dermatologist",
-    "psoriasis": "Dermatologist",
-    "impetigo": "Dermatologist",
-    "fungal": "Dermatologist",
-
-    # Respiratory
-    "cough": "Pulmonologist",
-    "asthma": "Pulmonologist",
-    "breathing": "Pulmonologist",
-    "throat": "ENT (Otolaryngologist)",
-    "chest": "Pulmonologist / Cardiologist",
-
-    # Pain related/general
-    "pain": "General Physician / Pain Management",
-    "joint": "Rheumatologist / Orthopedist",
-    "headache": "Neurologist",
-    "migraine": "Neurologist",
-    "stomach": "Gastroenterologist",
-    "abdominal": "Gastroenterologist",
-
-    # Vascular
-    "legs": "Vascular Surgeon / General Physician",
-    "varicose": "Vascular Surgeon",
-
-    # Urinary
-    "pee": "Urologist",
-    "urinary": "Urologist",
-    "kidney": "Nephrologist",
-
-    # Infectious/fever related
-    "fever": "General Physician / Infectious Disease",
-    "infection": "Infectious Disease",
-
-    # Endocrine/metabolic
-    "diabetes": "Endocrinologist",
-    "thyroid": "Endocrinologist",
-
-    # Mental health
-    "anxiety": "Psychiatrist",
-    "depression": "Psychiatrist",
-
-    # Blood
-    "jaundice": "Hepatologist / Gastroenterologist",
-    "blood": "Hematologist",
-
-    # Others
-    "drug": "Pharmacist / Toxicologist",
-    "allergy": "Allergist / Immunologist"
-}
-
-    condition_lower = condition_name.lower()
-    for keyword, specialty in specialty_mapping.items():
-        if keyword in condition_lower:
-            return specialty
-    return "General Physician"
+# Seconds between checks of the model files for changes; 0 disables the watcher
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+
+# Shared secret for /api/admin/* (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Number of conditions returned per prediction
+TOP_N = 3
+
+# Upper bound on texts accepted by the batch endpoint in one request
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "256"))
+
+# Opt-in micro-batching of concurrent single predictions
+MICRO_BATCH_ENABLED = os.environ.get("MICRO_BATCH_ENABLED", "").lower() in ("1", "true", "yes")
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", "5"))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "32"))
+# A request waits at most the window plus this long for its batch, then gets a 503
+MICRO_BATCH_INFERENCE_BUDGET_MS = float(os.environ.get("MICRO_BATCH_INFERENCE_BUDGET_MS", "1000"))
+
+batcher = MicroBatcher(
+    MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_INFERENCE_BUDGET_MS
+) if MICRO_BATCH_ENABLED else None
+
+# Per-stage timers, request counters and GET /metrics (Prometheus text).
+# On by default; METRICS_ENABLED=0 makes every recording call a no-op.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+
+metrics = Metrics(enabled=METRICS_ENABLED)
+
+if metrics.enabled:
+    @app.before_request
+    def start_request_clock():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - started)
+        return response
+
+# JSON-lines request log written by a background thread; symptom text is
+# logged as a keyed hash (LOG_INPUTS=hash), its length only (redact) or as
+# is (raw, local debugging only). Records are dropped, not waited for, when
+# the log pipe backs up.
+log = StructuredLogger(
+    "symptom-api",
+    level=os.environ.get("LOG_LEVEL", "info").lower(),
+    sample_rate=float(os.environ.get("LOG_SAMPLE_RATE", "1")),
+    inputs=os.environ.get("LOG_INPUTS", "hash").lower(),
+    hash_key=os.environ.get("LOG_HASH_KEY", ""),
+    queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+)
+
+# Opt-in sampling profiler: a fraction of requests (PROFILE_SAMPLE_RATE), or
+# those sending X-Profile: <PROFILE_TOKEN>, have their stacks sampled every
+# PROFILE_INTERVAL_MS. Collapsed stacks are served by GET /api/admin/profile
+# and, with PROFILE_DUMP_PATH set, written to that file periodically.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DUMP_PATH = os.environ.get("PROFILE_DUMP_PATH", "")
+PROFILE_DUMP_INTERVAL = float(os.environ.get("PROFILE_DUMP_INTERVAL", "60"))
+
+profiler = SamplingProfiler(
+    sample_rate=PROFILE_SAMPLE_RATE,
+    interval=PROFILE_INTERVAL_MS / 1000,
+    token=PROFILE_TOKEN,
+    dump_path=PROFILE_DUMP_PATH,
+    dump_interval=PROFILE_DUMP_INTERVAL
+)
+if profiler.enabled:
+    profiler.install(app)
+
+# The live model. Requests read `model_manager.current` once and use that
+# handle throughout, so a reload never mixes two models in one response.
+# The model, its version and its ResponseBuilder (handle.tables) come from
+# ml/predict.py; loading it here means gunicorn's preload does it once.
+model_manager = get_model_manager(watch_interval=MODEL_WATCH_INTERVAL)
+
+
+# The file watcher starts in each serving process on its first request, never
+# in gunicorn's preloading master (see ModelManager)
+if MODEL_WATCH_INTERVAL:
+    @app.before_request
+    def start_model_watcher():
+        model_manager.start_watcher()
+
+# Cache of predictions keyed on normalized symptom text; size 0 disables it.
+# Cleared automatically when a reload swaps in a different model.
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+
+prediction_cache = PredictionCache(
+    maxsize=PREDICTION_CACHE_SIZE,
+    ttl=PREDICTION_CACHE_TTL,
+    version_fn=lambda: model_manager.current.version
+)
+
+# Conversation sessions: requests carrying a session_id are scored on every
+# message of the conversation so far. State is per worker process; clients
+# send the earlier messages as `history` so any worker can rebuild it.
+SESSION_STORE_SIZE = int(os.environ.get("SESSION_STORE_SIZE", "10000"))
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", "1800"))
+SESSION_MAX_TURNS = int(os.environ.get("SESSION_MAX_TURNS", "50"))
+MAX_SESSION_ID_LENGTH = 128
+
+session_store = SessionStore(
+    maxsize=SESSION_STORE_SIZE,
+    idle_ttl=SESSION_IDLE_TTL,
+    max_turns=SESSION_MAX_TURNS
+)
+
+# Health claim fact-checking: claims are matched by TF-IDF cosine similarity
+# against fact_checks.json, analyzed with the model's stop words. Fact checks
+# added through /api/admin/claims are saved to the corpus file, and every
+# worker indexes them when its watcher (each FACT_CHECK_WATCH_INTERVAL
+# seconds) sees the file change.
+FACT_CHECK_CORPUS_PATH = os.environ.get(
+    "FACT_CHECK_CORPUS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fact_checks.json")
+)
+CLAIM_MATCH_THRESHOLD = float(os.environ.get("CLAIM_MATCH_THRESHOLD", "0.45"))
+FACT_CHECK_WATCH_INTERVAL = float(os.environ.get("FACT_CHECK_WATCH_INTERVAL", "5"))
+MAX_CLAIM_LENGTH = 1000
+MAX_CLAIM_MATCHES = 10
+
+fact_checker = FactCheckMatcher.load(
+    FACT_CHECK_CORPUS_PATH,
+    stop_words=model_stop_words(model_manager.current.model),
+    threshold=CLAIM_MATCH_THRESHOLD,
+    watch_interval=FACT_CHECK_WATCH_INTERVAL
+)
+
+if FACT_CHECK_WATCH_INTERVAL:
+    @app.before_request
+    def start_fact_check_watcher():
+        fact_checker.start_watcher()
+
+metrics.add_gauge(
+    "symptom_model_info", "Version of the served model (always 1)",
+    lambda: {(model_manager.current.version,): 1}, ("version",)
+)
+metrics.add_gauge(
+    "symptom_prediction_cache", "Prediction cache size and lifetime counters",
+    lambda: {(key,): value for key, value in prediction_cache.stats().items()
+             if key in ("size", "hits", "misses", "evictions")},
+    ("stat",)
+)
+metrics.add_gauge(
+    "symptom_log_records", "Structured log records written, dropped (queue full) and sampled out",
+    lambda: {(key,): value for key, value in log.stats().items()
+             if key in ("queued", "written", "dropped", "sampled_out", "write_errors")},
+    ("stat",)
+)
+metrics.add_gauge(
+    "symptom_sessions", "Conversation sessions held by this process",
+    lambda: {(): session_store.stats()["sessions"]}
+)
+
+_session_scorer = (None, None)
+
+def get_session_scorer(handle):
+    """Incremental scorer for the handle's model, built once per model version"""
+    global _session_scorer
+    version, scorer = _session_scorer
+    if version != handle.version:
+        scorer = incremental_scorer(handle.model)
+        _session_scorer = (handle.version, scorer)
+    return scorer
+
+def check_admin_token():
+    """Error response for a request without a valid X-Admin-Token, or None"""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled (ADMIN_TOKEN is not set)"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 401
+    return None
+
+def validate_session_id(session_id):
+    """Return an error message for an unusable session id, or None if it is valid"""
+    if not isinstance(session_id, str) or not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+        return f"'session_id' must be a non-empty string of at most {MAX_SESSION_ID_LENGTH} characters"
+    return None
+
+def validate_history(history):
+    """Return an error message for an unusable session history, or None if it is valid"""
+    if not isinstance(history, list):
+        return "'history' must be a list of earlier messages"
+    # Only the turn window is used, so only it is checked
+    for message in history[-SESSION_MAX_TURNS:]:
+        error = validate_input(message)
+        if error:
+            return f"'history': {error}"
+    return None
+
+def json_body(body, status=200):
+    """Response for an already encoded JSON body"""
+    return app.response_class(body, status=status, mimetype="application/json")
 
 @app.route('/api/predict-symptoms', methods=['POST'])
 def predict_symptoms():
+    timer = metrics.timer("predict")
     try:
         data = request.get_json()
+        timer.mark("parse")
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
             
         symptoms = data.get('symptoms', '')
         
-        if not symptoms or len(symptoms.strip()) < 3:
-            return jsonify({"error": "Please provide detailed symptoms (at least 3 characters)"}), 400
+        error = validate_input(symptoms)
+        if error:
+            return jsonify({"error": error}), 400
         
-        print(f"Analyzing symptoms: {symptoms}")  # Debug logging
+        session_id = data.get('session_id')
+        history = data.get('history')
+        if session_id is not None:
+            error = validate_session_id(session_id) or (validate_history(history) if history is not None else None)
+            if error:
+                return jsonify({"error": error}), 400
+        metrics.observe_input("predict", symptoms)
+        profiler.tag(chars=size_bucket(len(symptoms)), session=session_id is not None)
+        timer.mark("validate")
         
-        # Make prediction
-        probs = model.predict_proba([symptoms])[0]
-        classes = model.classes_
-
-        # Get top 3 predictions
-        top_n = 3
-        sorted_indices = np.argsort(probs)[::-1][:top_n]
-
-        results = []
-        for i in sorted_indices:
-            condition = classes[i]
-            confidence = float(probs[i])
-            specialty = get_specialty(condition)
-            results.append({
-                "condition": condition,
-                "confidence": confidence,
-                "specialty": specialty
+        handle = model_manager.current
+        if session_id is not None:
+            # Score the whole conversation: only this message is featurized,
+            # its term counts are added to the session's accumulated ones
+            # (rebuilt from `history` when this worker has not seen them)
+            scorer = get_session_scorer(handle)
+            columns, counts, turns, new_session = session_store.add_turn(
+                session_id, symptoms, handle.version, scorer.term_counts, history
+            )
+            timer.mark("session_update")
+            probs = scorer.predict_proba(columns, counts)
+            timer.mark("predict_proba")
+            top_indices = top_k_indices(probs, TOP_N)
+            timer.mark("top_k")
+            results = handle.tables.predictions(probs, top_indices)
+            timer.mark("build")
+            metrics.observe_prediction(results)
+
+            log.info(
+                "prediction", **log.input_fields(symptoms), session=True, turns=turns,
+                top_condition=results[0]["condition"], confidence=results[0]["confidence"]
+            )
+            timer.skip()
+
+            body = handle.tables.render(symptoms, results, {
+                "model_version": handle.version,
+                "session_id": session_id,
+                "turns": turns,
+                "new_session": new_session
             })
+            timer.mark("serialize")
+            return json_body(body)
+
+        results = prediction_cache.get(symptoms, handle.version)
+        cached = results is not None
+        timer.mark("cache_lookup")
+        if not cached:
+            # Make prediction (coalesced with concurrent requests when micro-batching is on)
+            if batcher is not None:
+                probs = batcher.predict_proba(handle.model, symptoms)
+                timer.mark("micro_batch")
+            else:
+                transform, classify = model_stages(handle.model)
+                features = transform([symptoms])
+                timer.mark("transform")
+                probs = classify(features)[0]
+                timer.mark("predict_proba")
 
-        print(f"Predictions: {results}")  # Debug logging
+            # Get top 3 predictions
+            top_indices = top_k_indices(probs, TOP_N)
+            timer.mark("top_k")
+            results = handle.tables.predictions(probs, top_indices)
+            prediction_cache.put(symptoms, results, handle.version)
+            timer.mark("build")
+        metrics.observe_prediction(results)
+
+        log.info(
+            "prediction", **log.input_fields(symptoms), cached=cached,
+            top_condition=results[0]["condition"], confidence=results[0]["confidence"]
+        )
+        timer.skip()
         
-        return jsonify({
-            "input": symptoms,
-            "predictions": results
-        }), 200
+        # Severity, disclaimer and model info are added from pre-encoded JSON
+        body = handle.tables.render(symptoms, results, {"model_version": handle.version})
+        timer.mark("serialize")
+        return json_body(body)
         
+    except BatchTimeoutError as e:
+        log.error("prediction_timed_out", error=str(e))
+        return jsonify({"error": "Prediction service is busy, please retry"}), 503
+
     except Exception as e:
-        print(f"Error in predict_symptoms: {str(e)}")  # Debug logging
+        log.error("prediction_failed", error=str(e), error_type=type(e).__name__)
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
+@app.route('/api/predict-symptoms/batch', methods=['POST'])
+def predict_symptoms_batch():
+    """
+    Predict conditions for many symptom texts in one call.
+
+    Expects: {"symptoms": ["text", ...]}
+    Returns: one result per input, in input order, each the full response
+    of /api/predict-symptoms plus its "index". Invalid items carry an
+    "error" instead and do not fail the rest of the batch.
+    """
+    timer = metrics.timer("batch")
+    try:
+        data = request.get_json()
+        timer.mark("parse")
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+
+        texts = data.get('symptoms')
+        if not isinstance(texts, list) or not texts:
+            return jsonify({"error": "'symptoms' must be a non-empty list of strings"}), 400
+
+        if len(texts) > MAX_BATCH_SIZE:
+            return jsonify({
+                "error": f"Batch too large: {len(texts)} items (maximum {MAX_BATCH_SIZE})"
+            }), 413
+
+        handle = model_manager.current
+        builder = handle.tables
+        results = [None] * len(texts)
+        uncached_positions = []
+        for position, text in enumerate(texts):
+            error = validate_input(text)
+            if error:
+                results[position] = {"index": position, "user_input": text, "error": error}
+                continue
+            metrics.observe_input("batch", text)
+
+            cached = prediction_cache.get(text, handle.version)
+            if cached is not None:
+                results[position] = {"index": position, **builder.build(text, cached)}
+                metrics.observe_prediction(cached)
+            else:
+                uncached_positions.append(position)
+        profiler.tag(
+            items=size_bucket(len(texts)),
+            computed=size_bucket(len(uncached_positions)),
+            chars=size_bucket(sum(len(text) for text in texts if isinstance(text, str)))
+        )
+        timer.mark("validate_and_cache_lookup")
+
+        if uncached_positions:
+            # One vectorized TF-IDF transform and predict_proba for the whole batch
+            transform, classify = model_stages(handle.model)
+            features = transform([texts[p] for p in uncached_positions])
+            timer.mark("transform")
+            probs = classify(features)
+            timer.mark("predict_proba")
+            top_indices = top_k_indices(probs, TOP_N)
+            timer.mark("top_k")
+
+            for row, position in enumerate(uncached_positions):
+                predictions = builder.predictions(probs[row], top_indices[row])
+                prediction_cache.put(texts[position], predictions, handle.version)
+                results[position] = {"index": position, **builder.build(texts[position], predictions)}
+                metrics.observe_prediction(predictions)
+            timer.mark("build")
+
+        log.info("batch_prediction", items=len(texts), computed=len(uncached_positions))
+        timer.skip()
+
+        response = jsonify({
+            "count": len(results),
+            "results": results,
+            "model_version": handle.version
+        })
+        timer.mark("serialize")
+        return response, 200
+
+    except Exception as e:
+        log.error("batch_prediction_failed", error=str(e), error_type=type(e).__name__)
+        return jsonify({"error": f"Batch prediction failed: {str(e)}"}), 500
+
+@app.route('/api/claims/check', methods=['POST'])
+def check_claim():
+    """
+    Fact-check a health claim against the fact-check corpus.
+
+    Expects: {"claim": "text", "top_k": 3}
+    Returns: the best matching fact check (verdict, source, similarity as a
+    percentage, ...) with up to top_k matching fact checks under "matches";
+    verdict UNVERIFIED when nothing reaches CLAIM_MATCH_THRESHOLD.
+    """
+    timer = metrics.timer("claims")
+    data = request.get_json(silent=True)
+    timer.mark("parse")
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "No JSON data provided"}), 400
+
+    claim = data.get('claim')
+    if not isinstance(claim, str) or not claim.strip():
+        return jsonify({"error": "'claim' must be a non-empty string"}), 400
+    if len(claim) > MAX_CLAIM_LENGTH:
+        return jsonify({"error": f"Claim too long (maximum {MAX_CLAIM_LENGTH} characters)"}), 400
+    top_k = data.get('top_k', 3)
+    if not isinstance(top_k, int) or isinstance(top_k, bool) or not 1 <= top_k <= MAX_CLAIM_MATCHES:
+        return jsonify({"error": f"'top_k' must be an integer from 1 to {MAX_CLAIM_MATCHES}"}), 400
+
+    result = fact_checker.check(claim.strip(), top_k)
+    timer.mark("match")
+    response = jsonify(result)
+    timer.mark("serialize")
+    return response, 200
+
+@app.route('/api/claims/stats', methods=['GET'])
+def claims_stats():
+    """Corpus size, match counters and index layout of the claim matcher"""
+    return jsonify(fact_checker.stats()), 200
+
+@app.route('/api/batcher/stats', methods=['GET'])
+def batcher_stats():
+    """Queue depth and batch size histograms of the micro-batching layer"""
+    if batcher is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **batcher.stats()}), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Size and hit/miss counters of the prediction cache"""
+    return jsonify(prediction_cache.stats()), 200
+
+@app.route('/api/log/stats', methods=['GET'])
+def log_stats():
+    """Settings and written/dropped/sampled-out counters of the request log"""
+    return jsonify(log.stats()), 200
+
+@app.route('/api/session/<session_id>', methods=['DELETE'])
+def reset_session(session_id):
+    """Forget a conversation, e.g. when the user starts a new chat"""
+    return jsonify({"session_id": session_id, "deleted": session_store.reset(session_id)}), 200
+
+@app.route('/api/sessions/stats', methods=['GET'])
+def sessions_stats():
+    """Size and counters of the conversation session store"""
+    return jsonify(session_store.stats()), 200
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Reload the model from disk without restarting. The new model is
+    validated before it replaces the old one; on failure the old one keeps
+    serving. Add ?wait=1 to block until the reload has finished.
+
+    Under gunicorn this reaches one worker only; use MODEL_WATCH_INTERVAL
+    to have every worker pick up a new model.
+    """
+    error = check_admin_token()
+    if error:
+        return error
+
+    wait = request.args.get("wait", "").lower() in ("1", "true", "yes")
+    result = model_manager.reload(wait=wait)
+    status_code = 500 if result["status"] == "failed" else (200 if wait else 202)
+    return jsonify({**result, "model": model_manager.status()}), status_code
+
+@app.route('/api/admin/claims', methods=['POST'])
+def admin_add_claims():
+    """
+    Add fact checks to the claim matcher without a restart. They are saved
+    to FACT_CHECK_CORPUS_PATH and searchable in this worker when this
+    returns; other workers index them within FACT_CHECK_WATCH_INTERVAL
+    seconds (or after a restart, with watching disabled).
+
+    Expects: {"fact_checks": [{"claim", "variants", "verdict", ...}, ...]},
+    records shaped like those of fact_checks.json.
+    """
+    error = check_admin_token()
+    if error:
+        return error
+
+    data = request.get_json(silent=True)
+    records = data.get('fact_checks') if isinstance(data, dict) else None
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "'fact_checks' must be a non-empty list"}), 400
+    if len(records) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Too many fact checks: {len(records)} (maximum {MAX_BATCH_SIZE})"}), 413
+    for position, record in enumerate(records):
+        error = validate_record(record)
+        if error:
+            return jsonify({"error": f"fact_checks[{position}]: {error}"}), 400
+
+    try:
+        documents = fact_checker.append(records)
+    except (OSError, ValueError) as e:
+        log.error("fact_checks_save_failed", error=str(e), error_type=type(e).__name__)
+        return jsonify({"error": f"Could not save fact checks: {e}"}), 500
+    log.info("fact_checks_added", records=len(records), documents=documents)
+    return jsonify({"added": len(records), "documents": documents, "claims": fact_checker.stats()}), 200
+
+@app.route('/api/admin/profile', methods=['GET'])
+def admin_profile():
+    """
+    Stacks sampled from profiled requests, in the collapsed format read by
+    flamegraph.pl and speedscope (one line per route, tags and stack, with
+    its sample count). ?route=/api/predict-symptoms keeps one route,
+    ?format=json returns per-tag request counts instead, ?reset=1 clears
+    the samples after reading them.
+
+    Samples are per worker process; see PROFILE_DUMP_PATH to collect them
+    from every worker.
+    """
+    error = check_admin_token()
+    if error:
+        return error
+    if not profiler.enabled:
+        return jsonify({"error": "Profiling is disabled (set PROFILE_SAMPLE_RATE or PROFILE_TOKEN)"}), 404
+
+    if request.args.get("format") == "json":
+        response = jsonify(profiler.stats())
+    else:
+        response = app.response_class(profiler.collapsed(request.args.get("route")), mimetype="text/plain")
+    if request.args.get("reset", "").lower() in ("1", "true", "yes"):
+        profiler.reset()
+    return response
+
+@app.route('/api/model', methods=['GET'])
+def model_status():
+    """Version of the served model and reload counters"""
+    return jsonify(model_manager.status()), 200
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Simple health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Custom chatbot API is running"}), 200
+    """
+    Readiness check: 200 once a model is loaded and has served its warm-up
+    prediction (every model does before it goes live), 503 otherwise.
+    """
+    handle = model_manager.current
+    loaded = handle is not None
+    warmup_seconds = handle.tables.warmup_seconds if loaded else None
+    ready = loaded and warmup_seconds is not None
+    return jsonify({
+        "status": "healthy" if ready else "unavailable",
+        "ready": ready,
+        "message": "Custom chatbot API is running" if ready else "Model is not loaded yet",
+        "model_loaded": loaded,
+        "warmed_up": warmup_seconds is not None,
+        "warmup_ms": round(warmup_seconds * 1000, 3) if warmup_seconds is not None else None,
+        "model_version": handle.version if loaded else None,
+        "model_loaded_at": handle.loaded_at if loaded else None
+    }), 200 if ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request counters and stage latency histograms in the Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled (METRICS_ENABLED=0)"}), 404
+    return app.response_class(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,197 @@
+# backend/batching.py
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class BatchTimeoutError(Exception):
+    """A queued prediction was not answered within the batcher's timeout"""
+
+
+class PowerOfTwoHistogram:
+    """Counts observations in buckets bounded by 1, 2, 4, 8, ... up to a cap"""
+
+    def __init__(self, max_value):
+        self.bounds = [1]
+        while self.bounds[-1] < max_value:
+            self.bounds.append(self.bounds[-1] * 2)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "buckets": buckets,
+            "count": self.total,
+            "mean": (self.sum / self.total) if self.total else 0.0
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-text predictions into batched predict_proba calls.
+
+    Each request is queued and waits at most `window_ms` for other requests to
+    join it; the batch is flushed early once `max_batch_size` items are queued.
+    A single background thread runs one predict_proba per batch and resolves
+    every waiting request with its own probability row.
+
+    Items carry the model they should be scored with, so a batch that spans a
+    model swap is split per model and each request stays on the model it saw.
+
+    The worker thread is started lazily by the first submit in each process,
+    so a batcher created before a pre-fork server forks still works in every
+    worker, and restarted if it has died.
+
+    A request waits at most the window plus `inference_budget_ms` for its
+    result; past that, predict_proba raises BatchTimeoutError and the
+    request is dropped from the queue if it has not been picked up yet.
+    """
+
+    def __init__(self, window_ms=5.0, max_batch_size=32, inference_budget_ms=1000.0):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.timeout = self.window + inference_budget_ms / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+
+        self._batch_sizes = PowerOfTwoHistogram(self.max_batch_size)
+        self._queue_depths = PowerOfTwoHistogram(self.max_batch_size * 4)
+        self._max_queue_depth = 0
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._restarts = 0
+
+        self._worker = None
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._stats_lock:
+            if self._worker_pid == os.getpid():
+                if self._worker.is_alive():
+                    return
+                # Died on an unexpected error; queued requests are kept for the new one
+                self._restarts += 1
+            else:
+                # Threads do not survive fork: drop the parent's queue and start our own worker
+                self._queue = deque()
+                self._cond = threading.Condition()
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def submit(self, model, text):
+        """Queue one text for prediction and return a Future for its probability row"""
+        self._ensure_worker()
+        future = Future()
+        with self._cond:
+            self._queue.append((model, text, future, time.monotonic()))
+            depth = len(self._queue)
+            self._cond.notify()
+
+        with self._stats_lock:
+            self._queue_depths.observe(depth)
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+        return future
+
+    def predict_proba(self, model, text, timeout=None):
+        """
+        Blocking helper: class probabilities for a single text. Raises
+        BatchTimeoutError after `timeout` seconds (default: self.timeout).
+        """
+        future = self.submit(model, text)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            # Not picked up yet: the worker skips cancelled requests
+            future.cancel()
+            with self._stats_lock:
+                self._timeouts += 1
+            raise BatchTimeoutError(f"No prediction within {self.timeout if timeout is None else timeout:.3f}s") from None
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # The window starts when the oldest queued request arrived
+            deadline = self._queue[0][3] + self.window
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            # Drop requests whose callers have given up (timed out and cancelled)
+            batch = [item for item in self._next_batch() if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            # Group by model identity, preserving arrival order within a group
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+
+            for items in groups.values():
+                model = items[0][0]
+                try:
+                    probs = model.predict_proba([text for _, text, _, _ in items])
+                except Exception as e:
+                    for _, _, future, _ in items:
+                        future.set_exception(e)
+                    with self._stats_lock:
+                        self._errors += 1
+                    continue
+
+                for row, (_, _, future, _) in enumerate(items):
+                    future.set_result(probs[row])
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes.observe(len(batch))
+
+    def stats(self):
+        """Queue depth and batch size distributions for latency/throughput tuning"""
+        with self._cond:
+            current_depth = len(self._queue)
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": current_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "errors": self._errors,
+                "timeout_ms": self.timeout * 1000.0,
+                "timeouts": self._timeouts,
+                "worker_restarts": self._restarts,
+                "batch_size_histogram": self._batch_sizes.snapshot(),
+                "queue_depth_histogram": self._queue_depths.snapshot()
+            }
@@ -0,0 +1,226 @@
+# backend/benchmarks/bench_claims.py
+# Run from the backend directory: python -m benchmarks.bench_claims [--sizes 1000,10000,100000,1000000]
+"""
+Benchmark the claim similarity index (ml/claim_index.py) on synthetic
+claim corpora of 1k to 1M claims.
+
+Claims are 6-16 words drawn from a Zipfian vocabulary: the words of
+Symptom2Disease.csv and fact_checks.json first, then synthetic ones, so a
+few hundred common words appear everywhere and most words are rare, as in
+real text. Queries are corpus claims with about a third of their words
+dropped and one or two random words added. Reported as JSON per size:
+  * build:   seconds to index the corpus, index size, vocabulary
+  * query:   p50/p99/mean latency of top-5 search, before and after a
+             batch of incremental adds (searched through the delta index)
+  * recall:  share of queries whose best match is the claim they came from
+  * add:     p50/p99 latency of adding one claim, and the time of the merge
+             that folds the added claims into the main index
+  * brute_force: the same queries through a TfidfVectorizer matrix
+             product over every claim (up to --brute-force-max claims), and
+             whether its top-5 similarities equal the index's
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from ml.claim_index import TOKEN_PATTERN, ClaimIndex
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BACKEND_DIR, "..")
+DATASET_PATH = os.path.join(CHATBOT_DIR, "Symptom2Disease.csv")
+FACT_CHECKS_PATH = os.path.join(CHATBOT_DIR, "fact_checks.json")
+
+VOCABULARY_SIZE = 200000
+ZIPF_EXPONENT = 1.1
+
+
+def base_words():
+    """Distinct words of the real texts, most frequent first"""
+    counts = {}
+    with open(DATASET_PATH, newline="", encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    with open(FACT_CHECKS_PATH, encoding="utf-8") as f:
+        for record in json.load(f):
+            texts.append(record["claim"])
+            texts.extend(record.get("variants", ()))
+    for text in texts:
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            counts[word] = counts.get(word, 0) + 1
+    return sorted(counts, key=lambda word: -counts[word])
+
+
+class ClaimGenerator:
+    def __init__(self, seed=42):
+        self.rng = np.random.default_rng(seed)
+        words = base_words()
+        words += [f"w{number}x" for number in range(VOCABULARY_SIZE - len(words))]
+        self.words = np.array(words)
+        weights = 1.0 / np.arange(1, len(words) + 1) ** ZIPF_EXPONENT
+        self.cumulative = np.cumsum(weights / weights.sum())
+
+    def sample_words(self, count):
+        return self.words[np.searchsorted(self.cumulative, self.rng.random(count))]
+
+    def claims(self, count):
+        lengths = self.rng.integers(6, 17, size=count)
+        words = self.sample_words(int(lengths.sum())).tolist()
+        claims, start = [], 0
+        for length in lengths.tolist():
+            claims.append(" ".join(words[start:start + length]))
+            start += length
+        return claims
+
+    def perturb(self, claim):
+        """Drop about a third of the words, add one or two random ones"""
+        words = [word for word in claim.split() if self.rng.random() >= 0.33] or claim.split()[:1]
+        words.extend(self.sample_words(int(self.rng.integers(1, 3))).tolist())
+        self.rng.shuffle(words)
+        return " ".join(words)
+
+
+def percentiles(seconds):
+    values = np.asarray(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "mean_ms": round(float(values.mean()), 4)
+    }
+
+
+def time_queries(index, queries, k=5):
+    timings, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query, k=k))
+        timings.append(time.perf_counter() - started)
+    return timings, results
+
+
+def recall_at_1(results, sources, corpus):
+    """Best match is the source claim (or a duplicate of its text)"""
+    hits = 0
+    for hits_of_query, source in zip(results, sources):
+        if hits_of_query and corpus[hits_of_query[0][0]] == corpus[source]:
+            hits += 1
+    return round(hits / len(sources), 4)
+
+
+def brute_force(corpus, queries, results, stop_words):
+    """Exhaustive TfidfVectorizer cosine over every claim; compares top-5 similarities"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    started = time.perf_counter()
+    vectorizer = TfidfVectorizer(stop_words=list(stop_words) or None)
+    matrix = vectorizer.fit_transform(corpus)
+    build_seconds = time.perf_counter() - started
+
+    timings, max_difference = [], 0.0
+    for query, indexed in zip(queries, results):
+        started = time.perf_counter()
+        scores = (matrix @ vectorizer.transform([query]).T).toarray().ravel()
+        top = np.argsort(-scores)[:5]
+        timings.append(time.perf_counter() - started)
+
+        expected = [float(score) for score in scores[top] if score > 0]
+        found = [similarity for _, similarity in indexed]
+        if len(expected) != len(found):
+            max_difference = float("inf")
+        elif expected:
+            max_difference = max(max_difference, float(np.max(np.abs(np.subtract(expected, found)))))
+    return {
+        "build_s": round(build_seconds, 3),
+        "query": percentiles(timings),
+        "max_similarity_difference": max_difference,
+        "top5_similarities_match": max_difference < 1e-5
+    }
+
+
+def run_size(generator, size, args, stop_words):
+    corpus = generator.claims(size)
+    rng = random.Random(size)
+    sources = [rng.randrange(size) for _ in range(args.queries)]
+    queries = [generator.perturb(corpus[source]) for source in sources]
+
+    started = time.perf_counter()
+    index = ClaimIndex(corpus, stop_words=stop_words)
+    build_seconds = time.perf_counter() - started
+    built = index.stats()
+
+    timings, results = time_queries(index, queries)
+    report = {
+        "claims": size,
+        "build": {
+            "seconds": round(build_seconds, 3),
+            "terms": built["terms"],
+            "postings": built["postings"],
+            "index_mb": built["index_mb"]
+        },
+        "query": percentiles(timings),
+        "recall_at_1": recall_at_1(results, sources, corpus)
+    }
+
+    if size <= args.brute_force_max:
+        report["brute_force"] = brute_force(corpus, queries, results, stop_words)
+
+    # One claim per add() call, as the admin endpoint sees them; stays below
+    # the merge threshold so every add lands in the delta index
+    added = generator.claims(min(args.adds, max(index.min_merge, int(index.merge_ratio * size)) - 1))
+    add_timings = []
+    for claim in added:
+        started = time.perf_counter()
+        index.add([claim])
+        add_timings.append(time.perf_counter() - started)
+    delta_queries = queries + [generator.perturb(claim) for claim in added[:args.queries // 10]]
+    delta_timings, _ = time_queries(index, delta_queries)
+
+    started = time.perf_counter()
+    index.merge(refit=False)
+    merge_seconds = time.perf_counter() - started
+    merged_timings, _ = time_queries(index, queries)
+
+    report["add"] = {
+        "claims": len(added),
+        **percentiles(add_timings),
+        "query_with_delta": percentiles(delta_timings),
+        "merge_s": round(merge_seconds, 3),
+        "query_after_merge": percentiles(merged_timings)
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the claim similarity index")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--adds", type=int, default=1000)
+    parser.add_argument("--brute-force-max", type=int, default=100000,
+                        help="largest corpus also searched exhaustively with sklearn")
+    parser.add_argument("--no-stop-words", action="store_true",
+                        help="keep English stop words (the service removes the model's)")
+    args = parser.parse_args()
+
+    if args.no_stop_words:
+        stop_words = frozenset()
+    else:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        stop_words = ENGLISH_STOP_WORDS
+
+    generator = ClaimGenerator()
+    report = {"sizes": []}
+    for size in (int(size) for size in args.sizes.split(",")):
+        report["sizes"].append(run_size(generator, size, args, stop_words))
+        print(f"{size} claims done", file=sys.stderr)
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
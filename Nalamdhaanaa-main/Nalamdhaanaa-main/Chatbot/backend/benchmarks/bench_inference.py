@@ -0,0 +1,275 @@
+# backend/benchmarks/bench_inference.py
+# Run from the backend directory: python -m benchmarks.bench_inference [--engine numpy] [--output report.json]
+"""
+Inference benchmark suite for the symptom classifier service.
+
+Replays the texts of Symptom2Disease.csv, plus synthetic long inputs made
+by joining dataset rows, through two paths:
+  * predict: ml.predict.predict_condition, in process
+  * route:   POST /api/predict-symptoms through the Flask test client
+             (request parsing, validation, prediction, response encoding)
+and reports as JSON:
+  * latency:     p50/p95/p99/mean per path and input set, one request at a time
+  * concurrency: throughput and latency with 1..N threads sharing one process
+  * memory:      resident memory of a fresh process after loading the app,
+                 i.e. one worker (PSS too where /proc reports it)
+  * cold_start:  time to import the app and load the model in a fresh process,
+                 and to serve its first request
+The prediction cache is disabled (unless --cache) so every request runs the
+model. --engine selects the inference engine; the numpy engine serves a
+temporary artifact exported from the pickle unless MODEL_ARTIFACT_DIR is set.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BACKEND_DIR, "..")
+MODEL_PATH = os.path.join(CHATBOT_DIR, "symptom_classifier.pkl")
+DATASET_PATH = os.path.join(CHATBOT_DIR, "Symptom2Disease.csv")
+
+# Synthetic long inputs: dataset rows joined up to about this many characters
+LONG_INPUT_CHARS = (2000, 8000)
+
+COLD_START = """
+import json, os, sys, time
+started = time.perf_counter()
+from app import app, log
+loaded = time.perf_counter()
+client = app.test_client()
+response = client.post("/api/predict-symptoms", json={"symptoms": "I have a red itchy rash on my arms"})
+assert response.status_code == 200, response.status_code
+first = time.perf_counter()
+log.flush()
+print(json.dumps({"import_and_load_s": loaded - started, "first_response_s": first - started}))
+"""
+
+# Peak RSS comes from VmHWM: getrusage's ru_maxrss survives exec on Linux and
+# would report this (larger) benchmark process instead
+MEMORY_PROBE = """
+def status_kb(field, path="/proc/self/status"):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def memory_mb():
+    report = {
+        "rss_mb": status_kb("VmRSS"),
+        "peak_rss_mb": status_kb("VmHWM"),
+        "pss_mb": status_kb("Pss", "/proc/self/smaps_rollup")
+    }
+    return {key: round(value / 1024, 1) if value is not None else None for key, value in report.items()}
+"""
+
+MEMORY = MEMORY_PROBE + """
+import json
+from app import app, log
+
+app.test_client().post("/api/predict-symptoms", json={"symptoms": "I have a red itchy rash on my arms"})
+log.flush()
+print(json.dumps(memory_mb()))
+"""
+
+BASELINE_MEMORY = MEMORY_PROBE + """
+import json
+print(json.dumps(memory_mb()))
+"""
+
+
+def load_texts():
+    with open(DATASET_PATH, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+
+def long_inputs(texts, chars, count, seed=7):
+    """`count` texts of about `chars` characters, each joined from random dataset rows"""
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        parts, length = [], 0
+        while length < chars:
+            part = rng.choice(texts)
+            parts.append(part)
+            length += len(part) + 1
+        inputs.append(" ".join(parts))
+    return inputs
+
+
+def summarize(latencies):
+    """Latency percentiles in milliseconds"""
+    values = np.asarray(latencies) * 1000
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+def sequential(call, inputs):
+    latencies = []
+    for text in inputs:
+        started = time.perf_counter()
+        call(text)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def concurrent(call, inputs, threads, requests):
+    """`requests` calls spread over `threads` threads; throughput and latency"""
+    latencies = [[] for _ in range(threads)]
+
+    def run(worker):
+        local = latencies[worker]
+        for i in range(worker, requests, threads):
+            text = inputs[i % len(inputs)]
+            started = time.perf_counter()
+            call(text)
+            local.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=run, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "threads": threads,
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency": summarize([value for local in latencies for value in local])
+    }
+
+
+def run_script(code, env, runs):
+    """Run `code` in fresh interpreters; per-key medians of the JSON it prints"""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: (round(statistics.median(r[key] for r in results), 4)
+              if results[0][key] is not None else None)
+        for key in results[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark symptom inference latency, throughput, memory and cold start")
+    parser.add_argument("--engine", choices=("sklearn", "numpy"), default=os.environ.get("INFERENCE_ENGINE", "sklearn"))
+    parser.add_argument("--requests", type=int, default=0,
+                        help="requests per latency run (default: every dataset row)")
+    parser.add_argument("--long-inputs", type=int, default=100, help="synthetic inputs per long size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency-requests", type=int, default=1200)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache enabled")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        # Configure the app exactly as a worker would be before importing it
+        env = dict(os.environ, INFERENCE_ENGINE=args.engine)
+        if not args.cache:
+            env["PREDICTION_CACHE_SIZE"] = "0"
+        if args.engine == "numpy" and not env.get("MODEL_ARTIFACT_DIR"):
+            import joblib
+            from ml.artifact import export_artifact
+
+            artifact_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            export_artifact(joblib.load(MODEL_PATH), artifact_dir)
+            env["MODEL_ARTIFACT_DIR"] = artifact_dir
+        os.environ.update(env)
+
+        from app import app, log, model_manager
+        from ml import json_codec
+        from ml.predict import predict_condition
+
+        clients = threading.local()
+
+        def route(text):
+            # One test client per thread, like one connection per client
+            client = getattr(clients, "client", None)
+            if client is None:
+                client = clients.client = app.test_client()
+            response = client.post("/api/predict-symptoms", json={"symptoms": text})
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/predict-symptoms returned {response.status_code}")
+            return response.data
+
+        paths = {"predict": predict_condition, "route": route}
+
+        texts = load_texts()
+        input_sets = {"dataset": texts[:args.requests] if args.requests else texts}
+        for chars in LONG_INPUT_CHARS:
+            input_sets[f"long_{chars}"] = long_inputs(texts, chars, args.long_inputs)
+
+        report = {
+            "engine": args.engine,
+            "model_version": model_manager.current.version,
+            "prediction_cache": args.cache,
+            "fast_json": json_codec.FAST_JSON,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "inputs": {
+                name: {"count": len(inputs), "mean_chars": round(statistics.mean(map(len, inputs)))}
+                for name, inputs in input_sets.items()
+            },
+            "latency": {},
+            "concurrency": {}
+        }
+
+        # Requests are still logged (the enqueue is part of the route), but
+        # the records are discarded instead of mixed into the report
+        log.stream = stack.enter_context(open(os.devnull, "w"))
+        for name, call in paths.items():
+            # Warm up: first-call allocations, lazy imports, CPU caches
+            for text in texts[:50]:
+                call(text)
+            report["latency"][name] = {
+                input_name: sequential(call, inputs) for input_name, inputs in input_sets.items()
+            }
+            report["concurrency"][name] = [
+                concurrent(call, input_sets["dataset"], threads, args.concurrency_requests)
+                for threads in args.concurrency
+            ]
+        report["log"] = log.stats()
+
+        report["memory"] = {
+            "interpreter": run_script(BASELINE_MEMORY, env, 1),
+            "worker": run_script(MEMORY, env, 1)
+        }
+        report["cold_start_s"] = run_script(COLD_START, env, args.cold_runs)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
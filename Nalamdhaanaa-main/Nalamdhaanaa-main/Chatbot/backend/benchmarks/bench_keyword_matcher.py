@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_keyword_matcher.py
+# Run from the backend directory: python -m benchmarks.bench_keyword_matcher
+"""
+Compare the precompiled triage/specialty matchers with the original
+per-call keyword scans on inputs from 10 to 10k characters, after
+checking that both return identical results.
+"""
+import json
+import random
+import sys
+import timeit
+
+from ml import triage
+
+
+# === ORIGINAL IMPLEMENTATIONS (reference for parity and timing) ===
+def legacy_emergency_level(condition_name, user_text, confidence):
+    level_1_keywords = list(triage.LEVEL_1_KEYWORDS)
+    level_2_keywords = list(triage.LEVEL_2_KEYWORDS)
+    level_3_keywords = list(triage.LEVEL_3_KEYWORDS)
+    user_lower = user_text.lower()
+    if any(keyword in user_lower for keyword in level_1_keywords):
+        return 1
+    if any(keyword in user_lower for keyword in level_2_keywords):
+        return 2
+    if any(keyword in user_lower or keyword in condition_name.lower()
+           for keyword in level_3_keywords):
+        return 3
+    return 4 if confidence >= 0.6 else 5
+
+
+def legacy_specialty(condition_name):
+    specialty_mapping = dict(triage.SPECIALTY_MAPPING)
+    condition_lower = condition_name.lower()
+    for keyword, specialty in specialty_mapping.items():
+        if keyword in condition_lower:
+            return specialty
+    return "General Physician"
+
+
+FILLER = ("i have had a mild itchy feeling on my arms and some tiredness for a few "
+          "days and my nose is runny and i feel a little off ")
+KEYWORDS = (list(triage.LEVEL_1_KEYWORDS) + list(triage.LEVEL_2_KEYWORDS)
+            + list(triage.LEVEL_3_KEYWORDS) + list(triage.SPECIALTY_MAPPING))
+CONDITIONS = ["Psoriasis", "Migraine", "Urinary tract infection", "Bronchial Asthma",
+              "Common Cold", "Chicken pox", "Dengue", "Arthritis", "Peptic ulcer disease"]
+
+
+def make_text(length, rng, keyword_rate):
+    """Filler text of the given length, optionally sprinkled with keywords"""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(KEYWORDS) if rng.random() < keyword_rate else rng.choice(FILLER.split())
+        words.append(word.upper() if rng.random() < 0.05 else word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def check_parity(rng, samples=5000):
+    for _ in range(samples):
+        text = make_text(rng.choice([10, 40, 120, 400, 2000]), rng, rng.choice([0.0, 0.02, 0.2]))
+        condition = rng.choice(CONDITIONS + KEYWORDS)
+        confidence = rng.random()
+        assert triage.get_emergency_level(condition, text, confidence) == \
+            legacy_emergency_level(condition, text, confidence), (condition, text)
+        assert triage.get_specialty_recommendation(condition) == legacy_specialty(condition), condition
+        assert triage.get_specialty_recommendation(text) == legacy_specialty(text), text
+    return samples
+
+
+def time_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    rng = random.Random(42)
+    results = {"parity_samples": check_parity(rng), "esi": [], "specialty": []}
+
+    for length in (10, 100, 1000, 10000):
+        number = max(20, 200000 // length)
+        for label, rate in (("no_match", 0.0), ("sparse_matches", 0.01)):
+            text = make_text(length, rng, rate)
+            legacy = time_call(lambda: legacy_emergency_level("Common Cold", text, 0.5), number)
+            compiled = time_call(lambda: triage.get_emergency_level("Common Cold", text, 0.5), number)
+            results["esi"].append({
+                "chars": length, "input": label,
+                "legacy_us": legacy * 1e6, "compiled_us": compiled * 1e6,
+                "speedup": legacy / compiled
+            })
+
+    for condition in CONDITIONS:
+        legacy = time_call(lambda: legacy_specialty(condition), 20000)
+        compiled = time_call(lambda: triage.get_specialty_recommendation(condition), 20000)
+        results["specialty"].append({
+            "condition": condition,
+            "legacy_us": legacy * 1e6, "compiled_us": compiled * 1e6,
+            "speedup": legacy / compiled
+        })
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
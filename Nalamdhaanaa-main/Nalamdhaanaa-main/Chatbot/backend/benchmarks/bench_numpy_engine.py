@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_numpy_engine.py
+# Run from the backend directory: python -m benchmarks.bench_numpy_engine
+"""
+Parity and speed of the pure-NumPy engine against the sklearn pipeline.
+
+Exports the pickled model to a temporary artifact and then:
+  * checks predict_proba parity on all rows of Symptom2Disease.csv
+    (fails if probabilities differ by more than 1e-9 or any top class differs)
+  * measures cold start (fresh interpreter: imports + model load) for both
+  * measures single-text predict_proba latency for both
+Results are printed as JSON.
+"""
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from ml.artifact import export_artifact
+from ml.numpy_engine import load_numpy_engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BACKEND_DIR, "..")
+MODEL_PATH = os.path.join(CHATBOT_DIR, "symptom_classifier.pkl")
+DATASET_PATH = os.path.join(CHATBOT_DIR, "Symptom2Disease.csv")
+
+PARITY_TOLERANCE = 1e-9
+
+COLD_START_SKLEARN = """
+import time
+start = time.perf_counter()
+import joblib
+model = joblib.load({model_path!r})
+print(time.perf_counter() - start)
+"""
+
+COLD_START_NUMPY = """
+import time
+start = time.perf_counter()
+from ml.numpy_engine import load_numpy_engine
+engine = load_numpy_engine({artifact_dir!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code, runs=5):
+    """Median wall time of imports + model load in a fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return float(np.median(timings))
+
+
+def latency(predict_proba, texts):
+    timings = []
+    for text in texts:
+        started = time.perf_counter()
+        predict_proba([text])
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1e6
+    return {
+        "mean_us": float(timings.mean()),
+        "p50_us": float(np.percentile(timings, 50)),
+        "p99_us": float(np.percentile(timings, 99))
+    }
+
+
+def main():
+    with open(DATASET_PATH, newline="", encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+
+    model = joblib.load(MODEL_PATH)
+
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        export_artifact(model, artifact_dir)
+        engine = load_numpy_engine(artifact_dir)
+
+        expected = model.predict_proba(texts)
+        actual = engine.predict_proba(texts)
+        max_diff = float(np.abs(expected - actual).max())
+        top_class_mismatches = int((expected.argmax(axis=1) != actual.argmax(axis=1)).sum())
+        if max_diff > PARITY_TOLERANCE or top_class_mismatches:
+            sys.exit(f"Parity check failed: max diff {max_diff}, "
+                     f"{top_class_mismatches} top-class mismatches")
+
+        report = {
+            "parity": {
+                "rows": len(texts),
+                "max_abs_diff": max_diff,
+                "top_class_mismatches": top_class_mismatches
+            },
+            "cold_start_s": {
+                "sklearn": cold_start(COLD_START_SKLEARN.format(model_path=MODEL_PATH)),
+                "numpy": cold_start(COLD_START_NUMPY.format(artifact_dir=artifact_dir))
+            },
+            "single_request_latency": {
+                "sklearn": latency(model.predict_proba, texts),
+                "numpy": latency(engine.predict_proba, texts)
+            }
+        }
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_sessions.py
+# Run from the backend directory: python -m benchmarks.bench_sessions
+"""
+Cost of a conversation turn: incremental session scoring against
+re-vectorizing the whole history.
+
+Builds conversations of --turns messages from Symptom2Disease.csv rows and
+times each turn two ways:
+  * history: predict_proba on all messages so far joined into one text
+  * session: SessionStore.add_turn (featurize the new message, merge its
+    counts) + predict_proba from the accumulated counts
+for both the sklearn pipeline and the NumPy engine. The session scores
+must match scoring the per-message counts summed from scratch (1e-9).
+Results are printed as JSON (mean microseconds per turn by turn number).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from ml.artifact import export_artifact
+from ml.incremental import incremental_scorer, merge_counts
+from ml.numpy_engine import load_numpy_engine
+from sessions import SessionStore
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BACKEND_DIR, "..")
+MODEL_PATH = os.path.join(CHATBOT_DIR, "symptom_classifier.pkl")
+DATASET_PATH = os.path.join(CHATBOT_DIR, "Symptom2Disease.csv")
+
+PARITY_TOLERANCE = 1e-9
+
+
+def run(model, conversations, turns):
+    scorer = incremental_scorer(model)
+    store = SessionStore(maxsize=len(conversations), idle_ttl=0, max_turns=turns)
+    history_us = np.zeros(turns)
+    session_us = np.zeros(turns)
+    max_diff = 0.0
+
+    for number, messages in enumerate(conversations):
+        session_id = f"bench-{number}"
+        for turn in range(turns):
+            started = time.perf_counter()
+            model.predict_proba([" ".join(messages[:turn + 1])])
+            history_us[turn] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            columns, counts, _, _ = store.add_turn(session_id, messages[turn], "bench", scorer.term_counts)
+            probs = scorer.predict_proba(columns, counts)
+            session_us[turn] += time.perf_counter() - started
+
+        expected_columns, expected_counts = np.empty(0, dtype=np.int64), np.empty(0)
+        for message in messages:
+            expected_columns, expected_counts = merge_counts(
+                expected_columns, expected_counts, *scorer.term_counts(message)
+            )
+        expected = scorer.predict_proba(expected_columns, expected_counts)
+        max_diff = max(max_diff, float(np.abs(expected - probs).max()))
+
+    if max_diff > PARITY_TOLERANCE:
+        sys.exit(f"Parity check failed: max diff {max_diff}")
+
+    scale = 1e6 / len(conversations)
+    return {
+        "max_abs_diff": max_diff,
+        "history_us_by_turn": [round(value * scale, 1) for value in history_us],
+        "session_us_by_turn": [round(value * scale, 1) for value in session_us]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental session scoring")
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    with open(DATASET_PATH, newline="", encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    conversations = [
+        [texts[(number * args.turns + turn) % len(texts)] for turn in range(args.turns)]
+        for number in range(args.conversations)
+    ]
+
+    model = joblib.load(MODEL_PATH)
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        export_artifact(model, artifact_dir)
+        engine = load_numpy_engine(artifact_dir)
+        report = {
+            "conversations": args.conversations,
+            "turns": args.turns,
+            "sklearn": run(model, conversations, args.turns),
+            "numpy": run(engine, conversations, args.turns)
+        }
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# backend/benchmarks/load_test.py
+# Run from the backend directory: python -m benchmarks.load_test [--workers 1 2 4] [--duration 10]
+"""
+Throughput of the gunicorn production server as the worker count grows.
+
+For each worker count a fresh `gunicorn -c gunicorn.conf.py wsgi:app` is
+started, warmed up, and driven by closed-loop clients (several client
+processes, each with keep-alive connections on threads) replaying texts
+from Symptom2Disease.csv against /api/predict-symptoms. Results are printed
+as JSON.
+"""
+import argparse
+import csv
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(BACKEND_DIR, "..", "Symptom2Disease.csv")
+
+
+def load_texts():
+    with open(DATASET_PATH, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become ready")
+
+
+def client_process(port, texts, connections, duration, offset, queue):
+    """Closed-loop load from one process; reports (requests, errors, latencies)"""
+    latencies = []
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def run(worker_id):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        i = offset + worker_id
+        local = []
+        ok = errors = 0
+        while time.monotonic() < stop_at:
+            body = json.dumps({"symptoms": texts[i % len(texts)]})
+            i += connections
+            started = time.perf_counter()
+            try:
+                conn.request("POST", "/api/predict-symptoms", body=body,
+                             headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    ok += 1
+                else:
+                    errors += 1
+            except OSError:
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            counts["ok"] += ok
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put((counts["ok"], counts["errors"], latencies))
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(port, texts, client_processes, connections, duration):
+    queue = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=client_process,
+            args=(port, texts, connections, duration, p * connections, queue)
+        )
+        for p in range(client_processes)
+    ]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    ok = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    latencies = sorted(l for r in results for l in r[2])
+    return {
+        "requests": ok,
+        "errors": errors,
+        "throughput_rps": ok / duration,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000
+        }
+    }
+
+
+def main():
+    cores = multiprocessing.cpu_count()
+    default_workers = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per run")
+    parser.add_argument("--client-processes", type=int, default=max(1, cores // 2))
+    parser.add_argument("--connections", type=int, default=8, help="connections per client process")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    texts = load_texts()
+    report = {"cores": cores, "threads_per_worker": args.threads, "runs": []}
+
+    for workers in args.workers:
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers),
+                   GUNICORN_THREADS=str(args.threads), PORT=str(args.port))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(args.port)
+            # Warm every worker before measuring
+            run_load(args.port, texts, 1, workers * 2, 1.0)
+            result = run_load(args.port, texts, args.client_processes, args.connections, args.duration)
+            result["workers"] = workers
+            report["runs"].append(result)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    baseline = report["runs"][0]["throughput_rps"] if report["runs"] else 0
+    for run in report["runs"]:
+        run["scaling_vs_first"] = (run["throughput_rps"] / baseline) if baseline else 0.0
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
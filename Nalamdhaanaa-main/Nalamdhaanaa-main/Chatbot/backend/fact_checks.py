@@ -0,0 +1,244 @@
+# backend/fact_checks.py
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no other worker processes to serialize with
+    fcntl = None
+
+from ml.claim_index import ClaimIndex
+from ml.model_manager import files_fingerprint
+
+VERDICT_ICONS = {"TRUE": "✅", "FALSE": "❌", "MISLEADING": "⚠️", "UNVERIFIED": "❓"}
+VERDICTS = frozenset(VERDICT_ICONS) - {"UNVERIFIED"}
+
+UNVERIFIED_RECOMMENDATION = (
+    "We could not find a close match for this claim in our fact-check database. "
+    "This does not mean the claim is true or false. Please consult a qualified "
+    "healthcare professional and trusted public health websites for more information."
+)
+
+
+def validate_record(record):
+    """Return an error message for an unusable fact-check record, or None"""
+    if not isinstance(record, dict):
+        return "each fact check must be an object"
+    if not isinstance(record.get("claim"), str) or not record["claim"].strip():
+        return "'claim' must be a non-empty string"
+    if record.get("verdict") not in VERDICTS:
+        return f"'verdict' must be one of {', '.join(sorted(VERDICTS))}"
+    variants = record.get("variants", [])
+    if not isinstance(variants, list) or not all(isinstance(v, str) for v in variants):
+        return "'variants' must be a list of strings"
+    return None
+
+
+class FactCheckMatcher:
+    """
+    Matches user claims against a fact-check corpus.
+
+    Each record is indexed under its claim and its `variants` (other
+    phrasings of the same claim), all pointing to the record; a query is
+    answered with the best record whose similarity reaches `threshold`, in
+    the FactCheckResponse shape of the frontend (healthassist/types.ts), or
+    an UNVERIFIED response. Records can be added while serving (see
+    ClaimIndex for how the index absorbs them).
+
+    A matcher loaded from a file keeps it as the shared store: `append()`
+    writes new records to the file, and every process indexes records
+    appended by others when its watcher (`start_watcher()`, every
+    `watch_interval` seconds) sees the file change.
+    """
+
+    def __init__(self, records, stop_words=(), threshold=0.45, path=None, watch_interval=0):
+        self.threshold = threshold
+        self.records = []
+        self._doc_records = []
+        self._lock = threading.Lock()
+
+        self.path = path
+        self.watch_interval = watch_interval
+        self._fingerprint = None
+        self._file_records = 0
+        self._refresh_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+        self.refreshes = 0
+        self.last_error = None
+
+        texts = []
+        for record in records:
+            texts.extend(self._register(record))
+        self.index = ClaimIndex(texts, stop_words=stop_words)
+
+        # check() runs on many request threads at once, outside _lock
+        self._counter_lock = threading.Lock()
+        self.checks = 0
+        self.matched = 0
+
+    @classmethod
+    def load(cls, path, stop_words=(), threshold=0.45, watch_interval=0):
+        fingerprint = files_fingerprint([path])
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        matcher = cls(records, stop_words, threshold, path=path, watch_interval=watch_interval)
+        matcher._fingerprint = fingerprint
+        matcher._file_records = len(records)
+        return matcher
+
+    def _register(self, record):
+        """Store a record; returns the texts to index for it, in document order"""
+        position = len(self.records)
+        self.records.append(record)
+        texts = [record["claim"]] + list(record.get("variants", ()))
+        self._doc_records.extend([position] * len(texts))
+        return texts
+
+    def add(self, records):
+        """Index more fact checks (already validated); returns how many documents were added"""
+        with self._lock:
+            texts = []
+            for record in records:
+                texts.extend(self._register(record))
+            self.index.add(texts)
+        return len(texts)
+
+    def append(self, records):
+        """
+        Save fact checks (already validated) to the corpus file and index
+        them; returns how many documents this process added. Other
+        processes index them on their watcher's next look at the file.
+        """
+        # The lock file serializes writers across processes; readers only
+        # ever see a complete file thanks to the rename
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with open(self.path, encoding="utf-8") as f:
+                corpus = json.load(f)
+            corpus.extend(records)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(corpus, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+            os.replace(temporary, self.path)
+        return self.refresh()
+
+    def refresh(self):
+        """
+        Index the records appended to the corpus file since it was last
+        read; returns how many documents were added. A file that shrank
+        (edited by hand) is left alone: restart the workers to load it.
+        """
+        with self._refresh_lock:
+            try:
+                fingerprint = files_fingerprint([self.path])
+                if fingerprint == self._fingerprint:
+                    return 0
+                with open(self.path, encoding="utf-8") as f:
+                    corpus = json.load(f)
+            except (OSError, ValueError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return 0
+
+            self._fingerprint = fingerprint
+            if len(corpus) < self._file_records:
+                self.last_error = (f"Corpus shrank from {self._file_records} to {len(corpus)} "
+                                   "records; restart to reload it")
+                return 0
+            appended = [record for record in corpus[self._file_records:] if validate_record(record) is None]
+            self._file_records = len(corpus)
+            self.refreshes += 1
+            self.last_error = None
+            return self.add(appended) if appended else 0
+
+    def start_watcher(self):
+        """
+        Start watching the corpus file in this process, once; a no-op when
+        watching is disabled. Call it from serving processes, not a
+        pre-fork master.
+        """
+        if not (self.watch_interval and self.path) or self._watcher_pid == os.getpid():
+            return
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name="fact-check-watcher", daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            self.refresh()
+
+    def _response(self, record, user_claim, similarity):
+        return {
+            "user_claim": user_claim,
+            "matched_claim": record["claim"],
+            "similarity_score": round(similarity * 100, 1),
+            "verdict": record["verdict"],
+            "verdict_icon": VERDICT_ICONS[record["verdict"]],
+            "source": record.get("source", "N/A"),
+            "source_url": record.get("source_url"),
+            "category": record.get("category", "N/A"),
+            "evidence_score": record.get("evidence_score", 0),
+            "recommendation": record.get("recommendation", ""),
+            "date_fact_checked": record.get("date_fact_checked")
+        }
+
+    def check(self, user_claim, top_k=3):
+        """
+        Best fact check for a claim, plus up to `top_k` distinct matching
+        records (best first) under "matches"
+        """
+        with self._counter_lock:
+            self.checks += 1
+        # Several documents can belong to one record; over-fetch, then dedupe
+        hits = self.index.search(user_claim, k=4 * top_k, min_similarity=0.0)
+        matches, seen = [], set()
+        for doc, similarity in hits:
+            position = self._doc_records[doc]
+            if position in seen:
+                continue
+            seen.add(position)
+            if similarity >= self.threshold:
+                matches.append(self._response(self.records[position], user_claim, similarity))
+            if len(seen) == top_k:
+                break
+
+        if not matches:
+            return {
+                "user_claim": user_claim,
+                "matched_claim": None,
+                "similarity_score": round(hits[0][1] * 100, 1) if hits else 0,
+                "verdict": "UNVERIFIED",
+                "verdict_icon": VERDICT_ICONS["UNVERIFIED"],
+                "source": "N/A",
+                "source_url": None,
+                "category": "N/A",
+                "evidence_score": 0,
+                "recommendation": UNVERIFIED_RECOMMENDATION,
+                "date_fact_checked": None,
+                "matches": []
+            }
+        with self._counter_lock:
+            self.matched += 1
+        return {**matches[0], "matches": matches}
+
+    def stats(self):
+        with self._counter_lock:
+            checks, matched = self.checks, self.matched
+        return {
+            "fact_checks": len(self.records),
+            "threshold": self.threshold,
+            "checks": checks,
+            "matched": matched,
+            "corpus_path": self.path,
+            "watch_interval_seconds": self.watch_interval,
+            "refreshes": self.refreshes,
+            "last_error": self.last_error,
+            "index": self.index.stats()
+        }
@@ -0,0 +1,33 @@
+# backend/gunicorn.conf.py
+# Production serving config for the symptom classifier API.
+#
+#   WEB_CONCURRENCY   worker processes (default: number of CPU cores)
+#   GUNICORN_THREADS  threads per worker (default: 2)
+#   PORT              listen port (default: 5000)
+#
+# Inference is CPU-bound and mostly holds the GIL, so throughput scales with
+# worker processes; a couple of threads per worker only overlap socket I/O.
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+keepalive = 5
+
+# Load the app (and the joblib model) once in the master before forking, so
+# workers share the model's memory pages copy-on-write.
+preload_app = True
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")  # e.g. "-" for stdout; off by default
+errorlog = "-"
+
+
+def when_ready(server):
+    # Move everything allocated while preloading into the permanent generation
+    # so the cyclic GC in workers never touches (and copies) those pages.
+    gc.collect()
+    gc.freeze()
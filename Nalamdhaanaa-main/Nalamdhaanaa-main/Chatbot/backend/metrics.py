@@ -0,0 +1,215 @@
+# backend/metrics.py
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; stages of one prediction range from microseconds to tens of ms
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+# Characters of symptom text
+INPUT_LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, Prometheus style"""
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum
+                series = self._series[labelvalues] = [[0] * (len(self.bounds) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labelvalues, (list(counts), total)) for labelvalues, (counts, total) in self._series.items())
+        for labelvalues, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time: `fn()` returns {labelvalues: value}"""
+
+    def __init__(self, name, help_text, fn, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labelvalues, value in sorted(self.fn().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request: each `mark(stage)` records the
+    time since the previous mark (or since the timer was created).
+    """
+
+    __slots__ = ("_histogram", "_endpoint", "_last")
+
+    def __init__(self, histogram, endpoint):
+        self._histogram = histogram
+        self._endpoint = endpoint
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._histogram.observe(now - self._last, self._endpoint, stage)
+        self._last = now
+
+    def skip(self):
+        """Restart the clock without recording (time that belongs to no stage)"""
+        self._last = time.perf_counter()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def skip(self):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Request counters and per-stage latency histograms for the symptom API,
+    rendered in the Prometheus text format by `render()`.
+
+    When disabled every recording call returns immediately and `timer()`
+    hands out a shared no-op timer, so instrumented code pays one method
+    call per stage. Values are per process: under gunicorn each worker
+    keeps and serves its own.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.requests = Counter(
+            "symptom_api_requests_total", "HTTP requests by endpoint and status",
+            ("endpoint", "method", "status")
+        )
+        self.errors = Counter(
+            "symptom_api_errors_total", "Requests answered with a 4xx or 5xx status",
+            ("endpoint", "status")
+        )
+        self.request_seconds = Histogram(
+            "symptom_api_request_duration_seconds", "Time spent handling a request",
+            LATENCY_BUCKETS, ("endpoint",)
+        )
+        self.stage_seconds = Histogram(
+            "symptom_api_stage_duration_seconds", "Time spent in each stage of a prediction",
+            LATENCY_BUCKETS, ("endpoint", "stage")
+        )
+        self.input_chars = Histogram(
+            "symptom_api_input_length_chars", "Length of the symptom texts scored",
+            INPUT_LENGTH_BUCKETS, ("endpoint",)
+        )
+        self.top_class = Counter(
+            "symptom_api_top_class_total", "Predictions by top-ranked condition",
+            ("condition",)
+        )
+        self._collectors = [
+            self.requests, self.errors, self.request_seconds,
+            self.stage_seconds, self.input_chars, self.top_class
+        ]
+
+    def timer(self, endpoint):
+        if not self.enabled:
+            return _NULL_TIMER
+        return StageTimer(self.stage_seconds, endpoint)
+
+    def observe_request(self, endpoint, method, status, seconds):
+        if not self.enabled:
+            return
+        self.requests.inc(endpoint, method, str(status))
+        if status >= 400:
+            self.errors.inc(endpoint, str(status))
+        self.request_seconds.observe(seconds, endpoint)
+
+    def observe_input(self, endpoint, text):
+        if self.enabled:
+            self.input_chars.observe(len(text), endpoint)
+
+    def observe_prediction(self, predictions):
+        if self.enabled and predictions:
+            self.top_class.inc(predictions[0]["condition"])
+
+    def add_gauge(self, name, help_text, fn, labelnames=()):
+        """Export a value computed at scrape time (cache size, model info...)"""
+        self._collectors.append(Gauge(name, help_text, fn, labelnames))
+
+    def render(self):
+        lines = []
+        for collector in self._collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
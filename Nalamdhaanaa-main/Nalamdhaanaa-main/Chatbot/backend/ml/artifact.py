@@ -0,0 +1,171 @@
+# backend/ml/artifact.py
+# Memory-mappable export of the TF-IDF + LogisticRegression pipeline.
+#
+# Layout of an artifact directory:
+#   manifest.json     vectorizer/classifier settings and array shapes
+#   vocab_terms.npy   vocabulary terms, sorted lexicographically (fixed-width unicode)
+#   vocab_index.npy   feature column of each term in vocab_terms (int32)
+#   idf.npy           idf weight per feature column (float64)
+#   coef.npy          LogisticRegression coef_, (n_classes, n_features) (float64)
+#   intercept.npy     LogisticRegression intercept_ (float64)
+#   classes.npy       class labels (fixed-width unicode)
+#
+# Every array is a plain .npy file loaded with mmap_mode="r" and
+# allow_pickle=False: nothing is unpickled and worker processes share the
+# pages through the OS page cache instead of each holding a private copy.
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAY_NAMES = ("vocab_terms", "vocab_index", "idf", "coef", "intercept", "classes")
+
+ModelArtifact = namedtuple("ModelArtifact", ["manifest"] + list(ARRAY_NAMES))
+
+
+def _multi_class_mode(clf):
+    """'multinomial' (softmax) or 'ovr' (per-class sigmoid), as predict_proba applies it"""
+    if len(clf.classes_) <= 2 or clf.solver == "liblinear":
+        return "ovr"
+    if getattr(clf, "multi_class", "auto") == "ovr":
+        return "ovr"
+    return "multinomial"
+
+
+def export_artifact(pipeline, out_dir):
+    """
+    Write the fitted tfidf/clf pipeline to `out_dir` in the mmap layout.
+
+    Every file is written to a temporary name and renamed into place, and
+    the manifest goes last, so a reader that finds a manifest always finds
+    complete arrays next to it. Renaming (rather than overwriting) also
+    leaves arrays already memory-mapped by a running server untouched.
+    """
+    tfidf = pipeline.named_steps["tfidf"]
+    clf = pipeline.named_steps["clf"]
+
+    if tfidf.analyzer != "word" or tfidf.tokenizer is not None or tfidf.preprocessor is not None:
+        raise ValueError("Only the built-in word analyzer can be exported")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    terms = sorted(tfidf.vocabulary_)
+    arrays = {
+        "vocab_terms": np.array(terms, dtype=str),
+        "vocab_index": np.array([tfidf.vocabulary_[t] for t in terms], dtype=np.int32),
+        "idf": np.ascontiguousarray(tfidf.idf_, dtype=np.float64),
+        "coef": np.ascontiguousarray(clf.coef_, dtype=np.float64),
+        "intercept": np.ascontiguousarray(clf.intercept_, dtype=np.float64),
+        "classes": np.array([str(c) for c in clf.classes_], dtype=str),
+    }
+    for name, array in arrays.items():
+        path = os.path.join(out_dir, f"{name}.npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(path + ".tmp", path)
+
+    stop_words = tfidf.get_stop_words()
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "vectorizer": {
+            "lowercase": tfidf.lowercase,
+            "strip_accents": tfidf.strip_accents,
+            "token_pattern": tfidf.token_pattern,
+            "ngram_range": list(tfidf.ngram_range),
+            "stop_words": sorted(stop_words) if stop_words else None,
+            "binary": tfidf.binary,
+            "norm": tfidf.norm,
+            "use_idf": tfidf.use_idf,
+            "smooth_idf": tfidf.smooth_idf,
+            "sublinear_tf": tfidf.sublinear_tf,
+        },
+        "classifier": {
+            "multi_class": _multi_class_mode(clf),
+        },
+        "n_features": int(arrays["idf"].shape[0]),
+        "n_classes": int(arrays["classes"].shape[0]),
+    }
+    tmp_path = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+    return manifest
+
+
+def load_artifact(artifact_dir, mmap=True):
+    """Load manifest and arrays; arrays are read-only memory maps by default"""
+    with open(os.path.join(artifact_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format: {manifest.get('format_version')}")
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(artifact_dir, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in ARRAY_NAMES
+    }
+    return ModelArtifact(manifest=manifest, **arrays)
+
+
+def artifact_files(artifact_dir):
+    """Paths of every file in an artifact, manifest first"""
+    return [os.path.join(artifact_dir, MANIFEST_NAME)] + [
+        os.path.join(artifact_dir, f"{name}.npy") for name in ARRAY_NAMES
+    ]
+
+
+def build_sklearn_pipeline(artifact):
+    """
+    Rebuild an inference-only sklearn Pipeline from a loaded artifact.
+
+    Produces the same predict_proba output as the pipeline that was exported;
+    it cannot be refitted.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    settings = artifact.manifest["vectorizer"]
+    vocabulary = dict(zip(artifact.vocab_terms.tolist(), artifact.vocab_index.tolist()))
+
+    tfidf = TfidfVectorizer(
+        lowercase=settings["lowercase"],
+        strip_accents=settings["strip_accents"],
+        token_pattern=settings["token_pattern"],
+        ngram_range=tuple(settings["ngram_range"]),
+        stop_words=settings["stop_words"],
+        binary=settings["binary"],
+        norm=settings["norm"],
+        use_idf=settings["use_idf"],
+        smooth_idf=settings["smooth_idf"],
+        sublinear_tf=settings["sublinear_tf"],
+        vocabulary=vocabulary,
+    )
+    tfidf.idf_ = artifact.idf
+
+    # liblinear is the one solver sklearn always scores one-vs-rest
+    solver = "liblinear" if artifact.manifest["classifier"]["multi_class"] == "ovr" else "lbfgs"
+    clf = LogisticRegression(solver=solver)
+    clf.classes_ = np.asarray(artifact.classes)
+    clf.coef_ = artifact.coef
+    clf.intercept_ = artifact.intercept
+    clf.n_features_in_ = artifact.coef.shape[1]
+
+    return Pipeline([("tfidf", tfidf), ("clf", clf)])
+
+
+# Export an existing pickled model without retraining:
+#   python -m ml.artifact ../symptom_classifier.pkl ../symptom_classifier_artifact
+if __name__ == "__main__":
+    import sys
+
+    import joblib
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m ml.artifact MODEL_PKL OUT_DIR")
+    manifest = export_artifact(joblib.load(sys.argv[1]), sys.argv[2])
+    print(f"Exported {manifest['n_features']} features x {manifest['n_classes']} classes to {sys.argv[2]}")
@@ -0,0 +1,322 @@
+# backend/ml/claim_index.py
+"""
+TF-IDF cosine-similarity index over a fact-check claim corpus.
+
+Texts are analyzed like the symptom pipeline's TfidfVectorizer (lowercase,
+the default token pattern, stop word removal) and weighted with smoothed
+IDF and L2 normalization. The weighted corpus is stored column-major: for
+each term, the documents containing it and their weights (the CSC layout
+of the document x term matrix). A query only reads the posting lists of
+its own terms, accumulates per-document dot products and selects the top
+k, so its cost follows the length of those lists rather than the corpus
+size; most of the longest lists, of the commonest words, are only probed
+for the documents the others found (see ClaimIndex.search).
+
+Claims added after the build go to a small delta index (per-term Python
+lists) that is searched alongside the main one and folded into it once it
+holds `merge_ratio` of the corpus. IDF is fitted when the main index is
+built; terms first seen in later claims get the IDF of a term no document
+had. Once the corpus has grown by `refit_growth` since the last fit, the
+next merge refits IDF and re-weights every document. Only NumPy is used.
+"""
+import re
+import threading
+import time
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Posting lists at least this long keep their TOP_WEIGHTS largest weights,
+# so a query can bound scores and skip reading some of them (see search())
+PRUNE_MIN_POSTINGS = 2048
+TOP_WEIGHTS = 64
+# Margin on score bounds for the float32 rounding of stored weights
+BOUND_SLACK = 1e-6
+
+
+class _Delta:
+    """Inverted index of the documents added since the last merge"""
+
+    def __init__(self):
+        self.postings = {}
+        self.size = 0
+
+    def add(self, doc, terms, weights):
+        for term, weight in zip(terms.tolist(), weights.tolist()):
+            docs, values = self.postings.setdefault(term, ([], []))
+            docs.append(doc)
+            values.append(weight)
+        self.size += 1
+
+
+class ClaimIndex:
+    """
+    Top-k cosine similarity over a growing set of texts.
+
+    Each text gets a document id (its position: 0, 1, ...). `search(text, k)`
+    returns [(doc, similarity)], best first. As with TfidfVectorizer, query
+    words outside the vocabulary are ignored, so similarities equal those of
+    the sklearn vectors of the same corpus (until claims are added).
+    """
+
+    def __init__(self, texts=(), stop_words=(), merge_ratio=0.1, min_merge=1024, refit_growth=0.5):
+        self.stop_words = frozenset(stop_words or ())
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+        self.refit_growth = refit_growth
+
+        self._vocab = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        # Raw term counts of every document, row-major; re-weighted on refit
+        self._doc_terms = []
+        self._doc_counts = []
+
+        self._idf = np.zeros(0)
+        self._fit_docs = 0
+        # Main index: postings of term t are _docs/_weights[_indptr[t]:_indptr[t + 1]]
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._top_weights = {}
+        self._main_docs = 0
+        self._delta = _Delta()
+        self._lock = threading.Lock()
+
+        self.merges = 0
+        self.refits = 0
+        self.last_merge_seconds = 0.0
+
+        for text in texts:
+            self._count(text)
+        self._rebuild(refit=True)
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    # === TEXT ANALYSIS ===
+    def analyze(self, text):
+        return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in self.stop_words]
+
+    def _count(self, text):
+        """Record a new document's term counts, growing the vocabulary; returns them"""
+        ids = []
+        for token in self.analyze(text):
+            term = self._vocab.get(token)
+            if term is None:
+                term = self._vocab[token] = len(self._vocab)
+            ids.append(term)
+        terms, counts = np.unique(np.asarray(ids, dtype=np.int64), return_counts=True)
+        if len(self._vocab) > len(self._df):
+            self._df = np.concatenate([self._df, np.zeros(max(len(self._df), len(self._vocab)), dtype=np.int64)])
+        self._df[terms] += 1
+        self._doc_terms.append(terms)
+        self._doc_counts.append(counts)
+        return terms, counts
+
+    def _term_idf(self, terms):
+        """IDF of the fitted terms; unseen ones (df 0 at fit time) get the maximum"""
+        unseen_idf = np.log(1.0 + self._fit_docs) + 1.0
+        idf = np.full(len(terms), unseen_idf)
+        fitted = terms < len(self._idf)
+        idf[fitted] = self._idf[terms[fitted]]
+        return idf
+
+    @staticmethod
+    def _normalized(values):
+        norm = np.sqrt(np.dot(values, values))
+        return values / norm if norm > 0 else values
+
+    # === BUILD ===
+    def _rebuild(self, refit):
+        """(Re)build the main index from every document; caller holds the lock"""
+        started = time.perf_counter()
+        n_docs = len(self._doc_terms)
+        if refit:
+            # Smoothed IDF, as TfidfVectorizer(smooth_idf=True)
+            df = self._df[:len(self._vocab)]
+            self._idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+            self._fit_docs = n_docs
+            self.refits += 1
+
+        lengths = np.fromiter((len(terms) for terms in self._doc_terms), dtype=np.int64, count=n_docs)
+        if n_docs and lengths.sum():
+            terms = np.concatenate(self._doc_terms)
+            counts = np.concatenate(self._doc_counts).astype(np.float64)
+        else:
+            terms, counts = np.zeros(0, dtype=np.int64), np.zeros(0)
+        docs = np.repeat(np.arange(n_docs, dtype=np.int32), lengths)
+
+        values = counts * self._term_idf(terms)
+        norms = np.sqrt(np.bincount(docs, weights=values * values, minlength=n_docs))
+        values /= np.where(norms > 0, norms, 1.0)[docs]
+
+        order = np.argsort(terms, kind="stable")
+        lengths = np.bincount(terms, minlength=len(self._vocab))
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)])
+        # Stable order keeps each posting list sorted by document
+        self._docs = docs[order]
+        self._weights = values[order].astype(np.float32)
+        self._top_weights = {}
+        for term in np.flatnonzero(lengths >= PRUNE_MIN_POSTINGS).tolist():
+            weights = self._weights[self._indptr[term]:self._indptr[term + 1]]
+            if len(weights) > TOP_WEIGHTS:
+                weights = np.partition(weights, len(weights) - TOP_WEIGHTS)[-TOP_WEIGHTS:]
+            self._top_weights[term] = np.sort(weights)[::-1].copy()
+        self._main_docs = n_docs
+        self._delta = _Delta()
+        self.last_merge_seconds = time.perf_counter() - started
+
+    # === INCREMENTAL ADDS ===
+    def add(self, texts):
+        """Index more texts; returns their document ids"""
+        with self._lock:
+            first = len(self._doc_terms)
+            for text in texts:
+                terms, counts = self._count(text)
+                weights = self._normalized(counts * self._term_idf(terms))
+                self._delta.add(len(self._doc_terms) - 1, terms, weights)
+
+            if self._delta.size >= max(self.min_merge, self.merge_ratio * self._main_docs):
+                self._merge(None)
+            return list(range(first, len(self._doc_terms)))
+
+    def merge(self, refit=None):
+        """
+        Fold the delta index into the main one now, e.g. after a bulk add.
+        IDF is refitted if the corpus has grown enough, or as `refit` says.
+        """
+        with self._lock:
+            self._merge(refit)
+
+    def _merge(self, refit):
+        if refit is None:
+            refit = len(self._doc_terms) >= (1 + self.refit_growth) * max(self._fit_docs, 1)
+        self._rebuild(refit)
+        self.merges += 1
+
+    # === QUERY ===
+    @staticmethod
+    def _accumulate(doc_parts, value_parts, n_docs, minimum):
+        """(documents, summed scores) of posting lists, keeping scores >= minimum"""
+        docs = np.concatenate(doc_parts)
+        values = np.concatenate(value_parts)
+        if len(docs) * 16 < n_docs:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=values)
+        else:
+            scores = np.bincount(docs, weights=values, minlength=n_docs)
+            candidates = None
+        keep = np.flatnonzero(scores >= minimum)
+        return (keep if candidates is None else candidates[keep]), scores[keep]
+
+    @staticmethod
+    def _kth_largest(scores, k):
+        return np.partition(scores, len(scores) - k)[len(scores) - k] if len(scores) >= k else 0.0
+
+    def search(self, text, k=5, min_similarity=0.0):
+        """
+        The k most similar documents as [(doc, cosine similarity)], best first.
+
+        Posting lists shorter than PRUNE_MIN_POSTINGS are always read.
+        Longer ones are pruned as in MaxScore: a term adds at most its query
+        weight x its largest document weight to a score, and two lower bounds
+        of the k-th best score are known before they are read: the k-th best
+        score over the short lists, and the query weight x the k-th largest
+        weight of each long list. The long lists with the smallest bounds, as
+        long as these add up to less, cannot bring a new document into the
+        top k: they are not read, only searched (binary search) for the
+        documents found by the other lists that can still get there. The
+        results are those of scoring every list in full.
+        """
+        vocab = self._vocab
+        known = [vocab[token] for token in self.analyze(text) if token in vocab]
+        if not known or k < 1:
+            return []
+        terms, counts = np.unique(np.asarray(known, dtype=np.int64), return_counts=True)
+
+        with self._lock:
+            weights = self._normalized(counts * self._term_idf(terms))
+
+            doc_parts, value_parts, long_lists = [], [], []
+            indptr, posting_docs, posting_weights = self._indptr, self._docs, self._weights
+            n_main_terms = len(indptr) - 1
+            threshold = 0.0
+            for term, weight in zip(terms.tolist(), weights.tolist()):
+                if term < n_main_terms:
+                    start, end = int(indptr[term]), int(indptr[term + 1])
+                    top = self._top_weights.get(term)
+                    if top is not None:
+                        long_lists.append((weight * float(top[0]), start, end, weight))
+                        if k <= len(top):
+                            threshold = max(threshold, weight * float(top[k - 1]))
+                    elif end > start:
+                        doc_parts.append(posting_docs[start:end])
+                        value_parts.append(posting_weights[start:end] * weight)
+                delta = self._delta.postings.get(term)
+                if delta is not None:
+                    doc_parts.append(np.asarray(delta[0], dtype=np.int32))
+                    value_parts.append(np.asarray(delta[1]) * weight)
+            n_docs = len(self._doc_terms)
+
+        if doc_parts and long_lists:
+            # The short lists' documents and partial scores, whose k-th best
+            # is another lower bound
+            candidates, scores = self._accumulate(doc_parts, value_parts, n_docs, 0.0)
+            doc_parts, value_parts = [candidates], [scores]
+            threshold = max(threshold, self._kth_largest(scores, k))
+
+        # Smallest bounds first: these lists are only searched
+        long_lists.sort()
+        skipped, skipped_bound = 0, 0.0
+        for bound, *_ in long_lists:
+            if skipped_bound + bound >= threshold:
+                break
+            skipped += 1
+            skipped_bound += bound
+        for _, start, end, weight in long_lists[skipped:]:
+            doc_parts.append(posting_docs[start:end])
+            value_parts.append(posting_weights[start:end] * weight)
+        if not doc_parts:
+            return []
+
+        # No document scoring below this can reach the top k
+        candidates, scores = self._accumulate(doc_parts, value_parts, n_docs, threshold - skipped_bound - BOUND_SLACK)
+        if skipped:
+            threshold = max(threshold, self._kth_largest(scores, k))
+            keep = scores + skipped_bound >= threshold - BOUND_SLACK
+            candidates, scores = candidates[keep], scores[keep]
+            for _, start, end, weight in long_lists[:skipped]:
+                docs = posting_docs[start:end]
+                found = np.searchsorted(docs, candidates)
+                found[found == len(docs)] = 0
+                hit = docs[found] == candidates
+                scores[hit] += posting_weights[start:end][found[hit]] * weight
+
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for position in top.tolist():
+            similarity = float(scores[position])
+            if similarity <= min_similarity:
+                break
+            results.append((int(candidates[position]), min(similarity, 1.0)))
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._doc_terms),
+                "terms": len(self._vocab),
+                "postings": int(len(self._docs)),
+                "delta_documents": self._delta.size,
+                "index_mb": round(sum(
+                    array.nbytes for array in (self._indptr, self._docs, self._weights, *self._top_weights.values())
+                ) / 2 ** 20, 2),
+                "merges": self.merges,
+                "idf_refits": self.refits,
+                "last_merge_ms": round(self.last_merge_seconds * 1000, 2)
+            }
@@ -0,0 +1,94 @@
+# backend/ml/incremental.py
+"""
+Scoring from accumulated term counts, for multi-turn conversations.
+
+A TF-IDF row is a function of the raw term counts of the text, so a
+conversation can keep the summed counts of its messages and, on each new
+message, add only that message's counts and re-weight the merged sparse
+vector. Scoring the accumulated counts gives exactly the probabilities of
+the concatenated messages (minus n-grams spanning two messages), at the
+cost of the new message alone.
+
+`incremental_scorer(model)` adapts either served model: the NumPy engine
+(ml/numpy_engine.py) directly, or an sklearn TF-IDF + classifier Pipeline.
+"""
+import numpy as np
+
+
+def merge_counts(columns, counts, new_columns, new_counts):
+    """Sum two sparse count vectors given as (sorted columns, counts) pairs"""
+    if not len(columns):
+        return new_columns, new_counts
+    if not len(new_columns):
+        return columns, counts
+    merged, inverse = np.unique(np.concatenate([columns, new_columns]), return_inverse=True)
+    return merged, np.bincount(inverse, weights=np.concatenate([counts, new_counts]))
+
+
+class _EngineScorer:
+    def __init__(self, engine):
+        self._engine = engine
+
+    def term_counts(self, text):
+        return self._engine.term_counts(text)
+
+    def predict_proba(self, columns, counts):
+        return self._engine.predict_proba_rows([(columns, self._engine.weight(columns, counts))])[0]
+
+
+class _PipelineScorer:
+    """TfidfVectorizer + linear classifier pipeline, scored from term counts"""
+
+    def __init__(self, pipeline):
+        from scipy.sparse import csr_matrix
+
+        self._csr_matrix = csr_matrix
+        self._vectorizer = pipeline.steps[0][1]
+        self._classifier = pipeline.steps[-1][1]
+        self._analyze = self._vectorizer.build_analyzer()
+        self._vocabulary = self._vectorizer.vocabulary_
+        self._n_features = len(self._vocabulary)
+        self._idf = self._vectorizer.idf_ if self._vectorizer.use_idf else None
+
+    def term_counts(self, text):
+        vocabulary = self._vocabulary
+        columns = [vocabulary[gram] for gram in self._analyze(text) if gram in vocabulary]
+        if not columns:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        columns, counts = np.unique(np.asarray(columns, dtype=np.int64), return_counts=True)
+        return columns, counts.astype(np.float64)
+
+    def _weight(self, columns, counts):
+        """TfidfTransformer on one row"""
+        vectorizer = self._vectorizer
+        values = np.asarray(counts, dtype=np.float64)
+        if vectorizer.binary:
+            values = np.minimum(values, 1.0)
+        if vectorizer.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self._idf is not None:
+            values = values * self._idf[columns]
+        if vectorizer.norm == "l2":
+            norm = np.sqrt(np.dot(values, values))
+        elif vectorizer.norm == "l1":
+            norm = np.abs(values).sum()
+        else:
+            norm = 0.0
+        return values / norm if norm > 0 else values
+
+    def predict_proba(self, columns, counts):
+        row = self._csr_matrix(
+            (self._weight(columns, counts), columns, [0, len(columns)]),
+            shape=(1, self._n_features)
+        )
+        return self._classifier.predict_proba(row)[0]
+
+
+def incremental_scorer(model):
+    """
+    Scorer for a served model with `term_counts(text)` -> (columns, counts)
+    and `predict_proba(columns, counts)` -> class probabilities.
+    """
+    if hasattr(model, "predict_proba_rows"):
+        return _EngineScorer(model)
+    return _PipelineScorer(model)
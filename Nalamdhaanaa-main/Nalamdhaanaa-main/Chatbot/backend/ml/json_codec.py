@@ -0,0 +1,34 @@
+# backend/ml/json_codec.py
+"""
+JSON encoding for API responses.
+
+Uses orjson when it is installed (several times faster than the standard
+library, and it emits UTF-8 bytes directly), the json module otherwise.
+Both produce compact UTF-8 output, so pre-encoded fragments from either can
+be spliced into a response body.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None
+
+if FAST_JSON:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Encode to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj):
+        """Encode to UTF-8 JSON bytes"""
+        return _encoder.encode(obj).encode("utf-8")
+
+    loads = json.loads
@@ -0,0 +1,90 @@
+# backend/ml/keyword_matcher.py
+import re
+
+
+def _trie_regex(keywords):
+    """Build a regex alternation factored on shared prefixes (a literal trie)"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = None
+
+    def build(node):
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Precompiled substring matcher for a prioritised keyword table.
+
+    `pairs` are (keyword, value) tuples in priority order. `first(text)` returns
+    the value of the highest-priority keyword that occurs anywhere in the text,
+    which is exactly what looping over the table with `keyword in text` returns.
+
+    Short texts are scanned once with a single compiled trie regex. Its
+    zero-width lookahead visits every position where some keyword starts and
+    captures the longest keyword there; every other keyword starting at that
+    position is a prefix of it, so the best priority per captured keyword is
+    precomputed. For longer texts CPython's C-level substring search beats the
+    regex engine's per-character cost, so they fall back to an early-exit scan
+    of the precompiled keywords.
+    """
+
+    def __init__(self, pairs, scan_threshold=64):
+        self.scan_threshold = scan_threshold
+        self._keywords = []
+        self._values = []
+        self._priority = {}
+        for keyword, value in pairs:
+            keyword = keyword.lower()
+            if keyword not in self._priority:
+                self._priority[keyword] = len(self._keywords)
+                self._keywords.append(keyword)
+                self._values.append(value)
+
+        # Best priority among a keyword and all keywords that are its prefixes
+        self._prefix_rank = {
+            keyword: min(rank for other, rank in self._priority.items() if keyword.startswith(other))
+            for keyword in self._keywords
+        }
+        self._pattern = re.compile("(?=(" + _trie_regex(self._keywords) + "))") if self._keywords else None
+
+        # Any match ranked below this already yields the top value, so scanning can stop
+        self._stop_rank = 0
+        while self._stop_rank < len(self._values) and self._values[self._stop_rank] == self._values[0]:
+            self._stop_rank += 1
+
+    def first(self, text, default=None):
+        """Value of the highest-priority keyword contained in text, else default"""
+        if self._pattern is None:
+            return default
+
+        text = text.lower()
+
+        if len(text) > self.scan_threshold:
+            for keyword, value in zip(self._keywords, self._values):
+                if keyword in text:
+                    return value
+            return default
+
+        best = len(self._keywords)
+        prefix_rank = self._prefix_rank
+        for match in self._pattern.finditer(text):
+            rank = prefix_rank[match.group(1)]
+            if rank < best:
+                best = rank
+                if best < self._stop_rank:
+                    break
+
+        return self._values[best] if best < len(self._keywords) else default
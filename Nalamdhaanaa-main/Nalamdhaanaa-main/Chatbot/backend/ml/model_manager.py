@@ -0,0 +1,220 @@
+# backend/ml/model_manager.py
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+# Short texts every candidate model must score sensibly before it goes live
+SMOKE_TEXTS = (
+    "I have a red itchy rash on my arms and legs",
+    "I have had a high fever, chills and body aches for three days",
+    "I keep coughing and it is hard to breathe at night",
+    "My stomach hurts after eating and I feel nauseous",
+)
+
+
+def files_fingerprint(paths):
+    """Cheap change detector: modification time and size of every file"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    return "/".join(parts)
+
+
+def files_checksum(paths):
+    """Content hash of the model files, used as the public model version"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class ModelHandle:
+    """
+    Immutable snapshot of one loaded model: the model itself, its version and
+    the per-class tables derived from it. Requests take a handle once and use
+    only it, so every part of a response comes from the same model even if a
+    reload swaps in a new one mid-request.
+    """
+
+    __slots__ = ("model", "version", "fingerprint", "tables", "loaded_at")
+
+    def __init__(self, model, version, fingerprint, tables, loaded_at):
+        self.model = model
+        self.version = version
+        self.fingerprint = fingerprint
+        self.tables = tables
+        self.loaded_at = loaded_at
+
+
+class ModelManager:
+    """
+    Owns the live model and replaces it without dropping requests.
+
+    A reload (admin call or file watcher) loads the candidate in the
+    background, validates it on SMOKE_TEXTS and only then swaps the
+    `current` reference; in-flight requests finish on the handle they took.
+    A candidate that fails to load or validate is discarded and the old
+    model keeps serving.
+
+    `loader()` returns a model with `predict_proba` and `classes_`;
+    `paths_fn()` lists the files it is loaded from; `build_tables(model)`
+    derives the per-class tables stored on the handle.
+
+    The watcher is not started by loading: a pre-fork server loads in its
+    master, and a master thread holding the reload lock at fork time would
+    leave the lock held forever in the child. Each serving process calls
+    `start_watcher()` itself (app.py does so on its first request).
+    """
+
+    # Attempts at loading files that keep changing underneath the loader
+    LOAD_ATTEMPTS = 3
+
+    def __init__(self, loader, paths_fn, build_tables=None, smoke_texts=SMOKE_TEXTS, watch_interval=0):
+        self.loader = loader
+        self.paths_fn = paths_fn
+        self.build_tables = build_tables
+        self.smoke_texts = list(smoke_texts)
+        self.watch_interval = watch_interval
+
+        self._current = None
+        self._reload_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+        self._failed_fingerprint = None
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error = None
+        self.last_reload_at = None
+
+    @property
+    def current(self):
+        """The live ModelHandle"""
+        return self._current
+
+    def load(self):
+        """Load and validate synchronously (startup); raises if the model is unusable"""
+        with self._reload_lock:
+            self._current = self._load_candidate()
+        return self._current
+
+    def _load_candidate(self):
+        paths = self.paths_fn()
+        for attempt in range(self.LOAD_ATTEMPTS):
+            # The version must describe the files the loader actually read:
+            # only accept a load if the files did not change across it
+            fingerprint = files_fingerprint(paths)
+            version = files_checksum(paths)
+            model = self.loader()
+            if files_fingerprint(paths) == fingerprint:
+                break
+        else:
+            raise RuntimeError(f"Model files kept changing during {self.LOAD_ATTEMPTS} load attempts")
+        self.validate(model)
+        tables = self.build_tables(model) if self.build_tables else None
+        return ModelHandle(model, version, fingerprint, tables, time.time())
+
+    def validate(self, model):
+        """Smoke-test a candidate: one finite probability row per text, each summing to 1"""
+        probs = np.asarray(model.predict_proba(self.smoke_texts))
+        expected_shape = (len(self.smoke_texts), len(model.classes_))
+        if probs.shape != expected_shape:
+            raise ValueError(f"Smoke test produced shape {probs.shape}, expected {expected_shape}")
+        if not np.all(np.isfinite(probs)) or not np.allclose(probs.sum(axis=1), 1.0, atol=1e-6):
+            raise ValueError("Smoke test produced invalid probabilities")
+
+    def _reload(self):
+        """Load, validate and swap; caller holds the reload lock"""
+        try:
+            candidate = self._load_candidate()
+        except Exception as e:
+            self.failed_reloads += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            try:
+                self._failed_fingerprint = files_fingerprint(self.paths_fn())
+            except OSError:
+                self._failed_fingerprint = None
+            return {"status": "failed", "error": self.last_error}
+
+        previous = self._current
+        if previous is not None and candidate.version == previous.version:
+            # Same content (e.g. file touched): keep the warm handle
+            self._current = ModelHandle(previous.model, previous.version, candidate.fingerprint,
+                                        previous.tables, previous.loaded_at)
+            return {"status": "unchanged", "version": previous.version}
+
+        self._current = candidate  # atomic reference swap
+        self.reloads += 1
+        self.last_error = None
+        self.last_reload_at = time.time()
+        return {
+            "status": "reloaded",
+            "version": candidate.version,
+            "previous_version": previous.version if previous else None
+        }
+
+    def reload(self, wait=False):
+        """
+        Reload the model from disk. With wait=False the work runs on a
+        background thread and this returns immediately.
+        """
+        if wait:
+            with self._reload_lock:
+                return self._reload()
+
+        if not self._reload_lock.acquire(blocking=False):
+            return {"status": "in_progress"}
+
+        def run():
+            try:
+                self._reload()
+            finally:
+                self._reload_lock.release()
+
+        threading.Thread(target=run, name="model-reload", daemon=True).start()
+        return {"status": "started"}
+
+    def start_watcher(self):
+        """
+        Start the file watcher in this process, once; a no-op when watching
+        is disabled. Call it from serving processes, not a pre-fork master.
+        """
+        if not self.watch_interval or self._watcher_pid == os.getpid():
+            return
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            # Per process: threads do not survive a pre-fork server's fork
+            self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name="model-watcher", daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                fingerprint = files_fingerprint(self.paths_fn())
+            except OSError:
+                continue  # files mid-replacement; look again next round
+            current = self._current
+            if current is None or fingerprint in (current.fingerprint, self._failed_fingerprint):
+                continue
+            with self._reload_lock:
+                self._reload()
+
+    def status(self):
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "version": current.version if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_error": self.last_error,
+            "watch_interval_seconds": self.watch_interval
+        }
@@ -0,0 +1,158 @@
+# backend/ml/numpy_engine.py
+# Inference-only reimplementation of the TF-IDF + LogisticRegression pipeline
+# on top of the memory-mapped artifact (ml/artifact.py), using only NumPy.
+# Importing this module does not import sklearn, scipy or pandas.
+import re
+import unicodedata
+
+import numpy as np
+
+from ml.artifact import load_artifact
+
+
+def _strip_accents_unicode(text):
+    normalized = unicodedata.normalize("NFKD", text)
+    if normalized == text:
+        return text
+    return "".join(char for char in normalized if not unicodedata.combining(char))
+
+
+def _strip_accents_ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+
+
+class NumpyTfidfLogReg:
+    """
+    Reproduces `predict_proba` of the trained sklearn pipeline.
+
+    Steps per text: preprocess (lowercase, accents), regex tokenization, stop
+    word removal, word n-grams, vocabulary lookup by binary search over the
+    sorted term array, tf-idf weighting, normalization, a sparse dot with
+    `coef_`, and a softmax (or one-vs-rest sigmoid).
+
+    Feature rows are (columns, values) array pairs so callers can keep,
+    merge and re-score them without a sparse matrix library.
+    """
+
+    def __init__(self, artifact):
+        settings = artifact.manifest["vectorizer"]
+
+        self.manifest = artifact.manifest
+        self.classes_ = np.asarray(artifact.classes)
+
+        self._lowercase = settings["lowercase"]
+        self._strip_accents = {
+            None: None,
+            "unicode": _strip_accents_unicode,
+            "ascii": _strip_accents_ascii,
+        }[settings["strip_accents"]]
+        self._token_pattern = re.compile(settings["token_pattern"])
+        self.stop_words = frozenset(settings["stop_words"] or ())
+        self._min_n, self._max_n = settings["ngram_range"]
+        self._binary = settings["binary"]
+        self._norm = settings["norm"]
+        self._use_idf = settings["use_idf"]
+        self._sublinear_tf = settings["sublinear_tf"]
+        self._ovr = artifact.manifest["classifier"]["multi_class"] == "ovr"
+
+        self._terms = artifact.vocab_terms
+        self._term_columns = artifact.vocab_index
+        self._idf = artifact.idf
+        self._coef = artifact.coef
+        self._intercept = artifact.intercept
+
+    # === FEATURE EXTRACTION ===
+    def analyze(self, text):
+        """Word n-grams of a text, exactly as TfidfVectorizer's word analyzer builds them"""
+        if self._lowercase:
+            text = text.lower()
+        if self._strip_accents is not None:
+            text = self._strip_accents(text)
+
+        tokens = self._token_pattern.findall(text)
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self._min_n, self._max_n
+        if max_n == 1:
+            return tokens
+
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def term_counts(self, text):
+        """In-vocabulary feature columns of a text and their raw counts (columns sorted)"""
+        grams = self.analyze(text)
+        if not grams:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        grams = np.asarray(grams)
+        positions = np.searchsorted(self._terms, grams)
+        positions[positions == len(self._terms)] = 0
+        known = self._terms[positions] == grams
+
+        columns = np.asarray(self._term_columns[positions[known]], dtype=np.int64)
+        columns, counts = np.unique(columns, return_counts=True)
+        return columns, counts.astype(np.float64)
+
+    def weight(self, columns, counts):
+        """Turn raw term counts into normalized tf-idf values"""
+        values = np.asarray(counts, dtype=np.float64)
+        if self._binary:
+            values = np.minimum(values, 1.0)
+        if self._sublinear_tf:
+            values = np.log(values) + 1.0
+        if self._use_idf:
+            values = values * self._idf[columns]
+
+        if self._norm == "l2":
+            norm = np.sqrt(np.dot(values, values))
+        elif self._norm == "l1":
+            norm = np.abs(values).sum()
+        else:
+            norm = 0.0
+        if norm > 0:
+            values = values / norm
+        return values
+
+    def transform(self, texts):
+        """TF-IDF feature rows for a list of texts"""
+        rows = []
+        for text in texts:
+            columns, counts = self.term_counts(text)
+            rows.append((columns, self.weight(columns, counts)))
+        return rows
+
+    # === SCORING ===
+    def decision_function_rows(self, rows):
+        """Linear class scores, shape (n_rows, n_coef_rows)"""
+        scores = np.tile(self._intercept, (len(rows), 1))
+        for i, (columns, values) in enumerate(rows):
+            if len(columns):
+                scores[i] += self._coef[:, columns] @ values
+        return scores
+
+    def predict_proba_rows(self, rows):
+        scores = self.decision_function_rows(rows)
+
+        if self._ovr:
+            probs = 1.0 / (1.0 + np.exp(-scores))
+            if probs.shape[1] == 1:
+                return np.hstack([1.0 - probs, probs])
+            return probs / probs.sum(axis=1, keepdims=True)
+
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict_proba(self, texts):
+        """Class probabilities, shape (n_texts, n_classes), same as the sklearn pipeline"""
+        return self.predict_proba_rows(self.transform(texts))
+
+
+def load_numpy_engine(artifact_dir):
+    """Open an exported artifact (memory-mapped) as a NumPy inference engine"""
+    return NumpyTfidfLogReg(load_artifact(artifact_dir))
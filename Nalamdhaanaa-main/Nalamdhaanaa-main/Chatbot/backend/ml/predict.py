@@ -69,39 +69,111 @@
 #     for r in results:
 #         print(f"Condition: {r['condition']} | Confidence: {r['confidence']:.2f} | Triage: {r['triage_level']}")
 # backend/ml/predict.py
-import joblib
-import os
+# Run from the backend directory: python -m ml.predict
+"""
+Symptom inference: model loading, prediction and the safety-annotated
+response (ESI triage, reliability, disclaimer) served by app.py.
+
+The model is not loaded at import. `get_model_manager()` loads it on first
+use from MODEL_PATH, MODEL_ARTIFACT_DIR or the NumPy engine (see
+load_model), and every loaded model gets a ResponseBuilder holding the
+response parts that do not depend on the input, prepared once.
+"""
 import json
-import numpy as np
+import os
+import threading
+import time
 from datetime import datetime
 
+import numpy as np
+
+from ml.artifact import artifact_files, build_sklearn_pipeline, load_artifact
+from ml.json_codec import dumps
+from ml.model_manager import ModelManager
+from ml.ranking import top_k_indices
+from ml.triage import (
+    ESI_LEVELS,
+    RELIABILITY_BANDS,
+    RELIABILITY_THRESHOLDS,
+    build_class_tables,
+    get_emergency_level,
+)
+
 
 # === CONFIGURATION ===
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 
-                         "/Users/batcomputer/Desktop/health-assistant/symptom_condition_model.pkl")
-METADATA_PATH = os.path.join(os.path.dirname(__file__), 
-                            "../models/model_metadata.json")
-KNOWLEDGE_BASE_PATH = os.path.join(os.path.dirname(__file__), 
-                                   "../models/knowledge_base.json")
-
-# Load model
-try:
-    model = joblib.load(MODEL_PATH)
-    print("✅ Model loaded successfully")
-except Exception as e:
-    raise Exception(f"Failed to load model: {e}")
-
-# Load metadata if available
-metadata = {}
-if os.path.exists(METADATA_PATH):
-    with open(METADATA_PATH, "r") as f:
-        metadata = json.load(f)
-
-# Load knowledge base if available
-knowledge_base = {}
-if os.path.exists(KNOWLEDGE_BASE_PATH):
-    with open(KNOWLEDGE_BASE_PATH, "r") as f:
-        knowledge_base = json.load(f)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pickled pipeline (resolved relative to backend/ so any working directory works)
+MODEL_PATH = os.environ.get(
+    "MODEL_PATH",
+    os.path.join(BACKEND_DIR, "..", "symptom_classifier.pkl")
+)
+
+# Optional memory-mapped artifact written by train_model.py. When set, the
+# pipeline is rebuilt from .npy files instead of unpickling MODEL_PATH.
+MODEL_ARTIFACT_DIR = os.environ.get("MODEL_ARTIFACT_DIR", "")
+
+# "sklearn" (default) or "numpy". The NumPy engine serves the artifact without
+# importing sklearn at all, which cuts worker cold start; it needs MODEL_ARTIFACT_DIR.
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "sklearn").lower()
+
+# Written by train_model.py; read again whenever a model is loaded
+METADATA_PATH = os.environ.get(
+    "MODEL_METADATA_PATH",
+    os.path.join(BACKEND_DIR, "models", "model_metadata.json")
+)
+
+
+def load_model():
+    if INFERENCE_ENGINE == "numpy":
+        if not MODEL_ARTIFACT_DIR:
+            raise RuntimeError("INFERENCE_ENGINE=numpy requires MODEL_ARTIFACT_DIR")
+        from ml.numpy_engine import load_numpy_engine
+        return load_numpy_engine(MODEL_ARTIFACT_DIR)
+    if MODEL_ARTIFACT_DIR:
+        return build_sklearn_pipeline(load_artifact(MODEL_ARTIFACT_DIR))
+
+    import joblib  # imports sklearn while unpickling; kept off the numpy engine's path
+    return joblib.load(MODEL_PATH)
+
+
+def model_files():
+    """Files the served model is loaded from (watched for hot reload)"""
+    if MODEL_ARTIFACT_DIR:
+        return artifact_files(MODEL_ARTIFACT_DIR)
+    return [MODEL_PATH]
+
+
+def model_stages(model):
+    """
+    The model split into (transform, classify): texts -> features and
+    features -> class probabilities, so the two can be timed separately.
+    """
+    if hasattr(model, "predict_proba_rows"):
+        return model.transform, model.predict_proba_rows
+    steps = [step for _, step in model.steps]
+
+    def transform(texts):
+        features = texts
+        for step in steps[:-1]:
+            features = step.transform(features)
+        return features
+
+    return transform, steps[-1].predict_proba
+
+
+def model_stop_words(model):
+    """Stop words the model's vectorizer removes, so other indexes can analyze text alike"""
+    if hasattr(model, "stop_words"):
+        return model.stop_words
+    return model.steps[0][1].get_stop_words() or frozenset()
+
+
+def load_metadata():
+    if os.path.exists(METADATA_PATH):
+        with open(METADATA_PATH, "r") as f:
+            return json.load(f)
+    return {}
 
 
 # === MEDICAL DISCLAIMER ===
@@ -116,177 +188,142 @@ emergency room immediately.
 """
 
 
-# === EMERGENCY DETECTION ===
-def get_emergency_severity(condition_name, user_text, confidence):
+# Scored once by every newly loaded model before it serves
+WARMUP_TEXT = "I have had a high fever, chills and a dry cough for three days"
+
+
+def validate_input(user_text):
+    """Return an error message for unusable input, or None if it is valid"""
+    if not isinstance(user_text, str) or len(user_text.strip()) < 3:
+        return "Please provide detailed symptoms (at least 3 characters)"
+    return None
+
+
+# === RESPONSE ASSEMBLY ===
+class ResponseBuilder:
     """
-    Classify into 5-level ESI (Emergency Severity Index) triage system
-    Based on standardized emergency department triage protocols
+    Builds the safety-annotated response for one loaded model.
+
+    Everything that does not depend on the input is prepared here once: the
+    per-class tables, the ESI severity templates, the disclaimer and the
+    model info, the last three also as encoded JSON. A response then costs
+    the top-k lookups, one keyword scan for the severity and the encoding
+    of the few input-dependent fields.
     """
-    
-    # Level 1: Critical - Life-threatening
-    level_1_keywords = [
-        "chest pain", "heart attack", "cardiac arrest", 
-        "difficulty breathing", "can't breathe", "respiratory arrest",
-        "stroke", "unable to speak", "paralysis", "face drooping",
-        "severe bleeding", "hemorrhage", "uncontrolled bleeding",
-        "unconscious", "loss of consciousness", "not responding",
-        "severe head injury", "major trauma", "seizure ongoing",
-        "choking", "severe burns", "severe allergic reaction"
-    ]
-    
-    # Level 2: Emergency - High risk, needs rapid care
-    level_2_keywords = [
-        "severe pain", "acute pain", "crushing pain", "intense pain",
-        "confusion", "altered mental status", "disoriented", "delirious",
-        "high fever with stiff neck", "severe infection", "sepsis",
-        "open fracture", "penetrating wound", "deep wound",
-        "coughing blood", "vomiting blood", "blood in stool",
-        "severe headache", "worst headache of life",
-        "suicidal thoughts", "want to harm", "overdose"
-    ]
-    
-    # Level 3: Urgent - Stable but needs timely care
-    level_3_keywords = [
-        "moderate pain", "persistent fever", "dehydration", "dizziness",
-        "urinary retention", "severe vomiting", "severe diarrhea",
-        "abdominal pain", "back pain", "migraine", "fracture",
-        "infection", "rash spreading", "eye injury"
-    ]
-    
-    user_lower = user_text.lower()
-    
-    # Check Level 1: CRITICAL
-    if any(keyword in user_lower for keyword in level_1_keywords):
-        return {
-            "esi_level": 1,
-            "severity": "CRITICAL - LIFE THREATENING",
-            "action": "🚨 CALL 108 IMMEDIATELY 🚨",
-            "wait_time": "0 minutes - Immediate intervention required",
-            "warning": "⚠️ EMERGENCY: This is a medical emergency. Call 108 or go to the nearest emergency room NOW. Do not wait.",
-            "color_code": "red"
-        }
-    
-    # Check Level 2: EMERGENT
-    if any(keyword in user_lower for keyword in level_2_keywords):
-        return {
-            "esi_level": 2,
-            "severity": "EMERGENT - High Risk",
-            "action": "Go to Emergency Department immediately",
-            "wait_time": "<15 minutes",
-            "warning": "⚠️ Urgent medical attention required within 15 minutes. Go to the ER now.",
-            "color_code": "orange"
+
+    def __init__(self, classes, metadata=None):
+        metadata = metadata or {}
+        self.tables = build_class_tables(classes)
+        # Predictions (possibly cached) carry condition names, not class indices
+        self._urgent = dict(zip(self.tables.conditions, self.tables.urgent_conditions))
+        self.model_info = {
+            "accuracy": metadata.get("test_accuracy", "Unknown"),
+            "training_date": metadata.get("training_date", "Unknown")
         }
-    
-    # Check Level 3: URGENT
-    if any(keyword in user_lower or keyword in condition_name.lower() 
-           for keyword in level_3_keywords):
-        return {
-            "esi_level": 3,
-            "severity": "URGENT",
-            "action": "Visit Urgent Care or Emergency Department within 1-2 hours",
-            "wait_time": "1-2 hours",
-            "warning": "Medical evaluation needed within 1-2 hours.",
-            "color_code": "yellow"
+        self._severity_json = {level: dumps(severity) for level, severity in ESI_LEVELS.items()}
+        self._static_json = (
+            b',"disclaimer":' + dumps(MEDICAL_DISCLAIMER)
+            + b',"model_info":' + dumps(self.model_info) + b"}"
+        )
+        self.warmup_seconds = None
+
+    @classmethod
+    def for_model(cls, model):
+        builder = cls(model.classes_, load_metadata())
+        builder.warm_up(model)
+        return builder
+
+    def warm_up(self, model):
+        """Run one full prediction, so a new model pays its first-call costs before serving"""
+        started = time.perf_counter()
+        transform, classify = model_stages(model)
+        probs = classify(transform([WARMUP_TEXT]))[0]
+        self.render(WARMUP_TEXT, self.predictions(probs, top_k_indices(probs, 3)))
+        self.warmup_seconds = time.perf_counter() - started
+
+    def predictions(self, probs, top_indices):
+        """Top predictions for one row of class probabilities"""
+        tables = self.tables
+        confidences = probs[top_indices]
+
+        # Reliability band of every selected prediction in one pass
+        bands = np.searchsorted(RELIABILITY_THRESHOLDS, confidences, side="right")
+
+        predictions = []
+        for i, confidence, band in zip(top_indices, confidences.tolist(), bands):
+            reliability = RELIABILITY_BANDS[band]
+            predictions.append({
+                "condition": tables.conditions[i],
+                "confidence": confidence,
+                "confidence_percentage": f"{confidence * 100:.1f}%",
+                "specialty": tables.specialties[i],
+                "reliability": reliability["reliability"],
+                "needs_followup_questions": reliability["needs_followup"]
+            })
+        return predictions
+
+    def emergency_level(self, user_text, predictions):
+        """ESI level from the user text and the top prediction"""
+        top = predictions[0]
+        return get_emergency_level(
+            top["condition"], user_text, top["confidence"],
+            urgent_condition=self._urgent[top["condition"]]
+        )
+
+    def build(self, user_text, predictions, extra=None):
+        """The full response as a dict"""
+        response = {
+            "timestamp": datetime.now().isoformat(),
+            "user_input": user_text,
+            "emergency_severity": dict(ESI_LEVELS[self.emergency_level(user_text, predictions)]),
+            "predictions": predictions,
+            "disclaimer": MEDICAL_DISCLAIMER,
+            "model_info": dict(self.model_info)
         }
-    
-    # Level 4: Semi-urgent
-    if confidence >= 0.6:
-        return {
-            "esi_level": 4,
-            "severity": "Semi-Urgent",
-            "action": "Schedule appointment with doctor within 24-48 hours",
-            "wait_time": "1-2 days",
-            "warning": None,
-            "color_code": "green"
+        if extra:
+            response.update(extra)
+        return response
+
+    def render(self, user_text, predictions, extra=None):
+        """The full response as JSON bytes; only the input-dependent fields are encoded"""
+        dynamic = {
+            "timestamp": datetime.now().isoformat(),
+            "user_input": user_text,
+            "predictions": predictions
         }
-    
-    # Level 5: Non-urgent
-    return {
-        "esi_level": 5,
-        "severity": "Non-Urgent",
-        "action": "Monitor symptoms and consult primary care if persists",
-        "wait_time": "3-7 days as needed",
-        "warning": None,
-        "color_code": "blue"
-    }
-
-
-def get_specialty_recommendation(condition_name):
-    """
-    Route to appropriate medical specialty based on condition
-    """
-    specialty_mapping = {
-        "fever": "General Physician",
-        "cough": "Pulmonology / General Physician",
-        "heart": "Cardiology",
-        "cardiac": "Cardiology",
-        "chest": "Cardiology / Pulmonology",
-        "skin": "Dermatology",
-        "rash": "Dermatology",
-        "headache": "Neurology",
-        "migraine": "Neurology",
-        "stomach": "Gastroenterology",
-        "abdominal": "Gastroenterology",
-        "digestive": "Gastroenterology",
-        "pain": "Pain Management / Orthopedics",
-        "joint": "Rheumatology / Orthopedics",
-        "bone": "Orthopedics",
-        "fracture": "Orthopedics",
-        "anxiety": "Psychiatry / Mental Health",
-        "depression": "Psychiatry / Mental Health",
-        "stress": "Psychiatry / Mental Health",
-        "infection": "Infectious Disease",
-        "diabetes": "Endocrinology",
-        "thyroid": "Endocrinology",
-        "kidney": "Nephrology",
-        "liver": "Hepatology / Gastroenterology",
-        "respiratory": "Pulmonology",
-        "breathing": "Pulmonology",
-        "asthma": "Pulmonology",
-        "eye": "Ophthalmology",
-        "vision": "Ophthalmology",
-        "ear": "Otolaryngology (ENT)",
-        "throat": "Otolaryngology (ENT)",
-        "nose": "Otolaryngology (ENT)",
-        "pregnancy": "Obstetrics / Gynecology",
-        "gynecology": "Obstetrics / Gynecology",
-        "urinary": "Urology",
-        "bladder": "Urology",
-        "blood": "Hematology",
-        "anemia": "Hematology"
-    }
-    
-    condition_lower = condition_name.lower()
-    
-    for keyword, specialty in specialty_mapping.items():
-        if keyword in condition_lower:
-            return specialty
-    
-    return "General Physician"
+        if extra:
+            dynamic.update(extra)
+        return b"".join((
+            dumps(dynamic)[:-1],
+            b',"emergency_severity":',
+            self._severity_json[self.emergency_level(user_text, predictions)],
+            self._static_json
+        ))
+
+
+# === MODEL ===
+_model_manager = None
+_model_manager_lock = threading.Lock()
 
 
-def assess_confidence_reliability(confidence):
+def get_model_manager(watch_interval=0):
     """
-    Determine prediction reliability and recommended action
+    The process-wide ModelManager, created and loaded on first use.
+    `watch_interval` only applies to the call that creates it.
     """
-    if confidence >= 0.75:
-        return {
-            "reliability": "High",
-            "description": "AI prediction has high confidence",
-            "needs_followup": False
-        }
-    elif confidence >= 0.50:
-        return {
-            "reliability": "Moderate",
-            "description": "AI prediction is uncertain. Additional questions recommended.",
-            "needs_followup": True
-        }
-    else:
-        return {
-            "reliability": "Low",
-            "description": "AI cannot determine condition reliably. Please consult healthcare professional.",
-            "needs_followup": True
-        }
+    global _model_manager
+    if _model_manager is None:
+        with _model_manager_lock:
+            if _model_manager is None:
+                manager = ModelManager(
+                    load_model,
+                    model_files,
+                    build_tables=ResponseBuilder.for_model,
+                    watch_interval=watch_interval
+                )
+                manager.load()
+                _model_manager = manager
+    return _model_manager
 
 
 def predict_condition(user_text, top_n=3):
@@ -300,71 +337,62 @@ def predict_condition(user_text, top_n=3):
     Returns:
         dict containing predictions, emergency assessment, and safety information
     """
+    return predict_condition_batch([user_text], top_n=top_n)[0]
+
+
+def predict_condition_batch(user_texts, top_n=3):
+    """
+    Predict likely conditions for many symptom descriptions at once
+    
+    All valid texts go through a single vectorized predict_proba call and
+    np.argpartition-based top-k selection.
+    
+    Args:
+        user_texts: List of symptom descriptions
+        top_n: Number of top predictions to return per text
+        
+    Returns:
+        list of responses in input order; invalid items get an "error" entry
+        in place of the predictions without affecting the rest of the batch
+    """
+    results = [None] * len(user_texts)
+    valid_positions = []
     
     # Input validation
-    if not user_text or len(user_text.strip()) < 3:
-        return {
-            "error": "Please provide a detailed description of your symptoms",
-            "predictions": []
-        }
+    for position, user_text in enumerate(user_texts):
+        error = validate_input(user_text)
+        if error:
+            results[position] = {"error": error, "predictions": []}
+        else:
+            valid_positions.append(position)
+    
+    if not valid_positions:
+        return results
     
     try:
-        # Get prediction probabilities
-        probs = model.predict_proba([user_text])[0]
-        classes = model.classes_
-        
-        # Sort by confidence
-        sorted_idx = np.argsort(probs)[::-1]
-        
-        # Build top predictions
-        top_conditions = []
-        for i in sorted_idx[:top_n]:
-            condition = classes[i]
-            confidence = float(probs[i])
-            
-            # Get specialty recommendation
-            specialty = get_specialty_recommendation(condition)
-            
-            # Assess confidence reliability
-            reliability = assess_confidence_reliability(confidence)
-            
-            top_conditions.append({
-                "condition": condition,
-                "confidence": confidence,
-                "confidence_percentage": f"{confidence * 100:.1f}%",
-                "specialty": specialty,
-                "reliability": reliability["reliability"],
-                "needs_followup_questions": reliability["needs_followup"]
-            })
-        
-        # Emergency severity assessment (use top prediction)
-        top_condition = top_conditions[0]["condition"]
-        top_confidence = top_conditions[0]["confidence"]
-        emergency_assessment = get_emergency_severity(
-            top_condition, user_text, top_confidence
-        )
+        handle = get_model_manager().current
+        builder = handle.tables
+
+        # Get prediction probabilities for the whole batch
+        probs = handle.model.predict_proba([user_texts[p] for p in valid_positions])
         
-        # Compile response
-        response = {
-            "timestamp": datetime.now().isoformat(),
-            "user_input": user_text,
-            "emergency_severity": emergency_assessment,
-            "predictions": top_conditions,
-            "disclaimer": MEDICAL_DISCLAIMER,
-            "model_info": {
-                "accuracy": metadata.get("test_accuracy", "Unknown"),
-                "training_date": metadata.get("training_date", "Unknown")
-            }
-        }
+        # Select the top predictions per row
+        top_indices = top_k_indices(probs, top_n)
         
-        return response
+        for row, position in enumerate(valid_positions):
+            results[position] = builder.build(
+                user_texts[position], builder.predictions(probs[row], top_indices[row])
+            )
         
     except Exception as e:
-        return {
-            "error": f"Prediction failed: {str(e)}",
-            "predictions": [],
-            "disclaimer": MEDICAL_DISCLAIMER
-        }
+        for position in valid_positions:
+            results[position] = {
+                "error": f"Prediction failed: {str(e)}",
+                "predictions": [],
+                "disclaimer": MEDICAL_DISCLAIMER
+            }
+    
+    return results
 
 
 # === TESTING ===
@@ -0,0 +1,13 @@
+# backend/ml/preprocessing.py
+
+
+def normalize_symptom_text(text):
+    """
+    Canonical form of a symptom description: lowercased, trimmed and with
+    runs of whitespace collapsed to a single space.
+
+    Applied to the training texts in train_model.py and used as the
+    prediction cache key, so texts differing only in case or spacing
+    share one entry.
+    """
+    return " ".join(text.lower().split())
@@ -0,0 +1,29 @@
+# backend/ml/ranking.py
+import numpy as np
+
+
+def top_k_indices(probs, k):
+    """
+    Return the indices of the k largest values along the last axis,
+    ordered from highest to lowest.
+
+    Works on a single probability vector or a (n_samples, n_classes)
+    matrix. np.argpartition selects the k winners in linear time so only
+    those k columns are sorted, instead of a full argsort per row.
+    """
+    probs = np.asarray(probs)
+    n_classes = probs.shape[-1]
+    k = max(0, min(int(k), n_classes))
+
+    if k == 0:
+        return np.empty(probs.shape[:-1] + (0,), dtype=np.intp)
+
+    if k < n_classes:
+        candidates = np.argpartition(probs, n_classes - k, axis=-1)[..., n_classes - k:]
+    else:
+        candidates = np.argsort(probs, axis=-1)
+
+    # Order the k winners by descending probability
+    candidate_probs = np.take_along_axis(probs, candidates, axis=-1)
+    order = np.argsort(-candidate_probs, axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
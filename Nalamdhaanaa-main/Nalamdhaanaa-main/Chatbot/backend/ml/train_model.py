@@ -40,42 +40,207 @@
 
 # print("✅ Model training complete and saved at ../models/symptom_condition_model.pkl")
 # backend/ml/train_model.py
+# Run from the backend directory: python -m ml.train_model [--n-jobs -1] [--cv 5]
+"""
+Train the symptom classifier with a cross-validated hyperparameter search.
+
+Stages: load the dataset (parsed once and cached on disk until the CSV
+changes), hold out a stratified test split, grid-search TF-IDF and
+LogisticRegression settings on all cores, evaluate the refitted best model
+on the test split, then write:
+  * symptom_classifier.pkl          best pipeline (atomically replaced)
+  * symptom_classifier_artifact/    memory-mappable export, checked for parity
+  * backend/models/model_metadata.json
+                                    test_accuracy, training_date, search
+                                    results and timing per stage
+The fitted TF-IDF vectorizer is cached (Pipeline memory) so candidates that
+share text settings on the same fold reuse it instead of refitting it.
+"""
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import joblib
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, accuracy_score
-import joblib
-
-# Load dataset
-df = pd.read_csv("Symptom2Disease.csv")
-
-# Basic text cleaning if needed
-df['text'] = df['text'].str.lower().str.strip()
-
-X = df['text']
-y = df['label']
-
-# Split to train and test
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# Build pipeline with TF-IDF and Logistic Regression
-model = Pipeline([
-    ('tfidf', TfidfVectorizer(stop_words='english', ngram_range=(1,2))),
-    ('clf', LogisticRegression(max_iter=1000, class_weight='balanced'))
-])
-
-# Train model
-model.fit(X_train, y_train)
-
-# Predict and evaluate
-y_pred = model.predict(X_test)
-
-print("Accuracy:", accuracy_score(y_test, y_pred))
-print("Classification Report:\n", classification_report(y_test, y_pred))
 
-# Save the model for inference
-joblib.dump(model, 'symptom_classifier.pkl')
+from ml.artifact import build_sklearn_pipeline, export_artifact, load_artifact
+from ml.preprocessing import normalize_symptom_text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.dirname(BACKEND_DIR)
+DATASET_PATH = os.path.join(CHATBOT_DIR, "Symptom2Disease.csv")
+MODEL_OUTPUT_PATH = os.path.join(CHATBOT_DIR, "symptom_classifier.pkl")
+ARTIFACT_OUTPUT_DIR = os.path.join(CHATBOT_DIR, "symptom_classifier_artifact")
+MODELS_DIR = os.path.join(BACKEND_DIR, "models")
+METADATA_OUTPUT_PATH = os.path.join(MODELS_DIR, "model_metadata.json")
+CACHE_DIR = os.environ.get("TRAIN_CACHE_DIR", os.path.join(MODELS_DIR, "cache"))
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+# Search space. Only solvers that fit a multinomial (softmax) model are
+# searched, so every candidate is served the same way.
+PARAM_GRID = {
+    "tfidf__ngram_range": [(1, 1), (1, 2)],
+    "tfidf__min_df": [1, 2],
+    "clf__C": [1.0, 10.0, 100.0],
+    "clf__solver": ["lbfgs", "saga"],
+}
+
+memory = joblib.Memory(CACHE_DIR, verbose=0)
+
+
+@contextmanager
+def timed(timings, stage):
+    """Record the wall time of a training stage in seconds"""
+    started = time.perf_counter()
+    yield
+    timings[stage] = round(time.perf_counter() - started, 3)
+
+
+@memory.cache
+def _read_dataset(path, fingerprint):
+    """Parsed and normalized (texts, labels); `fingerprint` keys the disk cache"""
+    df = pd.read_csv(path)
+    # Basic text cleaning (shared with the backend's prediction cache key)
+    texts = df["text"].map(normalize_symptom_text).to_numpy(dtype=object)
+    labels = df["label"].to_numpy(dtype=object)
+    return texts, labels
+
+
+def load_dataset(path=DATASET_PATH):
+    """Dataset from the cache, re-parsed only when the CSV changes"""
+    stat = os.stat(path)
+    return _read_dataset(path, (stat.st_mtime_ns, stat.st_size))
+
+
+def build_pipeline():
+    return Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(stop_words="english")),
+            ("clf", LogisticRegression(max_iter=1000, class_weight="balanced")),
+        ],
+        memory=memory,
+    )
+
+
+def top_candidates(search, count=5):
+    """Best-ranked search candidates with their mean/std CV accuracy"""
+    results = search.cv_results_
+    order = np.argsort(results["rank_test_score"], kind="stable")[:count]
+    return [
+        {
+            "params": {k: _jsonable(v) for k, v in results["params"][i].items()},
+            "mean_cv_accuracy": float(results["mean_test_score"][i]),
+            "std_cv_accuracy": float(results["std_test_score"][i]),
+            "mean_fit_seconds": float(results["mean_fit_time"][i]),
+        }
+        for i in order
+    ]
+
+
+def _jsonable(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def train(n_jobs=-1, cv=5):
+    timings = {}
+
+    with timed(timings, "load_data"):
+        texts, labels = load_dataset()
+
+    with timed(timings, "split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            texts, labels, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=labels
+        )
+
+    search = GridSearchCV(
+        build_pipeline(),
+        PARAM_GRID,
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE),
+        scoring="accuracy",
+        n_jobs=n_jobs,
+        refit=True,
+    )
+    with timed(timings, "search"):
+        search.fit(X_train, y_train)
+    timings["refit"] = round(search.refit_time_, 3)
+
+    # Inference does not need the cache; keep it out of the pickled model
+    model = search.best_estimator_
+    model.set_params(memory=None)
+
+    with timed(timings, "evaluate"):
+        y_pred = model.predict(X_test)
+        test_accuracy = accuracy_score(y_test, y_pred)
+
+    print("Best parameters:", search.best_params_)
+    print(f"CV accuracy: {search.best_score_:.4f}")
+    print("Accuracy:", test_accuracy)
+    print("Classification Report:\n", classification_report(y_test, y_pred))
+
+    # Save the model for inference (renamed into place so a watching server
+    # never reads a half-written file)
+    with timed(timings, "save_model"):
+        joblib.dump(model, MODEL_OUTPUT_PATH + ".tmp")
+        os.replace(MODEL_OUTPUT_PATH + ".tmp", MODEL_OUTPUT_PATH)
+
+    # Export the memory-mappable artifact and check it reproduces the probabilities
+    with timed(timings, "export_artifact"):
+        export_artifact(model, ARTIFACT_OUTPUT_DIR)
+        rebuilt = build_sklearn_pipeline(load_artifact(ARTIFACT_OUTPUT_DIR))
+        max_diff = abs(rebuilt.predict_proba(X_test) - model.predict_proba(X_test)).max()
+    if max_diff > 1e-12:
+        raise RuntimeError(f"Exported artifact differs from the trained model (max diff {max_diff})")
+    print(f"Artifact written to {ARTIFACT_OUTPUT_DIR} (max probability diff {max_diff:.1e})")
+
+    metadata = {
+        "test_accuracy": float(test_accuracy),
+        "training_date": datetime.now().isoformat(timespec="seconds"),
+        "cv_accuracy": float(search.best_score_),
+        "best_params": {k: _jsonable(v) for k, v in search.best_params_.items()},
+        "top_candidates": top_candidates(search),
+        "search": {
+            "candidates": len(search.cv_results_["params"]),
+            "cv_folds": cv,
+            "n_jobs": n_jobs,
+        },
+        "dataset": {
+            "rows": int(len(texts)),
+            "train_rows": int(len(X_train)),
+            "test_rows": int(len(X_test)),
+            "classes": int(len(model.classes_)),
+        },
+        "stage_seconds": timings,
+        "sklearn_version": sklearn.__version__,
+    }
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    _write_json_atomic(METADATA_OUTPUT_PATH, metadata)
+    print(f"Metadata written to {METADATA_OUTPUT_PATH}")
+    print("Stage timings (s):", timings)
+    return model, metadata
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the symptom classifier")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel CV fits (-1 = all cores)")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    args = parser.parse_args()
+    train(n_jobs=args.n_jobs, cv=args.cv)
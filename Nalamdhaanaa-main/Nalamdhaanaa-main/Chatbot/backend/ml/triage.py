@@ -0,0 +1,267 @@
+# backend/ml/triage.py
+# Rule-based safety layer applied on top of the classifier's predictions.
+# Keyword tables are compiled into matchers once at import.
+from bisect import bisect_right
+from collections import namedtuple
+
+from ml.keyword_matcher import KeywordMatcher
+
+
+# === EMERGENCY DETECTION ===
+# 5-level ESI (Emergency Severity Index) triage system
+# Based on standardized emergency department triage protocols
+
+# Level 1: Critical - Life-threatening
+LEVEL_1_KEYWORDS = (
+    "chest pain", "heart attack", "cardiac arrest",
+    "difficulty breathing", "can't breathe", "respiratory arrest",
+    "stroke", "unable to speak", "paralysis", "face drooping",
+    "severe bleeding", "hemorrhage", "uncontrolled bleeding",
+    "unconscious", "loss of consciousness", "not responding",
+    "severe head injury", "major trauma", "seizure ongoing",
+    "choking", "severe burns", "severe allergic reaction"
+)
+
+# Level 2: Emergency - High risk, needs rapid care
+LEVEL_2_KEYWORDS = (
+    "severe pain", "acute pain", "crushing pain", "intense pain",
+    "confusion", "altered mental status", "disoriented", "delirious",
+    "high fever with stiff neck", "severe infection", "sepsis",
+    "open fracture", "penetrating wound", "deep wound",
+    "coughing blood", "vomiting blood", "blood in stool",
+    "severe headache", "worst headache of life",
+    "suicidal thoughts", "want to harm", "overdose"
+)
+
+# Level 3: Urgent - Stable but needs timely care
+LEVEL_3_KEYWORDS = (
+    "moderate pain", "persistent fever", "dehydration", "dizziness",
+    "urinary retention", "severe vomiting", "severe diarrhea",
+    "abdominal pain", "back pain", "migraine", "fracture",
+    "infection", "rash spreading", "eye injury"
+)
+
+ESI_LEVELS = {
+    1: {
+        "esi_level": 1,
+        "severity": "CRITICAL - LIFE THREATENING",
+        "action": "🚨 CALL 108 IMMEDIATELY 🚨",
+        "wait_time": "0 minutes - Immediate intervention required",
+        "warning": "⚠️ EMERGENCY: This is a medical emergency. Call 108 or go to the nearest emergency room NOW. Do not wait.",
+        "color_code": "red"
+    },
+    2: {
+        "esi_level": 2,
+        "severity": "EMERGENT - High Risk",
+        "action": "Go to Emergency Department immediately",
+        "wait_time": "<15 minutes",
+        "warning": "⚠️ Urgent medical attention required within 15 minutes. Go to the ER now.",
+        "color_code": "orange"
+    },
+    3: {
+        "esi_level": 3,
+        "severity": "URGENT",
+        "action": "Visit Urgent Care or Emergency Department within 1-2 hours",
+        "wait_time": "1-2 hours",
+        "warning": "Medical evaluation needed within 1-2 hours.",
+        "color_code": "yellow"
+    },
+    4: {
+        "esi_level": 4,
+        "severity": "Semi-Urgent",
+        "action": "Schedule appointment with doctor within 24-48 hours",
+        "wait_time": "1-2 days",
+        "warning": None,
+        "color_code": "green"
+    },
+    5: {
+        "esi_level": 5,
+        "severity": "Non-Urgent",
+        "action": "Monitor symptoms and consult primary care if persists",
+        "wait_time": "3-7 days as needed",
+        "warning": None,
+        "color_code": "blue"
+    }
+}
+
+# User text is checked against all three levels; the lowest level wins.
+_USER_TEXT_ESI_MATCHER = KeywordMatcher(
+    [(keyword, 1) for keyword in LEVEL_1_KEYWORDS]
+    + [(keyword, 2) for keyword in LEVEL_2_KEYWORDS]
+    + [(keyword, 3) for keyword in LEVEL_3_KEYWORDS]
+)
+# The predicted condition name only escalates to level 3.
+_CONDITION_ESI_MATCHER = KeywordMatcher([(keyword, 3) for keyword in LEVEL_3_KEYWORDS])
+
+
+def condition_is_urgent(condition_name):
+    """Whether the condition name alone escalates a prediction to ESI level 3"""
+    return _CONDITION_ESI_MATCHER.first(condition_name) is not None
+
+
+def get_emergency_level(condition_name, user_text, confidence, urgent_condition=None):
+    """
+    ESI level (1 = most urgent, 5 = least) for a prediction
+
+    `urgent_condition` may be passed in from a precomputed class table to
+    skip matching the condition name.
+    """
+    level = _USER_TEXT_ESI_MATCHER.first(user_text)
+    if level is not None:
+        return level
+
+    if urgent_condition is None:
+        urgent_condition = condition_is_urgent(condition_name)
+    if urgent_condition:
+        return 3
+
+    # Level 4: Semi-urgent, Level 5: Non-urgent
+    return 4 if confidence >= 0.6 else 5
+
+
+def get_emergency_severity(condition_name, user_text, confidence, urgent_condition=None):
+    """
+    Classify into 5-level ESI (Emergency Severity Index) triage system
+    Based on standardized emergency department triage protocols
+    """
+    level = get_emergency_level(condition_name, user_text, confidence, urgent_condition)
+    return dict(ESI_LEVELS[level])
+
+
+# === SPECIALTY ROUTING ===
+# Keywords in priority order: the first one found in the condition name wins
+SPECIALTY_MAPPING = {
+    # Skin related
+    "skin": "Dermatologist",
+    "acne": "Dermatologist",
+    "rash": "Dermatologist",
+    "rashes": "Dermatologist",
+    "sores": "Dermatologist",
+    "psoriasis": "Dermatologist",
+    "impetigo": "Dermatologist",
+    "fungal": "Dermatologist",
+
+    # Respiratory
+    "cough": "Pulmonologist",
+    "asthma": "Pulmonologist",
+    "breathing": "Pulmonologist",
+    "throat": "ENT (Otolaryngologist)",
+    "chest": "Pulmonologist / Cardiologist",
+
+    # Pain related/general
+    "pain": "General Physician / Pain Management",
+    "joint": "Rheumatologist / Orthopedist",
+    "headache": "Neurologist",
+    "migraine": "Neurologist",
+    "stomach": "Gastroenterologist",
+    "abdominal": "Gastroenterologist",
+
+    # Vascular
+    "legs": "Vascular Surgeon / General Physician",
+    "varicose": "Vascular Surgeon",
+
+    # Urinary
+    "pee": "Urologist",
+    "urinary": "Urologist",
+    "kidney": "Nephrologist",
+
+    # Infectious/fever related
+    "fever": "General Physician / Infectious Disease",
+    "infection": "Infectious Disease",
+
+    # Endocrine/metabolic
+    "diabetes": "Endocrinologist",
+    "thyroid": "Endocrinologist",
+
+    # Mental health
+    "anxiety": "Psychiatrist",
+    "depression": "Psychiatrist",
+
+    # Blood
+    "jaundice": "Hepatologist / Gastroenterologist",
+    "blood": "Hematologist",
+
+    # Others
+    "drug": "Pharmacist / Toxicologist",
+    "allergy": "Allergist / Immunologist",
+
+    # Not among the classifier's conditions; kept for retrained models
+    "heart": "Cardiologist",
+    "cardiac": "Cardiologist",
+    "digestive": "Gastroenterologist",
+    "bone": "Orthopedist",
+    "fracture": "Orthopedist",
+    "stress": "Psychiatrist",
+    "liver": "Hepatologist / Gastroenterologist",
+    "respiratory": "Pulmonologist",
+    "eye": "Ophthalmologist",
+    "vision": "Ophthalmologist",
+    "ear": "ENT (Otolaryngologist)",
+    "nose": "ENT (Otolaryngologist)",
+    "pregnancy": "Obstetrician / Gynecologist",
+    "gynecology": "Obstetrician / Gynecologist",
+    "bladder": "Urologist",
+    "anemia": "Hematologist"
+}
+
+_SPECIALTY_MATCHER = KeywordMatcher(SPECIALTY_MAPPING.items())
+
+
+def get_specialty_recommendation(condition_name):
+    """
+    Route to appropriate medical specialty based on condition
+    """
+    return _SPECIALTY_MATCHER.first(condition_name, "General Physician")
+
+
+# === CONFIDENCE RELIABILITY ===
+# Band i covers confidences in [RELIABILITY_THRESHOLDS[i - 1], RELIABILITY_THRESHOLDS[i])
+RELIABILITY_THRESHOLDS = (0.50, 0.75)
+RELIABILITY_BANDS = (
+    {
+        "reliability": "Low",
+        "description": "AI cannot determine condition reliably. Please consult healthcare professional.",
+        "needs_followup": True
+    },
+    {
+        "reliability": "Moderate",
+        "description": "AI prediction is uncertain. Additional questions recommended.",
+        "needs_followup": True
+    },
+    {
+        "reliability": "High",
+        "description": "AI prediction has high confidence",
+        "needs_followup": False
+    }
+)
+
+
+def reliability_band(confidence):
+    """Index into RELIABILITY_BANDS for a confidence value"""
+    return bisect_right(RELIABILITY_THRESHOLDS, confidence)
+
+
+def assess_confidence_reliability(confidence):
+    """
+    Determine prediction reliability and recommended action
+    """
+    return dict(RELIABILITY_BANDS[reliability_band(confidence)])
+
+
+# === PER-CLASS TABLES ===
+ClassTables = namedtuple("ClassTables", ["conditions", "specialties", "urgent_conditions"])
+
+
+def build_class_tables(classes):
+    """
+    Precompute the condition-dependent parts of a response for every class.
+
+    Each field is a tuple aligned with the model's `classes_`, so building a
+    response only needs index lookups. Rebuild whenever a new model is loaded.
+    """
+    conditions = tuple(str(condition) for condition in classes)
+    return ClassTables(
+        conditions=conditions,
+        specialties=tuple(get_specialty_recommendation(c) for c in conditions),
+        urgent_conditions=tuple(condition_is_urgent(c) for c in conditions)
+    )
@@ -0,0 +1,100 @@
+# backend/prediction_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from ml.preprocessing import normalize_symptom_text
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results keyed on normalized symptom text.
+
+    Entries are scoped to a model version. `version_fn` reports the version
+    currently being served; when it changes the cache is cleared. Callers pass
+    the version their handle was loaded with, so a lookup or store made by a
+    request still running on the previous model never mixes results across
+    versions.
+    `ttl` (seconds) optionally expires entries; 0 keeps them until evicted.
+    """
+
+    def __init__(self, maxsize=4096, ttl=0, version_fn=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_fn = version_fn
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = version_fn() if version_fn else None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        """Clear the cache if the served model version changed; caller holds the lock"""
+        if self.version_fn is None:
+            return
+        version = self.version_fn()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            self.invalidations += 1
+
+    def get(self, text, version=None):
+        """Cached value for `text` computed by model `version`, or None on a miss"""
+        key = normalize_symptom_text(text)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl and now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, text, value, version=None):
+        if self.maxsize <= 0:
+            return
+        key = normalize_symptom_text(text)
+        with self._lock:
+            self._check_version()
+            if version != self._version:
+                return  # computed by a model that is no longer served
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "model_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
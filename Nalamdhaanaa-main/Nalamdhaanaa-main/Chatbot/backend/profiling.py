@@ -0,0 +1,237 @@
+# profiling.py: one module, vendored as Chatbot/backend/profiling.py and
+# healthassist/api/profiling.py. The two APIs are deployed separately, each from
+# its own directory with its own requirements, so each carries a copy.
+# Keep the copies byte-identical: change both, then check with
+#   cmp Chatbot/backend/profiling.py healthassist/api/profiling.py
+import os
+import random
+import sys
+import threading
+import time
+
+# Innermost frames kept per sample
+MAX_STACK_DEPTH = 64
+
+
+def size_bucket(n):
+    """Power-of-two bucket label for an input size: 0, le_1, le_2, le_4, ..."""
+    if n <= 0:
+        return "0"
+    return f"le_{1 << (int(n) - 1).bit_length()}"
+
+
+class _Profile:
+    """Samples of one request in flight"""
+
+    __slots__ = ("route", "tags", "samples", "started")
+
+    def __init__(self, route):
+        self.route = route
+        self.tags = {}
+        self.samples = {}
+        self.started = time.perf_counter()
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for selected requests.
+
+    A request is profiled with probability `sample_rate`, or when it sends
+    `X-Profile: <token>` (only if a token is configured). While any profiled
+    request is in flight, a background thread wakes every `interval` seconds
+    and records the stack of each profiled request's thread. Threads blocked on a socket are
+    sampled too, so upstream waits show up as time in the HTTP client, next
+    to time spent in model code.
+
+    Samples are aggregated per (route, tags, stack). Tags describe the input
+    (e.g. text length bucket) and can be added while the request runs.
+    `collapsed()` renders the aggregate in the collapsed-stack format read by
+    flamegraph.pl, speedscope and similar tools, with route and tags as the
+    root frames. At most `max_stacks` distinct stacks are kept; further ones
+    are counted under "[other]".
+
+    The sampler thread is started lazily in each process (safe with pre-fork
+    servers). Aggregates are per process; with `dump_path` set (may contain
+    {pid}) each process also writes them to a file every `dump_interval`
+    seconds.
+    """
+
+    def __init__(self, sample_rate=0.0, interval=0.005, token="", header="X-Profile",
+                 max_stacks=20000, dump_path="", dump_interval=60.0):
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.token = token
+        self.header = header
+        self.max_stacks = max_stacks
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+
+        self._active = {}
+        self._aggregate = {}
+        self._requests = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler_pid = None
+        self._last_dump = time.monotonic()
+
+        self.samples = 0
+        self.dropped_stacks = 0
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or bool(self.token)
+
+    def should_profile(self, headers):
+        if self.token and headers.get(self.header) == self.token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    # --- request side -----------------------------------------------------
+
+    def begin(self, route):
+        """Start profiling the calling thread's request"""
+        if self._sampler_pid != os.getpid():
+            self._start_sampler()
+        with self._lock:
+            self._active[threading.get_ident()] = _Profile(route)
+            self._wake.set()
+
+    def tag(self, **tags):
+        """Attach input descriptors to the calling thread's profile, if any"""
+        profile = self._active.get(threading.get_ident())
+        if profile is not None:
+            profile.tags.update((key, str(value)) for key, value in tags.items())
+
+    def end(self):
+        """Stop profiling the calling thread and fold its samples into the aggregate"""
+        with self._lock:
+            profile = self._active.pop(threading.get_ident(), None)
+            if profile is None:
+                return
+            tags = (("route", profile.route),) + tuple(sorted(profile.tags.items()))
+            for stack, count in profile.samples.items():
+                key = (tags, stack)
+                if key not in self._aggregate and len(self._aggregate) >= self.max_stacks:
+                    key = (tags, ("[other]",))
+                    self.dropped_stacks += 1
+                self._aggregate[key] = self._aggregate.get(key, 0) + count
+            requests, seconds = self._requests.get(tags, (0, 0.0))
+            self._requests[tags] = (requests + 1, seconds + time.perf_counter() - profile.started)
+
+    def install(self, app):
+        """Profile selected requests of a Flask app (streamed bodies included)"""
+        from flask import request
+
+        @app.before_request
+        def _begin_profile():
+            if self.should_profile(request.headers):
+                self.begin(request.url_rule.rule if request.url_rule else "unmatched")
+
+        @app.after_request
+        def _end_profile(response):
+            if threading.get_ident() in self._active:
+                if response.is_streamed:
+                    # The body is produced while it is sent; stop once it has been
+                    response.call_on_close(self.end)
+                else:
+                    self.end()
+            return response
+
+    # --- sampler ----------------------------------------------------------
+
+    def _start_sampler(self):
+        with self._lock:
+            if self._sampler_pid == os.getpid():
+                return
+            # After a fork the parent's sampler thread does not exist here
+            self._active = {}
+            self._sampler_pid = os.getpid()
+            threading.Thread(target=self._run, name="sampling-profiler", daemon=True).start()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, profile in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stack = self._stack(frame)
+                        profile.samples[stack] = profile.samples.get(stack, 0) + 1
+                        self.samples += 1
+                if not self._active:
+                    self._wake.clear()
+            del frames
+            if self.dump_path and time.monotonic() - self._last_dump >= self.dump_interval:
+                self._last_dump = time.monotonic()
+                self.dump()
+
+    # --- output -----------------------------------------------------------
+
+    def collapsed(self, route=None):
+        """Aggregated samples as collapsed stacks: 'route=..;tag=..;frame;frame count' lines"""
+        with self._lock:
+            items = list(self._aggregate.items())
+        lines = []
+        for (tags, stack), count in items:
+            if route is not None and tags[0][1] != route:
+                continue
+            frames = [f"{key}={value}" for key, value in tags] + list(stack)
+            lines.append(";".join(frame.replace(";", ":").replace(" ", "_") for frame in frames) + f" {count}")
+        lines.sort()
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def dump(self):
+        """Write the collapsed stacks to dump_path atomically"""
+        path = self.dump_path.format(pid=os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.collapsed())
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._aggregate.clear()
+            self._requests.clear()
+            self.samples = 0
+            self.dropped_stacks = 0
+
+    def stats(self):
+        with self._lock:
+            profiled = [
+                {
+                    **dict(tags),
+                    "requests": requests,
+                    "mean_ms": round(1000 * seconds / requests, 3)
+                }
+                for tags, (requests, seconds) in sorted(self._requests.items())
+            ]
+            return {
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "interval_ms": self.interval * 1000,
+                "header": self.header if self.token else None,
+                "in_flight": len(self._active),
+                "samples": self.samples,
+                "stacks": len(self._aggregate),
+                "dropped_stacks": self.dropped_stacks,
+                "profiled": profiled
+            }
@@ -0,0 +1,152 @@
+# backend/sessions.py
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from ml.incremental import merge_counts
+
+
+class Session:
+    __slots__ = ("columns", "counts", "texts", "version", "last_seen")
+
+    def __init__(self, version):
+        self.columns = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.float64)
+        self.texts = []
+        self.version = version
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """
+    Bounded store of conversation state keyed on a client-supplied session
+    id: the summed term counts of every message so far (see
+    ml/incremental.py) and the messages themselves.
+
+    Least recently used sessions are evicted beyond `maxsize`; sessions
+    idle for more than `idle_ttl` seconds expire (0 = never). Counts are
+    columns of one model's vocabulary, so a session last updated by another
+    model version is rebuilt from its messages on the next turn.
+
+    The store is per process, and consecutive turns may reach different
+    workers. Clients therefore send the session's earlier messages as
+    `history`; a worker that does not know the session, or holds a
+    different history for it (turns it missed), rebuilds it from those.
+    """
+
+    def __init__(self, maxsize=10000, idle_ttl=1800, max_turns=50):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.max_turns = max_turns
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.turns = 0
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rebuilds = 0
+        self.restores = 0
+
+    def _expire(self, now):
+        """Drop idle sessions from the LRU end; caller holds the lock"""
+        if not self.idle_ttl:
+            return
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen <= self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            self.expirations += 1
+
+    @staticmethod
+    def _refeaturize(session, texts, term_counts):
+        """Replace a session's messages and counts; caller holds the lock"""
+        session.columns = np.empty(0, dtype=np.int64)
+        session.counts = np.empty(0, dtype=np.float64)
+        for previous in texts:
+            session.columns, session.counts = merge_counts(
+                session.columns, session.counts, *term_counts(previous)
+            )
+        session.texts = list(texts)
+
+    def add_turn(self, session_id, text, version, term_counts, history=None):
+        """
+        Add a message to a session (created if unknown) and return its
+        accumulated (columns, counts), number of turns and whether the
+        session started empty here. `term_counts(text)` featurizes one
+        message with the model of `version`. `history`, the client's
+        earlier messages of the session, replaces the stored ones when
+        they differ.
+        """
+        # Featurize outside the lock; only the merge needs it
+        new_columns, new_counts = term_counts(text)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            new_session = session is None and not history
+            if session is None:
+                session = self._sessions[session_id] = Session(version)
+                self.created += 1
+                while len(self._sessions) > self.maxsize:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+
+            if history is not None:
+                # The messages this turn follows, within the turn window
+                keep = self.max_turns - 1
+                history = list(history[-keep:]) if keep > 0 else []
+                if session.texts != history:
+                    # Unknown here, or turns of it went to other workers
+                    self._refeaturize(session, history, term_counts)
+                    session.version = version
+                    self.restores += 1
+
+            if session.version != version:
+                # The model changed mid-conversation: re-featurize its messages
+                self._refeaturize(session, session.texts, term_counts)
+                session.version = version
+                self.rebuilds += 1
+
+            if len(session.texts) >= self.max_turns:
+                # Window the conversation: forget the oldest message
+                old_columns, old_counts = term_counts(session.texts.pop(0))
+                session.columns, session.counts = merge_counts(
+                    session.columns, session.counts, old_columns, -old_counts
+                )
+                keep = session.counts > 0
+                session.columns, session.counts = session.columns[keep], session.counts[keep]
+
+            session.columns, session.counts = merge_counts(
+                session.columns, session.counts, new_columns, new_counts
+            )
+            session.texts.append(text)
+            self.turns += 1
+            return session.columns, session.counts, len(session.texts), new_session
+
+    def reset(self, session_id):
+        """Forget a session; returns whether it existed"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "sessions": len(self._sessions),
+                "maxsize": self.maxsize,
+                "idle_ttl_seconds": self.idle_ttl,
+                "max_turns": self.max_turns,
+                "turns": self.turns,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rebuilds": self.rebuilds,
+                "restores": self.restores
+            }
@@ -0,0 +1,7 @@
+# backend/wsgi.py
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# Importing app loads the model; with preload_app this happens once in the
+# gunicorn master before workers are forked.
+from app import app
+
+__all__ = ["app"]
@@ -1,4 +1,6 @@
 @echo off
+REM Set INSTALL_DEPS=1 to install/update dependencies before starting.
+REM gunicorn does not run on Windows; use start_backend.sh --prod on Linux/macOS for production.
 echo Starting Custom Chatbot Backend...
 echo.
 
@@ -7,8 +9,10 @@ cd /d "%~dp0backend"
 echo Activating virtual environment...
 call venv\Scripts\activate
 
-echo Installing/updating dependencies...
-pip install flask flask-cors joblib numpy scikit-learn
+if "%INSTALL_DEPS%"=="1" (
+    echo Installing/updating dependencies...
+    pip install -r requirements.txt
+)
 
 echo.
 echo Starting Flask server...
@@ -18,4 +22,4 @@ echo.
 
 python app.py
 
-pause
\ No newline at end of file
+pause
@@ -1,4 +1,7 @@
 #!/bin/bash
+# Usage: ./start_backend.sh [--prod]
+#   --prod            serve with gunicorn (multi-process, model preloaded before fork)
+#   INSTALL_DEPS=1    install/update dependencies before starting
 
 echo "Starting Custom Chatbot Backend..."
 echo
@@ -10,13 +13,20 @@ cd "$SCRIPT_DIR/backend"
 echo "Activating virtual environment..."
 source venv/bin/activate
 
-echo "Installing/updating dependencies..."
-pip install flask flask-cors joblib numpy scikit-learn
+if [ "$INSTALL_DEPS" = "1" ]; then
+    echo "Installing/updating dependencies..."
+    pip install -r requirements.txt
+fi
 
 echo
-echo "Starting Flask server..."
 echo "Backend will be available at: http://localhost:5000"
 echo "Press Ctrl+C to stop the server"
 echo
 
-python app.py
\ No newline at end of file
+if [ "$1" = "--prod" ]; then
+    echo "Starting gunicorn..."
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+fi
+
+echo "Starting Flask development server..."
+python app.py
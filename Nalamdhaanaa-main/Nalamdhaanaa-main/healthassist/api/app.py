@@ -1,155 +1,280 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import requests
+import hmac
+import json
 import os
+import threading
+
+from drug_index import DrugIndex
+from osm import HEALTHCARE_AMENITIES, build_overpass_query, element_to_place, iter_elements
+from pagination import paginate
+from profiling import SamplingProfiler, size_bucket
+from ranking import Deduplicator, rank_places
+from shared import (
+    NDJSON_HEADERS,
+    NOMINATIM_URL,
+    OVERPASS_FALLBACK,
+    OVERPASS_URL,
+    facility_index,
+    format_geocode_results,
+    geocode_cache,
+    log,
+    nearby_response,
+    parse_nearby_params,
+    tile_cache,
+    upstream_error,
+)
+from tile_cache import bbox_around, haversine_m
+from upstream import CircuitOpenError, UpstreamBusyError, UpstreamClient
 
 app = Flask(__name__)
 CORS(app)
 
-# Using OpenStreetMap Nominatim and Overpass API for free healthcare location data
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+# Upstream URLs, the geocode/tile caches, the offline facility index and the
+# log are configured in shared.py, which async_app.py imports as well.
+
+# Pooled clients with single-flight, concurrency limits, retries and circuit
+# breaking. The public Overpass instance allows two concurrent queries per
+# client; Nominatim's usage policy allows one request per second. Limits are
+# per process, so divide them by the number of workers.
+overpass = UpstreamClient(
+    "overpass",
+    max_concurrency=int(os.environ.get("OVERPASS_MAX_CONCURRENCY", "2")),
+    retries=int(os.environ.get("UPSTREAM_RETRIES", "2"))
+)
+nominatim = UpstreamClient(
+    "nominatim",
+    max_concurrency=1,
+    rate_per_second=float(os.environ.get("NOMINATIM_RATE_LIMIT", "1")),
+    retries=int(os.environ.get("UPSTREAM_RETRIES", "2"))
+)
+
+# Shared secret for /admin/* (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Opt-in sampling profiler: a fraction of requests (PROFILE_SAMPLE_RATE), or
+# those sending X-Profile: <PROFILE_TOKEN>, have their stacks sampled every
+# PROFILE_INTERVAL_MS. Collapsed stacks are served by GET /admin/profile and,
+# with PROFILE_DUMP_PATH set, written to that file periodically.
+profiler = SamplingProfiler(
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    interval=float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000,
+    token=os.environ.get("PROFILE_TOKEN", ""),
+    dump_path=os.environ.get("PROFILE_DUMP_PATH", ""),
+    dump_interval=float(os.environ.get("PROFILE_DUMP_INTERVAL", "60"))
+)
+if profiler.enabled:
+    profiler.install(app)
+
+# Drug catalogue exported from lib/drugs.ts (build_drug_catalogue.py), indexed
+# once at startup for /drugs/*
+DRUG_CATALOGUE_PATH = os.environ.get(
+    "DRUG_CATALOGUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "drugs.json")
+)
+MAX_DRUG_BATCH = int(os.environ.get("MAX_DRUG_BATCH", "100"))
+
+drug_index = DrugIndex.load(DRUG_CATALOGUE_PATH) if os.path.exists(DRUG_CATALOGUE_PATH) else None
+# Requests that went past the offline index; gthread workers update it
+# from several threads
+live_queries = 0
+_live_queries_lock = threading.Lock()
+
+def count_live_query():
+    global live_queries
+    with _live_queries_lock:
+        live_queries += 1
+
+def fetch_places_in_bbox(bbox, amenities=HEALTHCARE_AMENITIES):
+    """Query Overpass for facilities in a bbox; raises RequestException on failure"""
+    data = overpass.request_json(
+        "POST",
+        OVERPASS_URL,
+        data=build_overpass_query(bbox, amenities),
+        timeout=30
+    )
+
+    places = []
+    for element in data.get('elements', []):
+        converted = element_to_place(element)
+        if converted is not None:
+            places.append(converted)
+    return places
 
-def get_nearby_places(lat, lon, radius=5000):
+def get_nearby_places(lat, lon, radius=5000, amenities=HEALTHCARE_AMENITIES, limit=None):
     """
-    Fetch nearby healthcare facilities using Overpass API
-    radius in meters (default 5km)
+    Fetch nearby healthcare facilities: from the offline index when it covers
+    the area, otherwise via the tile cache and Overpass API.
+    radius in meters (default 5km); results are nearest first, at most `limit`.
+    Raises RequestException when Overpass fails, so callers can tell an
+    outage from an area without facilities.
     """
+    if facility_index is not None and facility_index.covers(lat, lon, radius):
+        profiler.tag(source='index')
+        return facility_index.nearby(lat, lon, radius, amenities, limit)
+    if not OVERPASS_FALLBACK:
+        return []
+
+    count_live_query()
+    profiler.tag(source='tiles')
+    try:
+        found = tile_cache.places_in_bbox(bbox_around(lat, lon, radius), amenities, fetch_places_in_bbox)
+    except requests.exceptions.RequestException as e:
+        log.warning("overpass_failed", error=str(e), error_type=type(e).__name__)
+        raise
+    return rank_places(lat, lon, radius, found, limit)
 
-    # Overpass query for hospitals, pharmacies, and clinics
-    overpass_query = f"""
-    [out:json][timeout:25];
-    (
-      node["amenity"="hospital"](around:{radius},{lat},{lon});
-      way["amenity"="hospital"](around:{radius},{lat},{lon});
-      node["amenity"="pharmacy"](around:{radius},{lat},{lon});
-      way["amenity"="pharmacy"](around:{radius},{lat},{lon});
-      node["amenity"="clinic"](around:{radius},{lat},{lon});
-      way["amenity"="clinic"](around:{radius},{lat},{lon});
-      node["amenity"="doctors"](around:{radius},{lat},{lon});
-      way["amenity"="doctors"](around:{radius},{lat},{lon});
-    );
-    out center;
+def get_nearby_page(lat, lon, radius, limit=None, after=None, amenities=HEALTHCARE_AMENITIES):
     """
+    One page of nearby places, nearest first: (places, next_cursor).
+    `after` is a decoded cursor; next_cursor is None on the last page.
+    """
+    if after is None and limit is not None:
+        # One extra place tells whether another page exists
+        places = get_nearby_places(lat, lon, radius, amenities, limit=limit + 1)
+    else:
+        places = get_nearby_places(lat, lon, radius, amenities)
+    return paginate(places, lat, lon, radius, amenities, limit, after)
 
-    try:
-        response = requests.post(
-            OVERPASS_URL,
-            data=overpass_query,
-            headers={'User-Agent': 'HealthcareLocator/1.0'},
-            timeout=30
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        places = []
-        for element in data.get('elements', []):
-            # Get coordinates
-            if 'lat' in element and 'lon' in element:
-                place_lat = element['lat']
-                place_lon = element['lon']
-            elif 'center' in element:
-                place_lat = element['center']['lat']
-                place_lon = element['center']['lon']
-            else:
-                continue
-
-            tags = element.get('tags', {})
-            amenity_type = tags.get('amenity', 'unknown')
-
-            # Map amenity types to categories
-            category = 'clinic'
-            if amenity_type == 'hospital':
-                category = 'hospital'
-            elif amenity_type == 'pharmacy':
-                category = 'pharmacy'
-            elif amenity_type in ['clinic', 'doctors']:
-                category = 'clinic'
-
-            place = {
-                'id': element.get('id'),
-                'name': tags.get('name', f'Unnamed {category.title()}'),
-                'address': format_address(tags),
-                'category': category,
-                'lat': place_lat,
-                'lon': place_lon,
-                'phone': tags.get('phone', ''),
-                'website': tags.get('website', ''),
-                'opening_hours': tags.get('opening_hours', ''),
-            }
-
-            places.append(place)
-
-        return places
+def _ndjson(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return []
+def stream_nearby(lat, lon, radius, limit=None, after=None, amenities=HEALTHCARE_AMENITIES):
+    """
+    NDJSON lines for /nearby?stream=1: a "meta" line, one "place" line per
+    facility, then an "end" line with the count and next cursor (or an
+    "error" line).
 
-def format_address(tags):
-    """Format address from OSM tags"""
-    address_parts = []
+    When the area is served from memory (offline index or cached tiles) or
+    a page is requested, places come nearest first. Otherwise the Overpass
+    response is parsed element by element and each place is sent as soon
+    as it is formatted (arrival order, "sorted": false); the complete
+    result then fills the tile cache.
+    """
+    yield _ndjson({'type': 'meta', 'center': {'lat': lat, 'lon': lon}, 'radius': radius})
+
+    block = None
+    paged = limit is not None or after is not None
+    from_index = facility_index is not None and facility_index.covers(lat, lon, radius)
+    if not paged and not from_index and OVERPASS_FALLBACK:
+        cached, block = tile_cache.split(bbox_around(lat, lon, radius), amenities)
 
-    if 'addr:housenumber' in tags:
-        address_parts.append(tags['addr:housenumber'])
-    if 'addr:street' in tags:
-        address_parts.append(tags['addr:street'])
-    if 'addr:city' in tags:
-        address_parts.append(tags['addr:city'])
-    if 'addr:postcode' in tags:
-        address_parts.append(tags['addr:postcode'])
+    if block is None:
+        try:
+            places, next_cursor = get_nearby_page(lat, lon, radius, limit, after, amenities)
+        except requests.exceptions.RequestException as e:
+            yield _ndjson({'type': 'error', 'error': upstream_error(e)[0]['error'], 'count': 0})
+            return
+        profiler.tag(places=size_bucket(len(places)))
+        for place in places:
+            yield _ndjson({'type': 'place', **place})
+        yield _ndjson({'type': 'end', 'count': len(places), 'next_cursor': next_cursor, 'sorted': True})
+        return
 
-    address = ', '.join(address_parts) if address_parts else tags.get('addr:full', 'Address not available')
-    return address
+    count_live_query()
+    profiler.tag(source='tiles')
+    count = 0
+    deduplicator = Deduplicator()
+    for place in rank_places(lat, lon, radius, cached, threshold_m=0):
+        if deduplicator.add(place):
+            count += 1
+            yield _ndjson({'type': 'place', **place})
+
+    wanted = frozenset(amenities)
+    fetched = []
+    try:
+        with overpass.stream(
+            "POST",
+            OVERPASS_URL,
+            data=build_overpass_query(tile_cache.block_bbox(block), amenities),
+            timeout=30
+        ) as response:
+            for element in iter_elements(response.iter_content(chunk_size=65536)):
+                converted = element_to_place(element)
+                if converted is None:
+                    continue
+                fetched.append(converted)
+                amenity, place = converted
+                if amenity not in wanted or not tile_cache.place_in_block(block, place):
+                    continue
+                distance = haversine_m(lat, lon, place['lat'], place['lon'])
+                if distance > radius:
+                    continue
+                place = dict(place, distance=round(distance, 1))
+                if deduplicator.add(place):
+                    count += 1
+                    yield _ndjson({'type': 'place', **place})
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log.warning("overpass_stream_failed", error=str(e), error_type=type(e).__name__)
+        yield _ndjson({'type': 'error', 'error': f'Upstream query failed: {e}', 'count': count})
+        return
+
+    tile_cache.store_block(block, amenities, fetched)
+    profiler.tag(places=size_bucket(count))
+    yield _ndjson({'type': 'end', 'count': count, 'next_cursor': None, 'sorted': False})
 
 @app.route('/nearby', methods=['GET', 'POST'])
 def nearby_healthcare():
     """
     Endpoint to get nearby healthcare facilities
-    Expects: lat, lon, radius (optional, default 5000m)
-    Returns: JSON list of healthcare places
+    Expects: lat, lon, radius (optional, default 5000m),
+             limit (optional, page size: the nearest N places),
+             cursor (optional, next_cursor of the previous page),
+             category (optional, hospital/pharmacy/clinic, comma-separated),
+             stream (optional, respond with NDJSON lines as places are found)
+    Returns: JSON list of healthcare places, nearest first; 503 while the
+             Overpass client sheds load, 502 when Overpass fails
     """
-
-    if request.method == 'POST':
-        data = request.get_json()
-        lat = data.get('lat')
-        lon = data.get('lon')
-        radius = data.get('radius', 5000)
-    else:
-        lat = request.args.get('lat', type=float)
-        lon = request.args.get('lon', type=float)
-        radius = request.args.get('radius', default=5000, type=int)
-
-    # Validate inputs
-    if lat is None or lon is None:
-        return jsonify({
-            'error': 'Missing required parameters: lat and lon'
-        }), 400
-
-    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+    data = request.get_json() if request.method == 'POST' else None
+    params, error = parse_nearby_params(request.method, data, request.args)
+    if error:
         return jsonify({
-            'error': 'Invalid coordinates'
+            'error': error
         }), 400
 
-    if not (100 <= radius <= 50000):
-        return jsonify({
-            'error': 'Radius must be between 100 and 50000 meters'
-        }), 400
+    lat, lon, radius = params['lat'], params['lon'], params['radius']
+    profiler.tag(
+        radius=size_bucket(radius),
+        limit=size_bucket(params['limit']) if params['limit'] is not None else 'none',
+        stream=params['stream']
+    )
+    if params['stream']:
+        return Response(
+            stream_nearby(lat, lon, radius, params['limit'], params['after'], params['amenities']),
+            mimetype='application/x-ndjson',
+            headers=NDJSON_HEADERS
+        )
 
-    # Fetch nearby places
-    places = get_nearby_places(lat, lon, radius)
+    # Fetch nearby places; an upstream failure is a 502/503, not an empty list
+    try:
+        places, next_cursor = get_nearby_page(lat, lon, radius, params['limit'], params['after'], params['amenities'])
+    except requests.exceptions.RequestException as e:
+        body, status = upstream_error(e)
+        return jsonify(body), status
+    profiler.tag(places=size_bucket(len(places)))
+    return jsonify(nearby_response(params, places, next_cursor))
 
-    return jsonify({
-        'success': True,
-        'count': len(places),
-        'places': places,
-        'center': {'lat': lat, 'lon': lon}
-    })
+def geocode(query):
+    """Resolve a place name with Nominatim; raises RequestException on failure"""
+    results = nominatim.request_json(
+        "GET",
+        NOMINATIM_URL,
+        params={
+            'q': query,
+            'format': 'json',
+            'limit': 5
+        },
+        timeout=10
+    )
+    return format_geocode_results(results)
 
 @app.route('/search', methods=['GET'])
 def search_location():
     """
-    Search for a location by name using Nominatim
+    Search for a location by name: from the geocode cache (exact query or
+    place name, or with autocomplete=1 a known-place prefix) or, on a miss,
+    using Nominatim
     Returns: coordinates and display name
     """
     query = request.args.get('query', '')
@@ -159,38 +284,139 @@ def search_location():
             'error': 'Missing query parameter'
         }), 400
 
-    try:
-        response = requests.get(
-            NOMINATIM_URL,
-            params={
-                'q': query,
-                'format': 'json',
-                'limit': 5
-            },
-            headers={'User-Agent': 'HealthcareLocator/1.0'},
-            timeout=10
-        )
-        response.raise_for_status()
-        results = response.json()
+    autocomplete = request.args.get('autocomplete', '').lower() in ('1', 'true', 'yes')
+    locations, source = geocode_cache.lookup(query, autocomplete=autocomplete)
+    if locations is not None:
+        return jsonify({
+            'success': True,
+            'results': locations,
+            'source': source
+        })
 
-        locations = []
-        for result in results:
-            locations.append({
-                'name': result.get('display_name'),
-                'lat': float(result.get('lat')),
-                'lon': float(result.get('lon'))
-            })
+    try:
+        locations = geocode(query)
+        if locations:  # don't pin "no results" for the whole TTL
+            geocode_cache.store(query, locations)
 
         return jsonify({
             'success': True,
-            'results': locations
+            'results': locations,
+            'source': 'nominatim'
         })
 
+    except (CircuitOpenError, UpstreamBusyError) as e:
+        return jsonify({
+            'error': f'Search temporarily unavailable: {str(e)}'
+        }), 503
+
     except requests.exceptions.RequestException as e:
+        log.warning("geocode_failed", **log.input_fields(query, "query"), error=str(e), error_type=type(e).__name__)
         return jsonify({
             'error': f'Search failed: {str(e)}'
         }), 500
 
+@app.route('/search/stats', methods=['GET'])
+def search_stats():
+    """Entries and hit/prefix-hit/miss counters of the geocode cache"""
+    return jsonify(geocode_cache.stats())
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Entries and hit/miss counters of the facility tile cache"""
+    return jsonify(tile_cache.stats())
+
+@app.route('/index/stats', methods=['GET'])
+def index_stats():
+    """Size and coverage of the offline facility index, and live API fallbacks"""
+    if facility_index is None:
+        return jsonify({'loaded': False, 'live_queries': live_queries})
+    return jsonify({'loaded': True, 'live_queries': live_queries, **facility_index.stats()})
+
+def drugs_unavailable():
+    return jsonify({'error': 'Drug catalogue is not loaded (run build_drug_catalogue.py)'}), 503
+
+@app.route('/drugs/shortage', methods=['GET'])
+def drug_shortage():
+    """
+    Shortage risk of one drug
+    Expects: name (brand name, generic name, or a misspelling of either)
+    Returns: the DrugShortageOutput of types/drug-shortage.ts, plus "match"
+             (name/generic/fuzzy and its score), or "found": false with
+             "suggestions"
+    """
+    if drug_index is None:
+        return drugs_unavailable()
+    name = request.args.get('name', '').strip()
+    if not name:
+        return jsonify({'error': 'Missing name parameter'}), 400
+    return jsonify(drug_index.lookup(name))
+
+@app.route('/drugs/shortage/batch', methods=['POST'])
+def drug_shortage_batch():
+    """
+    Shortage risk of every drug of a prescription in one call
+    Expects: {"drugs": ["name", ...]}
+    Returns: one report per name, in input order, and a summary (found,
+             not found, drugs at high risk)
+    """
+    if drug_index is None:
+        return drugs_unavailable()
+    names = (request.get_json(silent=True) or {}).get('drugs')
+    if not isinstance(names, list) or not names or not all(isinstance(n, str) and n.strip() for n in names):
+        return jsonify({'error': "'drugs' must be a non-empty list of drug names"}), 400
+    if len(names) > MAX_DRUG_BATCH:
+        return jsonify({'error': f'Too many drugs: {len(names)} (maximum {MAX_DRUG_BATCH})'}), 413
+    return jsonify(drug_index.lookup_many([n.strip() for n in names]))
+
+@app.route('/drugs/search', methods=['GET'])
+def drug_search():
+    """Catalogue names for autocomplete: query (partial or misspelled), limit (default 10)"""
+    if drug_index is None:
+        return drugs_unavailable()
+    query = request.args.get('query', '')
+    limit = request.args.get('limit', default=10, type=int)
+    return jsonify({'query': query, 'results': drug_index.search(query, max(1, min(limit, 50)))})
+
+@app.route('/drugs/stats', methods=['GET'])
+def drug_stats():
+    """Catalogue size, index sizes and exact/fuzzy/miss counters"""
+    if drug_index is None:
+        return jsonify({'loaded': False})
+    return jsonify({'loaded': True, **drug_index.stats()})
+
+@app.route('/upstream/stats', methods=['GET'])
+def upstream_stats():
+    """Request, retry, coalescing and circuit breaker counters per upstream"""
+    return jsonify({'overpass': overpass.stats(), 'nominatim': nominatim.stats()})
+
+@app.route('/log/stats', methods=['GET'])
+def log_stats():
+    """Settings and written/dropped/sampled-out counters of the structured log"""
+    return jsonify(log.stats())
+
+@app.route('/admin/profile', methods=['GET'])
+def admin_profile():
+    """
+    Stacks sampled from profiled requests, in the collapsed format read by
+    flamegraph.pl and speedscope. ?route=/nearby keeps one route,
+    ?format=json returns per-tag request counts instead, ?reset=1 clears
+    the samples after reading them. Samples are per worker process.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled (ADMIN_TOKEN is not set)'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 401
+    if not profiler.enabled:
+        return jsonify({'error': 'Profiling is disabled (set PROFILE_SAMPLE_RATE or PROFILE_TOKEN)'}), 404
+
+    if request.args.get('format') == 'json':
+        response = jsonify(profiler.stats())
+    else:
+        response = Response(profiler.collapsed(request.args.get('route')), mimetype='text/plain')
+    if request.args.get('reset', '').lower() in ('1', 'true', 'yes'):
+        profiler.reset()
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,281 @@
+# api/async_app.py
+"""
+ASGI (Quart) variant of the healthcare location API.
+
+Serves /nearby, /search and /health with the same JSON contract as the
+Flask app (app.py), but upstream calls go through httpx on an event loop:
+a request waiting up to 30s on Overpass holds a coroutine instead of a
+worker thread, so one process keeps serving while hundreds of upstream
+calls are in flight. The offline index, tile cache, geocode cache and log
+come from shared.py, configured by the same environment variables as
+app.py; the Flask app itself is never imported. Blocking or CPU-bound
+work (geocode cache SQLite calls, offline index lookups, ranking) runs
+on worker threads via asyncio.to_thread, so one large result set never
+stalls the event loop.
+
+    hypercorn async_app:app --bind 0.0.0.0:8000 --workers 2
+"""
+import asyncio
+import json
+import os
+
+import requests
+from quart import Quart, Response, jsonify, request
+from quart_cors import cors
+
+from async_upstream import AsyncUpstreamClient
+from osm import HEALTHCARE_AMENITIES, ElementStreamParser, build_overpass_query, element_to_place
+from pagination import paginate
+from ranking import Deduplicator, rank_places
+from shared import (
+    NDJSON_HEADERS,
+    NOMINATIM_URL,
+    OVERPASS_FALLBACK,
+    OVERPASS_URL,
+    facility_index,
+    format_geocode_results,
+    geocode_cache,
+    log,
+    nearby_response,
+    parse_nearby_params,
+    tile_cache,
+    upstream_error,
+)
+from tile_cache import bbox_around, haversine_m
+from upstream import CircuitOpenError, UpstreamBusyError
+
+app = cors(Quart(__name__), allow_origin="*")
+
+# One process holds many upstream waits, so the Overpass limit is the
+# upstream's own (2 for the public instance); raise it for a self-hosted one
+overpass = AsyncUpstreamClient(
+    "overpass",
+    max_concurrency=int(os.environ.get("OVERPASS_MAX_CONCURRENCY", "2")),
+    retries=int(os.environ.get("UPSTREAM_RETRIES", "2"))
+)
+nominatim = AsyncUpstreamClient(
+    "nominatim",
+    max_concurrency=1,
+    rate_per_second=float(os.environ.get("NOMINATIM_RATE_LIMIT", "1")),
+    retries=int(os.environ.get("UPSTREAM_RETRIES", "2"))
+)
+
+# Changed only by coroutines, i.e. on the event loop thread, never inside
+# the functions handed to asyncio.to_thread
+live_queries = 0
+
+@app.after_serving
+async def close_clients():
+    await overpass.aclose()
+    await nominatim.aclose()
+
+async def fetch_places_in_bbox(bbox, amenities=HEALTHCARE_AMENITIES):
+    """Query Overpass for facilities in a bbox; raises RequestException on failure"""
+    data = await overpass.request_json(
+        "POST",
+        OVERPASS_URL,
+        data=build_overpass_query(bbox, amenities),
+        timeout=30
+    )
+
+    places = []
+    for element in data.get('elements', []):
+        converted = element_to_place(element)
+        if converted is not None:
+            places.append(converted)
+    return places
+
+async def get_nearby_places(lat, lon, radius=5000, amenities=HEALTHCARE_AMENITIES, limit=None):
+    """
+    Async get_nearby_places of app.py: offline index, else tile cache and
+    Overpass. Raises RequestException when Overpass fails.
+    """
+    global live_queries
+    if facility_index is not None and facility_index.covers(lat, lon, radius):
+        return await asyncio.to_thread(facility_index.nearby, lat, lon, radius, amenities, limit)
+    if not OVERPASS_FALLBACK:
+        return []
+
+    live_queries += 1
+    found, block = tile_cache.split(bbox_around(lat, lon, radius), amenities)
+    if block is not None:
+        try:
+            fetched = await fetch_places_in_bbox(tile_cache.block_bbox(block), amenities)
+        except requests.exceptions.RequestException as e:
+            log.warning("overpass_failed", error=str(e), error_type=type(e).__name__)
+            raise
+        found.extend(tile_cache.store_block(block, amenities, fetched))
+
+    return await asyncio.to_thread(rank_places, lat, lon, radius, found, limit)
+
+async def get_nearby_page(lat, lon, radius, limit=None, after=None, amenities=HEALTHCARE_AMENITIES):
+    """One page of nearby places, nearest first: (places, next_cursor)"""
+    if after is None and limit is not None:
+        places = await get_nearby_places(lat, lon, radius, amenities, limit=limit + 1)
+    else:
+        places = await get_nearby_places(lat, lon, radius, amenities)
+    return paginate(places, lat, lon, radius, amenities, limit, after)
+
+def _ndjson(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
+
+async def stream_nearby(lat, lon, radius, limit=None, after=None, amenities=HEALTHCARE_AMENITIES):
+    """NDJSON lines for /nearby?stream=1; see stream_nearby in app.py"""
+    global live_queries
+    yield _ndjson({'type': 'meta', 'center': {'lat': lat, 'lon': lon}, 'radius': radius})
+
+    block = None
+    paged = limit is not None or after is not None
+    from_index = facility_index is not None and facility_index.covers(lat, lon, radius)
+    if not paged and not from_index and OVERPASS_FALLBACK:
+        cached, block = tile_cache.split(bbox_around(lat, lon, radius), amenities)
+
+    if block is None:
+        try:
+            places, next_cursor = await get_nearby_page(lat, lon, radius, limit, after, amenities)
+        except requests.exceptions.RequestException as e:
+            yield _ndjson({'type': 'error', 'error': upstream_error(e)[0]['error'], 'count': 0})
+            return
+        for place in places:
+            yield _ndjson({'type': 'place', **place})
+        yield _ndjson({'type': 'end', 'count': len(places), 'next_cursor': next_cursor, 'sorted': True})
+        return
+
+    live_queries += 1
+    count = 0
+    deduplicator = Deduplicator()
+    for place in await asyncio.to_thread(rank_places, lat, lon, radius, cached, threshold_m=0):
+        if deduplicator.add(place):
+            count += 1
+            yield _ndjson({'type': 'place', **place})
+
+    wanted = frozenset(amenities)
+    fetched = []
+    parser = ElementStreamParser()
+    try:
+        async with overpass.stream(
+            "POST",
+            OVERPASS_URL,
+            data=build_overpass_query(tile_cache.block_bbox(block), amenities),
+            timeout=30
+        ) as response:
+            async for chunk in response.aiter_bytes(65536):
+                lines = []
+                for element in parser.feed(chunk):
+                    converted = element_to_place(element)
+                    if converted is None:
+                        continue
+                    fetched.append(converted)
+                    amenity, place = converted
+                    if amenity not in wanted or not tile_cache.place_in_block(block, place):
+                        continue
+                    distance = haversine_m(lat, lon, place['lat'], place['lon'])
+                    if distance > radius:
+                        continue
+                    place = dict(place, distance=round(distance, 1))
+                    if deduplicator.add(place):
+                        lines.append(_ndjson({'type': 'place', **place}))
+                if lines:
+                    count += len(lines)
+                    yield ''.join(lines)
+            parser.close()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log.warning("overpass_stream_failed", error=str(e), error_type=type(e).__name__)
+        yield _ndjson({'type': 'error', 'error': f'Upstream query failed: {e}', 'count': count})
+        return
+
+    tile_cache.store_block(block, amenities, fetched)
+    yield _ndjson({'type': 'end', 'count': count, 'next_cursor': None, 'sorted': False})
+
+@app.route('/nearby', methods=['GET', 'POST'])
+async def nearby_healthcare():
+    """Nearby healthcare facilities; parameters and response as in app.py"""
+    data = await request.get_json() if request.method == 'POST' else None
+    params, error = parse_nearby_params(request.method, data, request.args)
+    if error:
+        return jsonify({
+            'error': error
+        }), 400
+
+    lat, lon, radius = params['lat'], params['lon'], params['radius']
+    if params['stream']:
+        return Response(
+            stream_nearby(lat, lon, radius, params['limit'], params['after'], params['amenities']),
+            mimetype='application/x-ndjson',
+            headers=NDJSON_HEADERS
+        )
+
+    try:
+        places, next_cursor = await get_nearby_page(lat, lon, radius, params['limit'], params['after'], params['amenities'])
+    except requests.exceptions.RequestException as e:
+        body, status = upstream_error(e)
+        return jsonify(body), status
+    return jsonify(nearby_response(params, places, next_cursor))
+
+async def geocode(query):
+    """Resolve a place name with Nominatim; raises RequestException on failure"""
+    results = await nominatim.request_json(
+        "GET",
+        NOMINATIM_URL,
+        params={
+            'q': query,
+            'format': 'json',
+            'limit': 5
+        },
+        timeout=10
+    )
+    return format_geocode_results(results)
+
+@app.route('/search', methods=['GET'])
+async def search_location():
+    """Search for a location by name: geocode cache, else Nominatim"""
+    query = request.args.get('query', '')
+
+    if not query:
+        return jsonify({
+            'error': 'Missing query parameter'
+        }), 400
+
+    autocomplete = request.args.get('autocomplete', '').lower() in ('1', 'true', 'yes')
+    locations, source = await asyncio.to_thread(geocode_cache.lookup, query, autocomplete=autocomplete)
+    if locations is not None:
+        return jsonify({
+            'success': True,
+            'results': locations,
+            'source': source
+        })
+
+    try:
+        locations = await geocode(query)
+        if locations:
+            await asyncio.to_thread(geocode_cache.store, query, locations)
+
+        return jsonify({
+            'success': True,
+            'results': locations,
+            'source': 'nominatim'
+        })
+
+    except (CircuitOpenError, UpstreamBusyError) as e:
+        return jsonify({
+            'error': f'Search temporarily unavailable: {str(e)}'
+        }), 503
+
+    except requests.exceptions.RequestException as e:
+        log.warning("geocode_failed", **log.input_fields(query, "query"), error=str(e), error_type=type(e).__name__)
+        return jsonify({
+            'error': f'Search failed: {str(e)}'
+        }), 500
+
+@app.route('/upstream/stats', methods=['GET'])
+async def upstream_stats():
+    """Request, retry, coalescing and circuit breaker counters per upstream"""
+    return jsonify({'overpass': overpass.stats(), 'nominatim': nominatim.stats()})
+
+@app.route('/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return jsonify({'status': 'healthy'})
+
+if __name__ == '__main__':
+    app.run(debug=True, port=8000)
@@ -0,0 +1,271 @@
+# api/async_upstream.py
+"""
+asyncio counterpart of upstream.UpstreamClient for the ASGI app, built on
+httpx.AsyncClient.
+
+Same behaviour (pooled keep-alive connections, single-flight, concurrency
+and rate limits, retries with backoff, circuit breaker) and the same
+errors: everything raised is a requests RequestException, so async_app.py
+shares the error handling of app.py. A request waiting on the upstream
+holds no thread, only a coroutine, so one process can keep hundreds of
+upstream calls in flight.
+
+The client, pool and semaphore are bound to the event loop they are first
+used on; call `aclose()` when the loop shuts down.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import requests
+
+from upstream import (
+    RETRY_STATUSES,
+    USER_AGENT,
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamBusyError,
+    _is_client_error,
+)
+
+
+class AsyncRateLimiter:
+    """Spaces calls at least 1/rate seconds apart (one event loop)"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self._next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncSingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key await its outcome"""
+
+    def __init__(self):
+        self._flights = {}
+        self.shared = 0
+
+    async def do(self, key, fn):
+        task = self._flights.get(key)
+        if task is None:
+            task = self._flights[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        # A caller that is cancelled (client went away) must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller was cancelled
+
+
+def _as_requests_error(error):
+    """The requests exception matching an httpx transport error"""
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(error) or type(error).__name__)
+    return requests.exceptions.ConnectionError(str(error) or type(error).__name__)
+
+
+class AsyncUpstreamClient:
+    """
+    Client for one upstream service; see the module docstring and
+    upstream.UpstreamClient for the parameters.
+
+    `request_json()` returns the decoded JSON body. Results shared through
+    single-flight are the same object for every caller: treat them as
+    read-only.
+    """
+
+    def __init__(self, name, max_concurrency=4, rate_per_second=None, retries=2,
+                 backoff=0.5, max_backoff=8.0, queue_timeout=10.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_timeout = queue_timeout
+
+        self.rate_limiter = AsyncRateLimiter(rate_per_second) if rate_per_second else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._flight = AsyncSingleFlight()
+        self._client = None
+        self._slots = None
+        self._loop = None
+
+        self.calls = 0
+        self.upstream_requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.rejected_open = 0
+        self.rejected_busy = 0
+        self.in_flight = 0
+
+    def _get_client(self):
+        # Created lazily on the running loop: httpx pools and asyncio
+        # primitives cannot be shared between loops
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency)
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._flight = AsyncSingleFlight()
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def request_json(self, method, url, params=None, data=None, timeout=30):
+        """Perform (or join an identical in-flight) request and return its JSON body"""
+        self.calls += 1
+        self._get_client()
+        key = (method, url, tuple(sorted((params or {}).items())), data)
+        return await self._flight.do(key, lambda: self._call(method, url, params, data, timeout))
+
+    async def _call(self, method, url, params, data, timeout):
+        await self._acquire()
+        try:
+            response = await self._send(method, url, params, data, timeout)
+            body = response.json()
+        except ValueError as e:
+            error = requests.exceptions.InvalidJSONError(f"{self.name}: invalid JSON: {e}")
+            self._record_failure(error)
+            raise error from e
+        except requests.exceptions.RequestException as e:
+            self._record_failure(e)
+            raise
+        except BaseException:
+            self.breaker.release_trial()  # cancelled: no outcome to record
+            raise
+        finally:
+            self._release()
+
+        self.breaker.record_success()
+        return body
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, data=None, timeout=30):
+        """
+        Streaming request: yields the response with its body not yet read
+        (use aiter_bytes). Not coalesced, and retried only until the body
+        starts; the concurrency slot is held until the block exits.
+        """
+        self.calls += 1
+        await self._acquire()
+        response = None
+        try:
+            response = await self._send(method, url, params, data, timeout, stream=True)
+            try:
+                yield response
+            except httpx.TransportError as e:
+                raise _as_requests_error(e) from e
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self._record_failure(e)
+            raise
+        except BaseException:
+            self.breaker.release_trial()  # consumer stopped early (e.g. client went away)
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            if response is not None:
+                await response.aclose()
+            self._release()
+
+    async def _acquire(self):
+        """Pass the circuit breaker and take a concurrency slot, or raise"""
+        if not self.breaker.allow():
+            self.rejected_open += 1
+            raise CircuitOpenError(f"{self.name}: circuit open after repeated failures")
+
+        self._get_client()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_busy += 1
+            self.breaker.release_trial()  # not the upstream's fault
+            raise UpstreamBusyError(
+                f"{self.name}: no free connection slot within {self.queue_timeout}s"
+            ) from None
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _record_failure(self, error):
+        self.failures += 1
+        if _is_client_error(error):
+            self.breaker.record_success()  # the upstream answered; the request was bad
+        else:
+            self.breaker.record_failure()
+
+    async def _send(self, method, url, params, data, timeout, stream=False):
+        """Send with retries; returns a successful (2xx/3xx) response"""
+        client = self._get_client()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.wait()
+            self.upstream_requests += 1
+
+            retry_after = None
+            try:
+                request = client.build_request(method, url, params=params, data=data, timeout=timeout)
+                response = await client.send(request, stream=stream)
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code < 400:
+                        return response
+                    await response.aclose()
+                    raise requests.exceptions.HTTPError(
+                        f"{self.name}: HTTP {response.status_code}", response=response
+                    )
+                retry_after = response.headers.get("Retry-After")
+                await response.aclose()
+                error = requests.exceptions.HTTPError(
+                    f"{self.name}: HTTP {response.status_code}", response=response
+                )
+            except httpx.TransportError as e:
+                error = _as_requests_error(e)
+
+            if attempt >= self.retries:
+                raise error
+            attempt += 1
+            self.retried += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            if retry_after is not None and retry_after.isdigit():
+                delay = min(self.max_backoff, max(delay, float(retry_after)))
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": (1.0 / self.rate_limiter.interval) if self.rate_limiter else None,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "calls": self.calls,
+            "upstream_requests": self.upstream_requests,
+            "shared_in_flight": self._flight.shared,
+            "retried": self.retried,
+            "failures": self.failures,
+            "rejected_circuit_open": self.rejected_open,
+            "rejected_busy": self.rejected_busy,
+            "in_flight": self.in_flight,
+        }
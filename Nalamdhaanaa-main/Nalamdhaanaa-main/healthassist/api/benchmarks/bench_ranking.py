@@ -0,0 +1,156 @@
+# api/benchmarks/bench_ranking.py
+# Run from the api directory: python -m benchmarks.bench_ranking
+"""
+Speed and parity of /nearby post-processing on large result sets.
+
+Builds synthetic candidate lists (default 10,000 places around a center,
+about 15% of them mapped twice: node + building way a few meters apart)
+and measures:
+  * distances alone: one Python haversine per place against one
+    ranking.haversine_many call
+  * distances + radius filter + sort: the Python loop against rank_places
+    without duplicate removal (both copy every result dict)
+  * duplicate removal: pairwise comparison (O(n^2), on a subset) against
+    the grid-based ranking.dedupe; the two must keep the same places
+  * the full rank_places pipeline, for all results and for a first page
+Results are printed as JSON (median milliseconds over --runs).
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from ranking import (
+    DEDUPE_DISTANCE_M,
+    UNNAMED_DISTANCE_FRACTION,
+    _merge,
+    _name_key,
+    dedupe,
+    haversine_many,
+    rank_places,
+)
+from tile_cache import haversine_m
+
+CENTER = (12.9716, 77.5946)
+CATEGORIES = ("hospital", "pharmacy", "clinic")
+
+
+def synthetic_places(count, radius_m, duplicate_share=0.15, seed=7):
+    """`count` places within about radius_m of CENTER, some of them mapped twice"""
+    rng = random.Random(seed)
+    deg = radius_m / 111320.0
+    places = []
+    next_id = 1
+    while len(places) < count:
+        lat = CENTER[0] + rng.uniform(-deg, deg)
+        lon = CENTER[1] + rng.uniform(-deg, deg)
+        category = rng.choice(CATEGORIES)
+        name = f"{category.title()} {rng.randrange(400)}" if rng.random() < 0.9 else f"Unnamed {category.title()}"
+        place = {"id": next_id, "name": name, "address": "Address not available", "category": category,
+                 "lat": lat, "lon": lon, "phone": "", "website": "", "opening_hours": ""}
+        next_id += 1
+        places.append(place)
+        if rng.random() < duplicate_share and len(places) < count:
+            # The building outline: same facility, center a few meters away
+            twin = dict(place, id=next_id, lat=lat + rng.uniform(-3e-4, 3e-4),
+                        lon=lon + rng.uniform(-3e-4, 3e-4), phone="+91 80 1234 5678")
+            next_id += 1
+            places.append(twin)
+    rng.shuffle(places)
+    return places
+
+
+def python_rank(lat, lon, radius_m, places):
+    """Per-place haversine, filter and sort (the pre-NumPy implementation)"""
+    results = []
+    for place in places:
+        distance = haversine_m(lat, lon, place["lat"], place["lon"])
+        if distance <= radius_m:
+            results.append(dict(place, distance=round(distance, 1)))
+    results.sort(key=lambda place: (place["distance"], place["id"]))
+    return results
+
+
+def pairwise_dedupe(places, threshold_m=DEDUPE_DISTANCE_M):
+    """Reference duplicate removal comparing every pair"""
+    kept = []
+    for place in places:
+        name = _name_key(place)
+        limit = threshold_m if name is not None else threshold_m * UNNAMED_DISTANCE_FRACTION
+        for other in kept:
+            if (_name_key(other) == name and other["category"] == place["category"]
+                    and haversine_m(place["lat"], place["lon"], other["lat"], other["lon"]) <= limit):
+                _merge(other, place)
+                break
+        else:
+            kept.append(place)
+    return kept
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, round(1000 * statistics.median(timings), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /nearby ranking and duplicate removal")
+    parser.add_argument("--places", type=int, default=10000)
+    parser.add_argument("--radius", type=float, default=20000.0)
+    parser.add_argument("--pairwise-places", type=int, default=2000,
+                        help="subset size for the O(n^2) reference")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lat, lon = CENTER
+    places = synthetic_places(args.places, args.radius)
+
+    lats = np.array([place["lat"] for place in places])
+    lons = np.array([place["lon"] for place in places])
+    _, loop_ms = timed(lambda: [haversine_m(lat, lon, p["lat"], p["lon"]) for p in places], args.runs)
+    _, vector_ms = timed(lambda: haversine_many(lat, lon, lats, lons), args.runs)
+
+    python_ranked, python_ms = timed(lambda: python_rank(lat, lon, args.radius, places), args.runs)
+    numpy_ranked, numpy_ms = timed(lambda: rank_places(lat, lon, args.radius, places, threshold_m=0), args.runs)
+    if [(p["id"], p["distance"]) for p in python_ranked] != [(p["id"], p["distance"]) for p in numpy_ranked]:
+        sys.exit("Parity check failed: ranking differs from the Python reference")
+
+    subset = python_rank(lat, lon, args.radius, places[:args.pairwise_places])
+    pairwise, pairwise_ms = timed(lambda: pairwise_dedupe([dict(p) for p in subset]), 1)
+    grid_subset, grid_subset_ms = timed(lambda: dedupe([dict(p) for p in subset]), args.runs)
+    if [p["id"] for p in pairwise] != [p["id"] for p in grid_subset]:
+        sys.exit("Parity check failed: grid dedupe keeps different places than the pairwise reference")
+
+    grid_full, grid_full_ms = timed(lambda: dedupe([dict(p) for p in numpy_ranked]), args.runs)
+    ranked, pipeline_ms = timed(lambda: rank_places(lat, lon, args.radius, places), args.runs)
+    _, page_ms = timed(lambda: rank_places(lat, lon, args.radius, places, limit=20), args.runs)
+
+    report = {
+        "places": len(places),
+        "within_radius": len(numpy_ranked),
+        "after_dedupe": len(ranked),
+        "haversine_ms": {"python_loop": loop_ms, "numpy": vector_ms,
+                         "speedup": round(loop_ms / vector_ms, 1)},
+        "distance_filter_sort_ms": {"python": python_ms, "numpy": numpy_ms,
+                                    "speedup": round(python_ms / numpy_ms, 1)},
+        "dedupe_ms": {
+            "pairwise_subset": {"places": len(subset), "ms": pairwise_ms},
+            "grid_subset": {"places": len(subset), "ms": grid_subset_ms},
+            "grid_full": {"places": len(numpy_ranked), "ms": grid_full_ms},
+        },
+        "rank_places_ms": {"all": pipeline_ms, "limit_20": page_ms},
+        "parity": {"ranking": "ok", "dedupe_subset": "ok", "removed_in_subset": len(subset) - len(pairwise)},
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
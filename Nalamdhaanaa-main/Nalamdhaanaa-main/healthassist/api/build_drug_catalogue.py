@@ -0,0 +1,76 @@
+# api/build_drug_catalogue.py
+"""
+Export the drug catalogue of the frontend (lib/drugs.ts) to the JSON file
+loaded by app.py (DRUG_CATALOGUE_PATH), so both read the same data:
+    python build_drug_catalogue.py                      # ../lib/drugs.ts -> data/drugs.json
+    python build_drug_catalogue.py path/to/drugs.ts -o data/drugs.json
+
+drugs.ts holds a plain object literal (`export const drugs: Drug[] = [...]`);
+its unquoted keys and trailing commas are rewritten to JSON, and each entry
+is checked for the fields the service needs. Re-run after editing drugs.ts.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REQUIRED_FIELDS = {
+    "name": str,
+    "generic_name": str,
+    "category": str,
+    "shortage_risk": (int, float),
+    "risk_factors": list,
+    "alternatives": list,
+    "average_price": (int, float)
+}
+
+_ARRAY = re.compile(r"export\s+const\s+drugs\s*(?::[^=]+)?=\s*(\[.*\])\s*;?\s*$", re.S)
+_KEY = re.compile(r"([{,]\s*)([A-Za-z_]\w*)\s*:")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def parse_drugs_ts(source):
+    """The `drugs` array of a drugs.ts source as Python objects"""
+    match = _ARRAY.search(source)
+    if match is None:
+        raise ValueError("no `export const drugs = [...]` array found")
+    literal = _TRAILING_COMMA.sub(r"\1", _KEY.sub(r'\1"\2":', match.group(1)))
+    return json.loads(literal)
+
+
+def validate(drugs):
+    names = set()
+    for position, drug in enumerate(drugs):
+        for field, kind in REQUIRED_FIELDS.items():
+            if not isinstance(drug.get(field), kind):
+                raise ValueError(f"drug #{position} ({drug.get('name')!r}): missing or invalid {field!r}")
+        for alternative in drug["alternatives"]:
+            if not isinstance(alternative.get("name"), str) or not isinstance(alternative.get("price"), (int, float)):
+                raise ValueError(f"drug {drug['name']!r}: alternatives need a name and a price")
+        if drug["name"].lower() in names:
+            raise ValueError(f"duplicate drug name {drug['name']!r}")
+        names.add(drug["name"].lower())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export lib/drugs.ts to the drug catalogue JSON")
+    parser.add_argument("source", nargs="?", default=os.path.join(API_DIR, "..", "lib", "drugs.ts"))
+    parser.add_argument("-o", "--output", default=os.path.join(API_DIR, "data", "drugs.json"))
+    args = parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        drugs = parse_drugs_ts(f.read())
+    validate(drugs)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(drugs, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"Wrote {len(drugs)} drugs to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# api/build_facility_index.py
+"""
+Build the offline facility snapshot loaded by app.py (FACILITY_INDEX_PATH).
+
+From Overpass JSON exports (e.g. saved from overpass-turbo, or the output
+of the query in osm.build_overpass_query):
+    python build_facility_index.py exports/*.json -o data/facilities.json.gz \
+        --coverage 12.8,77.4,13.1,77.8
+
+Or download a region from OVERPASS_URL (split into tiles of --tile-deg):
+    python build_facility_index.py --bbox 12.8,77.4,13.1,77.8 -o data/facilities.json.gz
+
+Elements are de-duplicated by (type, id), then facilities mapped twice
+(node and building way with the same name and category, within 100 m) are
+merged (ranking.Deduplicator). --coverage declares the areas the
+snapshot is complete for (repeatable); without it the bounding box of the
+downloaded regions, or of the imported facilities, is used.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+
+from facility_index import write_snapshot
+from osm import HEALTHCARE_AMENITIES, build_overpass_query, element_to_place
+from ranking import Deduplicator
+
+OVERPASS_URL = os.environ.get("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+
+
+def parse_bbox(text):
+    south, west, north, east = (float(v) for v in text.split(","))
+    if not (south < north and west < east):
+        raise argparse.ArgumentTypeError(f"expected south,west,north,east: {text}")
+    return south, west, north, east
+
+
+def split_bbox(bbox, step):
+    south, west, north, east = bbox
+    lat = south
+    while lat < north:
+        lon = west
+        while lon < east:
+            yield lat, lon, min(north, lat + step), min(east, lon + step)
+            lon += step
+        lat += step
+
+
+def download_elements(bbox, tile_deg, pause):
+    """Overpass elements for a region, one query per tile"""
+    tiles = list(split_bbox(bbox, tile_deg))
+    for number, tile in enumerate(tiles, 1):
+        response = requests.post(
+            OVERPASS_URL,
+            data=build_overpass_query(tile, HEALTHCARE_AMENITIES),
+            headers={"User-Agent": "HealthcareLocator/1.0"},
+            timeout=180
+        )
+        response.raise_for_status()
+        elements = response.json().get("elements", [])
+        print(f"  tile {number}/{len(tiles)}: {len(elements)} elements", file=sys.stderr)
+        yield from elements
+        if pause and number < len(tiles):
+            time.sleep(pause)  # be polite to the public Overpass instance
+
+
+def read_elements(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("elements", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline healthcare facility snapshot")
+    parser.add_argument("inputs", nargs="*", help="Overpass JSON files")
+    parser.add_argument("-o", "--output", required=True, help="snapshot path (.json or .json.gz)")
+    parser.add_argument("--bbox", type=parse_bbox, action="append", default=[],
+                        help="download south,west,north,east from OVERPASS_URL (repeatable)")
+    parser.add_argument("--coverage", type=parse_bbox, action="append", default=[],
+                        help="area the snapshot is complete for (repeatable)")
+    parser.add_argument("--tile-deg", type=float, default=0.25, help="download tile size in degrees")
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds between download queries")
+    args = parser.parse_args()
+
+    if not args.inputs and not args.bbox:
+        parser.error("give Overpass JSON files and/or --bbox")
+
+    seen = set()
+    facilities = []
+    amenities = set(HEALTHCARE_AMENITIES)
+
+    def add(elements):
+        for element in elements:
+            key = (element.get("type"), element.get("id"))
+            if key in seen:
+                continue
+            converted = element_to_place(element)
+            if converted is None or converted[0] not in amenities:
+                continue
+            seen.add(key)
+            facilities.append(converted)
+
+    for path in args.inputs:
+        add(read_elements(path))
+    for bbox in args.bbox:
+        print(f"Downloading {bbox} from {OVERPASS_URL}", file=sys.stderr)
+        add(download_elements(bbox, args.tile_deg, args.pause))
+
+    deduplicator = Deduplicator()
+    facilities = [(amenity, place) for amenity, place in facilities if deduplicator.add(place)]
+    if deduplicator.duplicates:
+        print(f"Merged {deduplicator.duplicates} duplicate facilities", file=sys.stderr)
+
+    coverage = args.coverage or args.bbox
+    if not coverage and facilities:
+        lats = [place["lat"] for _, place in facilities]
+        lons = [place["lon"] for _, place in facilities]
+        coverage = [(min(lats), min(lons), max(lats), max(lons))]
+
+    sources = [os.path.basename(path) for path in args.inputs]
+    sources += [f"overpass:{','.join(map(str, bbox))}" for bbox in args.bbox]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    tmp_path = args.output + ".tmp" + (".gz" if args.output.endswith(".gz") else "")
+    write_snapshot(tmp_path, facilities, coverage, sources,
+                   built_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    os.replace(tmp_path, args.output)
+
+    counts = Counter(amenity for amenity, _ in facilities)
+    print(f"Wrote {len(facilities)} facilities to {args.output}: "
+          + ", ".join(f"{amenity} {counts[amenity]}" for amenity in HEALTHCARE_AMENITIES))
+
+
+if __name__ == "__main__":
+    main()
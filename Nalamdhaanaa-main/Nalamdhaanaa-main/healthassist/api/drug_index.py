@@ -0,0 +1,284 @@
+# api/drug_index.py
+"""
+In-memory drug catalogue with shortage-risk reports, built once at startup
+from data/drugs.json (exported from lib/drugs.ts by build_drug_catalogue.py).
+
+Lookups go through hash maps of normalized brand names and generic names;
+anything else falls back to a trigram index, so typos and partial names
+("amoxicilin", "paracetamol") still resolve. The report of every drug
+(risk level, days until shortage, cheapest alternative, savings,
+recommendations) is computed when the catalogue is loaded, in the
+DrugShortageOutput shape of types/drug-shortage.ts; a lookup only adds the
+estimated shortage date and how the query matched.
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+# Minimum trigram similarity (shared / union, as in pg_trgm) of a fuzzy match
+FUZZY_THRESHOLD = 0.3
+# Weaker matches are still offered as "did you mean" suggestions
+SUGGESTION_THRESHOLD = 0.15
+MAX_SUGGESTIONS = 3
+
+SHORTAGE_HORIZON_DAYS = 180
+
+_NON_WORD = re.compile(r"[^a-z0-9.]+")
+_STRENGTH = re.compile(r"(\d)\s+(mg|mcg|g|ml|iu)\b")
+
+
+def normalize(text):
+    """Lowercase, punctuation to spaces, '500 mg' -> '500mg'"""
+    text = _NON_WORD.sub(" ", text.lower()).strip()
+    return _STRENGTH.sub(r"\1\2", text)
+
+
+def trigrams(text):
+    """Trigrams of each word padded with two spaces in front and one after"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def risk_level(score):
+    if score >= 0.7:
+        return "HIGH", "🔴"
+    if score >= 0.4:
+        return "MEDIUM", "🟡"
+    return "LOW", "🟢"
+
+
+def _recommendations(level, drug):
+    recommendations = []
+    if level == "HIGH":
+        recommendations.append({
+            "priority": "URGENT",
+            "action": "Stock up immediately",
+            "details": f"Purchase a 2-3 month supply of {drug['name']} from multiple pharmacies to ensure availability."
+        })
+    first_alternative = drug["alternatives"][0]["name"] if drug["alternatives"] else "alternative medications"
+    recommendations.append({
+        "priority": "HIGH" if level == "HIGH" else "MEDIUM",
+        "action": "Consider alternatives",
+        "details": f"Consult your doctor about switching to {first_alternative}."
+    })
+    recommendations.append({
+        "priority": "LOW",
+        "action": "Monitor regularly",
+        "details": "Check back weekly for updated shortage predictions and availability status."
+    })
+    return recommendations
+
+
+def build_report(drug):
+    """Shortage report of one catalogue entry, without the date-dependent field"""
+    score = drug["shortage_risk"]
+    level, icon = risk_level(score)
+    cheapest = None
+    for alternative in drug["alternatives"]:
+        # On equal prices the later one wins, as in the frontend's reduce()
+        if cheapest is None or alternative["price"] <= cheapest["price"]:
+            cheapest = alternative
+    savings = max(0, (drug["average_price"] - cheapest["price"]) * 30) if cheapest else 0
+    return {
+        "found": True,
+        "drugName": drug["name"],
+        "genericName": drug["generic_name"],
+        "category": drug["category"],
+        "shortageRisk": {
+            "level": level,
+            "score": score,
+            "percentage": f"{math.floor(score * 100 + 0.5)}%",  # Math.round
+            "icon": icon
+        },
+        "warning": f"{level} risk of shortage detected for {drug['name']}",
+        "daysUntilShortage": max(1, math.floor((1 - score) * SHORTAGE_HORIZON_DAYS)),
+        "pricing": {
+            "currentPrice": f"₹{drug['average_price']}",
+            "cheapestAlternative": cheapest["name"] if cheapest else "",
+            "monthlySavings": f"₹{savings:.0f}"
+        },
+        "alternatives": drug["alternatives"],
+        "riskFactors": drug["risk_factors"],
+        "recommendations": _recommendations(level, drug)
+    }
+
+
+def not_found_report(query, suggestions=()):
+    return {
+        "found": False,
+        "drugName": query,
+        "genericName": "",
+        "category": "",
+        "shortageRisk": {"level": "UNKNOWN", "score": 0, "percentage": "0%", "icon": "❓"},
+        "warning": "",
+        "daysUntilShortage": 0,
+        "estimatedShortageDate": "",
+        "pricing": {"currentPrice": "", "cheapestAlternative": "", "monthlySavings": ""},
+        "alternatives": [],
+        "riskFactors": [],
+        "recommendations": [],
+        "suggestions": list(suggestions)
+    }
+
+
+class DrugIndex:
+    """
+    Catalogue entries indexed by exact name, exact generic name and
+    trigram. `lookup()` resolves one query to a report, `lookup_many()` a
+    whole prescription list, `search()` ranks names for autocomplete.
+    """
+
+    def __init__(self, drugs):
+        self.drugs = list(drugs)
+        self._reports = [build_report(drug) for drug in self.drugs]
+
+        self._by_name = {}
+        self._by_generic = {}
+        for position, drug in enumerate(self.drugs):
+            self._by_name.setdefault(normalize(drug["name"]), position)
+            # Several brands can share a generic; the first listed one answers
+            self._by_generic.setdefault(normalize(drug["generic_name"]), position)
+
+        # Fuzzy keys: every name and generic name, with their trigram sets
+        self._keys = []
+        self._trigrams = {}
+        for position, drug in enumerate(self.drugs):
+            for text in {normalize(drug["name"]), normalize(drug["generic_name"])}:
+                grams = trigrams(text)
+                key_id = len(self._keys)
+                self._keys.append((position, text, len(grams)))
+                for gram in grams:
+                    self._trigrams.setdefault(gram, []).append(key_id)
+
+        # Lookups run on many request threads at once
+        self._counter_lock = threading.Lock()
+        self.lookups = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _similar(self, query):
+        """[(similarity, position, key text)] of keys sharing trigrams with `query`, best first"""
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        best = {}
+        for key_id, count in shared.items():
+            position, text, size = self._keys[key_id]
+            similarity = count / (len(grams) + size - count)
+            if similarity > best.get(position, (0,))[0]:
+                best[position] = (similarity, text)
+        return sorted(
+            ((similarity, position, text) for position, (similarity, text) in best.items()),
+            key=lambda match: (-match[0], match[1])
+        )
+
+    def _resolve(self, query):
+        """(position or None, match description, suggestions)"""
+        key = normalize(query)
+        position = self._by_name.get(key)
+        if position is not None:
+            return position, {"type": "name", "score": 1.0}, ()
+        position = self._by_generic.get(key)
+        if position is not None:
+            return position, {"type": "generic", "score": 1.0}, ()
+
+        matches = self._similar(key) if key else []
+        if matches and matches[0][0] >= FUZZY_THRESHOLD:
+            similarity, position, _ = matches[0]
+            return position, {"type": "fuzzy", "score": round(similarity, 3)}, ()
+        suggestions = [
+            self.drugs[position]["name"]
+            for similarity, position, _ in matches[:MAX_SUGGESTIONS]
+            if similarity >= SUGGESTION_THRESHOLD
+        ]
+        return None, None, suggestions
+
+    def _report(self, query, resolved, today):
+        position, match, suggestions = resolved
+        with self._counter_lock:
+            self.lookups += 1
+            if position is None:
+                self.misses += 1
+            elif match["type"] == "fuzzy":
+                self.fuzzy_hits += 1
+            else:
+                self.exact_hits += 1
+        if position is None:
+            return not_found_report(query, suggestions)
+        report = self._reports[position]
+        shortage_date = today + timedelta(days=report["daysUntilShortage"])
+        return {**report, "estimatedShortageDate": shortage_date.isoformat(), "query": query, "match": match}
+
+    def lookup(self, query):
+        """Shortage report for a drug name, generic name or misspelling of either"""
+        return self._report(query, self._resolve(query), date.today())
+
+    def lookup_many(self, queries):
+        """
+        Reports for a prescription list, in input order, and a summary:
+        how many were found and which of them are at high shortage risk.
+        Repeated names are resolved once.
+        """
+        today = date.today()
+        resolved = {}
+        results = []
+        for query in queries:
+            key = normalize(query)
+            if key not in resolved:
+                resolved[key] = self._resolve(query)
+            results.append(self._report(query, resolved[key], today))
+
+        found = [result for result in results if result["found"]]
+        return {
+            "count": len(results),
+            "results": results,
+            "summary": {
+                "found": len(found),
+                "not_found": len(results) - len(found),
+                "high_risk": sorted({r["drugName"] for r in found if r["shortageRisk"]["level"] == "HIGH"})
+            }
+        }
+
+    def search(self, query, limit=10):
+        """
+        Catalogue names for autocomplete, best first: names containing the
+        query (prefixes first), then similar spellings.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        ranked = []
+        for similarity, position, text in self._similar(key):
+            if key in text:
+                ranked.append((0 if text.startswith(key) else 1, -similarity, position))
+            elif similarity >= SUGGESTION_THRESHOLD:
+                ranked.append((2, -similarity, position))
+        ranked.sort()
+        return [self.drugs[position]["name"] for _, _, position in ranked[:limit]]
+
+    def stats(self):
+        with self._counter_lock:
+            lookups, exact_hits, fuzzy_hits, misses = self.lookups, self.exact_hits, self.fuzzy_hits, self.misses
+        return {
+            "drugs": len(self.drugs),
+            "names": len(self._by_name),
+            "generic_names": len(self._by_generic),
+            "trigrams": len(self._trigrams),
+            "lookups": lookups,
+            "exact_hits": exact_hits,
+            "fuzzy_hits": fuzzy_hits,
+            "misses": misses
+        }
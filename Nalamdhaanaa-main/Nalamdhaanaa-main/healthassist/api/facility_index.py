@@ -0,0 +1,166 @@
+# api/facility_index.py
+"""
+In-memory spatial index over an offline OSM snapshot of healthcare
+facilities, built by build_facility_index.py.
+
+Facilities are bucketed by geohash cell (see tile_cache.GeohashGrid). A
+radius query scans only the cells overlapping the circle; a k-nearest
+query scans rings of cells outward from the center and stops once no
+unscanned cell can hold anything closer than the k-th result.
+
+Snapshot file (JSON, optionally gzip-compressed when the name ends in .gz):
+    {"format_version": 1, "built_at": "...", "sources": [...],
+     "coverage": [[south, west, north, east], ...],
+     "facilities": [{"amenity": "...", <place fields>}, ...]}
+`coverage` lists the areas the snapshot is complete for; queries outside
+it are left to the live API.
+"""
+import gzip
+import heapq
+import json
+import math
+import threading
+
+from tile_cache import EARTH_RADIUS_M, GeohashGrid, bbox_around, haversine_m
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _rank_key(item):
+    """Order of (distance, place) results: reported distance, then id, as pagination.sort_key"""
+    distance, place = item
+    return round(distance, 1), place.get("id") or 0
+
+
+def _open_snapshot(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_snapshot(path, facilities, coverage, sources=(), built_at=None):
+    """Write (amenity, place) pairs as a snapshot file"""
+    payload = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "built_at": built_at,
+        "sources": list(sources),
+        "coverage": [list(bbox) for bbox in coverage],
+        "facilities": [dict(place, amenity=amenity) for amenity, place in facilities],
+    }
+    with _open_snapshot(path, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+
+class FacilityIndex:
+    """
+    Geohash-grid index of (amenity, place) pairs; places need "lat" and
+    "lon". Query results are copies of the places with a "distance" field
+    in meters, nearest first.
+    """
+
+    def __init__(self, facilities, coverage=(), precision=5, metadata=None):
+        self.grid = GeohashGrid(precision)
+        self.coverage = [tuple(bbox) for bbox in coverage]
+        self.metadata = metadata or {}
+
+        self._cells = {}
+        self.size = 0
+        for amenity, place in facilities:
+            cell = self.grid.cell(place["lat"], place["lon"])
+            self._cells.setdefault(cell, []).append((place["lat"], place["lon"], amenity, place))
+            self.size += 1
+
+        self._queries_lock = threading.Lock()
+        self.queries = 0
+
+    @classmethod
+    def load(cls, path, precision=5):
+        with _open_snapshot(path, "r") as f:
+            payload = json.load(f)
+        if payload.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {payload.get('format_version')}")
+
+        facilities = []
+        for record in payload["facilities"]:
+            amenity = record.pop("amenity")
+            facilities.append((amenity, record))
+        metadata = {"built_at": payload.get("built_at"), "sources": payload.get("sources", [])}
+        return cls(facilities, payload.get("coverage", ()), precision, metadata)
+
+    def covers(self, lat, lon, radius_m):
+        """True if the whole circle lies inside one of the snapshot's coverage areas"""
+        south, west, north, east = bbox_around(lat, lon, radius_m)
+        return any(
+            c_south <= south and c_west <= west and north <= c_north and east <= c_east
+            for c_south, c_west, c_north, c_east in self.coverage
+        )
+
+    def _scan(self, cells, lat, lon, radius_m, amenities, found):
+        """Append (distance, place) for matching entries of the given cells"""
+        for cell in cells:
+            for place_lat, place_lon, amenity, place in self._cells.get(cell, ()):
+                if amenity not in amenities:
+                    continue
+                distance = haversine_m(lat, lon, place_lat, place_lon)
+                if distance <= radius_m:
+                    found.append((distance, place))
+
+    def nearby(self, lat, lon, radius_m, amenities, limit=None):
+        """Places within `radius_m`, nearest first; at most `limit` of them"""
+        with self._queries_lock:
+            self.queries += 1
+        amenities = frozenset(amenities)
+        if limit is not None:
+            found = self._nearest(lat, lon, radius_m, amenities, limit)
+        else:
+            ix0, iy0, ix1, iy1 = self.grid.cell_range(bbox_around(lat, lon, radius_m))
+            cells = ((ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1))
+            found = []
+            self._scan(cells, lat, lon, radius_m, amenities, found)
+            found.sort(key=_rank_key)
+        return [dict(place, distance=round(distance, 1)) for distance, place in found]
+
+    def _nearest(self, lat, lon, radius_m, amenities, k):
+        """The k first (distance, place) pairs within radius_m in pagination order, by ring search"""
+        grid = self.grid
+        cx, cy = grid.cell(lat, lon)
+        ix0, iy0, ix1, iy1 = grid.cell_range(bbox_around(lat, lon, radius_m))
+        max_ring = max(cx - ix0, ix1 - cx, cy - iy0, iy1 - cy)
+
+        found = []
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + dx, cy - ring) for dx in range(-ring, ring + 1)]
+                cells += [(cx + dx, cy + ring) for dx in range(-ring, ring + 1)]
+                cells += [(cx - ring, cy + dy) for dy in range(-ring + 1, ring)]
+                cells += [(cx + ring, cy + dy) for dy in range(-ring + 1, ring)]
+            self._scan(cells, lat, lon, radius_m, amenities, found)
+
+            if len(found) >= k:
+                kth = _rank_key(heapq.nsmallest(k, found, key=_rank_key)[-1])
+                # Places outside the rings round to at least the clearance;
+                # strictly below it, no tie with them is possible either
+                if kth[0] < round(self._ring_clearance(lat, lon, cx, cy, ring), 1):
+                    break
+
+        return heapq.nsmallest(k, found, key=_rank_key)
+
+    def _ring_clearance(self, lat, lon, cx, cy, ring):
+        """Lower bound on the distance from (lat, lon) to any cell outside the scanned rings"""
+        south, west, north, east = self.grid.cell_bbox(cx - ring, cy - ring, cx + ring, cy + ring)
+        lat_gap = min(lat - south, north - lat)
+        # Longitude degrees are shortest at the block edge farthest from the equator
+        widest_lat = min(90.0, max(abs(south), abs(north)))
+        lon_gap = min(lon - west, east - lon) * math.cos(math.radians(widest_lat))
+        return math.radians(max(0.0, min(lat_gap, lon_gap))) * EARTH_RADIUS_M
+
+    def stats(self):
+        return {
+            "facilities": self.size,
+            "cells": len(self._cells),
+            "coverage": self.coverage,
+            "queries": self.queries,
+            **self.metadata
+        }
@@ -0,0 +1,386 @@
+# api/geocode_cache.py
+"""
+Persistent geocoding cache for /search, with a prefix index for
+autocomplete-style queries.
+
+Results are stored in SQLite keyed on the normalized query (lowercase,
+punctuation dropped, whitespace collapsed), so they survive restarts and
+are shared by all workers on a host. An in-memory prefix trie over the
+cached queries and place names answers partial input ("bang" ->
+Bengaluru) without a network call. Each trie node keeps its own top
+entries, so a lookup costs only the length of the prefix. The trie is
+per worker: built from the table at startup and on every rebuild, plus
+the worker's own stores in between.
+
+Entries expire after `ttl` seconds; when the table grows past
+`max_entries` the least recently used tenth is evicted. Exact hits only
+read the table (each thread has its own connection); their last-use times
+and hit counts are kept in memory and written in batches. Trie entries
+remember when their row was created, so prefix lookups skip expired ones,
+and the trie is rebuilt from the live rows once expired entries pile up.
+
+Warm the cache with popular places (resolved through Nominatim at its
+1 request/s limit):
+    python geocode_cache.py warm data/popular_places.txt
+"""
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    query     TEXT PRIMARY KEY,
+    results   TEXT NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS geocode_last_used ON geocode (last_used);
+"""
+
+
+def normalize_query(query):
+    """Cache key of a search string"""
+    return " ".join(_NON_WORD_RE.sub(" ", query.lower()).split())
+
+
+def _place_term(place):
+    """Indexable name of a result: the first component of its display name"""
+    return normalize_query((place.get("name") or "").split(",")[0])
+
+
+class PrefixTrie:
+    """
+    Prefix index of terms to place results. Every node stores the best
+    `top_k` (weight, key, created) entries of its subtree, so
+    `search(prefix)` only walks the prefix; the node ending a term also
+    stores the entries of that exact term for `match(term)`.
+    """
+
+    def __init__(self, top_k=5):
+        self.top_k = top_k
+        self._root = {}
+        self._places = {}   # key -> place dict
+        self.terms = 0
+        self.oldest = float("inf")  # creation time of the oldest entry
+
+    def insert(self, term, key, place, weight, created):
+        if not term:
+            return
+        self._places[key] = place
+        self.oldest = min(self.oldest, created)
+        node = self._root
+        for char in term:
+            node = node.setdefault(char, {})
+            node[""] = self._ranked(node.get("", ()), key, weight, created)
+        if "$" not in node:
+            self.terms += 1
+        # Normalized terms never contain "$" (punctuation is dropped)
+        node["$"] = self._ranked(node.get("$", ()), key, weight, created)
+
+    def _ranked(self, entries, key, weight, created):
+        top = [entry for entry in entries if entry[1] != key]
+        top.append((weight, key, created))
+        top.sort(key=lambda entry: -entry[0])
+        return top[:self.top_k]
+
+    def _node(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _live(self, entries, limit, cutoff):
+        return [self._places[key] for _, key, created in entries if created >= cutoff][:limit]
+
+    def search(self, prefix, limit=5, cutoff=float("-inf")):
+        """Best places under `prefix`, skipping entries created before `cutoff`"""
+        node = self._node(prefix)
+        return self._live(node.get("", ()), limit, cutoff) if node is not None else []
+
+    def match(self, term, limit=5, cutoff=float("-inf")):
+        """Best places indexed under exactly `term`, skipping entries created before `cutoff`"""
+        node = self._node(term)
+        return self._live(node.get("$", ()), limit, cutoff) if node is not None else []
+
+
+class GeocodeCache:
+    """
+    SQLite-backed cache of normalized query -> list of {name, lat, lon}.
+
+    `lookup(query)` returns (results, source) with source "cache" for a
+    cached query or place name, "prefix" for a trie match of a partial one
+    (only with `autocomplete=True`), or (None, None) on a miss; store fresh
+    upstream results with `store(query, results)`.
+    """
+
+    # Last-use updates are written once this many are pending, or this old
+    USE_FLUSH_SIZE = 256
+    USE_FLUSH_INTERVAL = 30.0
+
+    def __init__(self, path, ttl=30 * 24 * 3600, max_entries=100000, min_prefix=3):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_prefix = min_prefix
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending_uses = {}   # query -> [last_used, hits] not written yet
+        self._uses_flushed = time.time()
+        self._entries = 0
+        self._trie = PrefixTrie()
+        self._trie_built = 0.0
+
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.trie_rebuilds = 0
+
+        with self._lock:
+            self._rebuild_trie()
+        atexit.register(self.flush)
+
+    def _db(self):
+        """This thread's connection (SQLite connections must not cross a fork or be shared by threads)"""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            local.conn = conn
+            local.pid = os.getpid()
+        return local.conn
+
+    def _rebuild_trie(self):
+        """Index every live entry; caller holds the lock"""
+        trie = PrefixTrie()
+        rows = self._db().execute(
+            "SELECT query, results, hits, created FROM geocode WHERE created >= ?", (self._cutoff(),)
+        ).fetchall()
+        for query, results, hits, created in rows:
+            self._index(trie, query, json.loads(results), hits, created)
+        self._trie = trie
+        self._trie_built = time.time()
+        self._entries = len(rows)
+        self.trie_rebuilds += 1
+
+    @staticmethod
+    def _index(trie, query, results, hits, created):
+        for rank, place in enumerate(results):
+            key = (round(place["lat"], 5), round(place["lon"], 5))
+            # Best result first: it outranks the alternatives of the same query
+            weight = hits + 1.0 / (rank + 1)
+            trie.insert(_place_term(place), key, place, weight, created)
+            if rank == 0:
+                trie.insert(query, key, place, weight, created)
+
+    def _cutoff(self):
+        return time.time() - self.ttl if self.ttl else float("-inf")
+
+    def lookup(self, query, limit=5, autocomplete=False):
+        """
+        Cached results for a query: the query itself, else a cached place
+        of exactly that name, else (with `autocomplete`, for partial input)
+        the best places whose names start with it.
+        """
+        key = normalize_query(query)
+        if not key:
+            return None, None
+        now = time.time()
+        # The fast path reads without the cache lock; expired rows are left
+        # for _expire/_evict to delete
+        row = self._db().execute("SELECT results, created FROM geocode WHERE query = ?", (key,)).fetchone()
+        if row is not None and (not self.ttl or now - row[1] <= self.ttl):
+            with self._lock:
+                self.hits += 1
+                uses = self._record_use(key, now)
+            if uses:
+                self._write_uses(uses)
+            return json.loads(row[0])[:limit], "cache"
+
+        with self._lock:
+            cutoff = self._cutoff()
+            # Expired entries are skipped below, but they still take
+            # top-k slots; re-index the live rows at most ten times a TTL
+            if self._trie.oldest < cutoff and now - self._trie_built >= self.ttl / 10:
+                self._expire()
+            matches = self._trie.match(key, limit, cutoff)
+            if matches:
+                self.hits += 1
+                return matches, "cache"
+            if autocomplete and len(key) >= self.min_prefix:
+                matches = self._trie.search(key, limit, cutoff)
+                if matches:
+                    self.prefix_hits += 1
+                    return matches, "prefix"
+
+            self.misses += 1
+            return None, None
+
+    def _record_use(self, key, now):
+        """
+        Note an exact hit; returns the pending uses to write once enough
+        have piled up (the caller writes them outside the lock), else None.
+        Caller holds the lock.
+        """
+        use = self._pending_uses.get(key)
+        if use is None:
+            self._pending_uses[key] = [now, 1]
+        else:
+            use[0] = now
+            use[1] += 1
+        if len(self._pending_uses) < self.USE_FLUSH_SIZE and now - self._uses_flushed < self.USE_FLUSH_INTERVAL:
+            return None
+        uses, self._pending_uses = self._pending_uses, {}
+        self._uses_flushed = now
+        return uses
+
+    def _write_uses(self, uses):
+        """Write last-use times and hit counts in one transaction"""
+        if not uses:
+            return
+        db = self._db()
+        try:
+            db.execute("BEGIN")
+            db.executemany(
+                "UPDATE geocode SET last_used = MAX(last_used, ?), hits = hits + ? WHERE query = ?",
+                [(last_used, hits, key) for key, (last_used, hits) in uses.items()]
+            )
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            # Usage only orders eviction and ranking; losing a batch is harmless
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+
+    def flush(self):
+        """Write pending last-use updates now (also run at exit)"""
+        with self._lock:
+            uses, self._pending_uses = self._pending_uses, {}
+            self._uses_flushed = time.time()
+        if uses:
+            self._write_uses(uses)
+
+    def store(self, query, results):
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            existing = db.execute("SELECT 1 FROM geocode WHERE query = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO geocode (query, results, created, last_used, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, json.dumps(results), now, now)
+            )
+            self.stores += 1
+            if existing is None:
+                self._entries += 1
+            self._index(self._trie, key, results, 0, now)
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _expire(self):
+        """Drop expired entries and re-index the rest; caller holds the lock"""
+        self._write_uses(self._pending_uses)
+        self._pending_uses = {}
+        expired = self._db().execute("DELETE FROM geocode WHERE created < ?", (self._cutoff(),)).rowcount
+        self.expirations += expired
+        self._rebuild_trie()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used tenth; caller holds the lock"""
+        # Eviction orders by last_used, so write the pending uses first
+        self._write_uses(self._pending_uses)
+        self._pending_uses = {}
+        self._uses_flushed = time.time()
+        db = self._db()
+        expired = db.execute("DELETE FROM geocode WHERE created < ?", (self._cutoff(),)).rowcount
+        self.expirations += expired
+        count = db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        excess = count - int(self.max_entries * 0.9)
+        if excess > 0:
+            db.execute(
+                "DELETE FROM geocode WHERE query IN "
+                "(SELECT query FROM geocode ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+        self._rebuild_trie()
+
+    def warm_up(self, places, resolve, pause=0.0):
+        """
+        Resolve and store every place name not cached yet. `resolve(name)`
+        returns the result list (e.g. a Nominatim call). Returns the number
+        of names fetched.
+        """
+        fetched = 0
+        for name in places:
+            key = normalize_query(name)
+            if not key:
+                continue
+            with self._lock:
+                cached = self._db().execute("SELECT 1 FROM geocode WHERE query = ?", (key,)).fetchone()
+            if cached:
+                continue
+            self.store(name, resolve(name))
+            fetched += 1
+            if pause:
+                time.sleep(pause)
+        return fetched
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.prefix_hits + self.misses
+            return {
+                "entries": self._entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "trie_terms": self._trie.terms,
+                "trie_rebuilds": self.trie_rebuilds,
+                "pending_uses": len(self._pending_uses),
+                "hits": self.hits,
+                "prefix_hits": self.prefix_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.prefix_hits) / lookups) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+def read_places(path):
+    """Place names from a text file (one per line, # comments) or a JSON list"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] != "warm":
+        sys.exit("usage: python geocode_cache.py warm PLACES_FILE")
+
+    # Uses the API's own cache path and rate-limited Nominatim client
+    import app
+
+    def resolve(name):
+        return app.geocode(name)
+
+    count = app.geocode_cache.warm_up(read_places(sys.argv[2]), resolve)
+    print(f"Fetched {count} places; cache now {app.geocode_cache.stats()}")
@@ -0,0 +1,30 @@
+# api/gunicorn.conf.py
+# Production serving config for the healthcare location API.
+#
+#   WEB_CONCURRENCY   worker processes (default: number of CPU cores)
+#   GUNICORN_THREADS  threads per worker (default: 8)
+#   PORT              listen port (default: 8000)
+#
+# Requests mostly wait on Overpass/Nominatim, so each worker runs several
+# threads to keep serving while upstream calls are in flight.
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+worker_class = "gthread" if threads > 1 else "sync"
+# Upstream calls time out after 30s, leave headroom before killing a worker
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+preload_app = True
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")
+errorlog = "-"
+
+
+def when_ready(server):
+    gc.collect()
+    gc.freeze()
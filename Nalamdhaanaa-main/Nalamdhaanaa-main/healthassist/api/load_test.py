@@ -0,0 +1,107 @@
+# api/load_test.py
+"""
+Concurrency load test for the /nearby endpoint.
+
+Sends `--requests` /nearby queries at each concurrency level, every one at
+a distinct location so no cache can answer it and each waits on the
+upstream. Point the API at a slow local Overpass stand-in to see how many
+upstream waits one server holds at once:
+
+    python mock_overpass.py --port 8001 --delay 1.0
+    OVERPASS_URL=http://127.0.0.1:8001/api/interpreter OVERPASS_MAX_CONCURRENCY=1000 \\
+        hypercorn async_app:app --bind 127.0.0.1:8000
+    python load_test.py --url http://127.0.0.1:8000 --concurrency 10 50 100 200
+
+Prints one row per level (throughput, latency percentiles, errors, empty
+results); with --json the rows are written as JSON instead. Errors are
+non-200 answers, including the 502/503 the API returns when Overpass
+fails or its client sheds load; "empty" counts 200 answers with no places,
+which against the mock upstream also points at a problem.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Distinct query centers: a 0.25 degree lattice (far apart at radius 1km)
+_centers = (
+    (-60.0 + 0.25 * (n // 1000), -120.0 + 0.25 * (n % 1000))
+    for n in itertools.count()
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_level(url, concurrency, total, radius, timeout):
+    """One blocking client thread per concurrent user, each with its own keep-alive session"""
+    centers = [next(_centers) for _ in range(total)]
+    local = threading.local()
+
+    def query(center):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        lat, lon = center
+        started = time.perf_counter()
+        try:
+            response = session.get(f"{url}/nearby", params={"lat": lat, "lon": lon, "radius": radius},
+                                   timeout=timeout)
+            if response.status_code != 200 or not response.json().get("success"):
+                outcome = "error"
+            else:
+                outcome = "ok" if response.json().get("count") else "empty"
+        except (requests.exceptions.RequestException, ValueError):
+            outcome = "error"
+        return time.perf_counter() - started, outcome
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(query, centers))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(outcome == "error" for _, outcome in results),
+        "empty": sum(outcome == "empty" for _, outcome in results),
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(1000 * statistics.median(latencies)),
+        "p95_ms": round(1000 * percentile(latencies, 0.95)),
+        "max_ms": round(1000 * max(latencies)),
+    }
+
+
+def main(args):
+    rows = []
+    for concurrency in args.concurrency:
+        total = args.requests or 2 * concurrency
+        row = run_level(args.url.rstrip("/"), concurrency, total, args.radius, args.timeout)
+        rows.append(row)
+        if not args.json:
+            print(f"c={row['concurrency']:>4}  {row['requests']:>5} req  {row['seconds']:>6.2f}s  "
+                  f"{row['requests_per_second']:>7.1f} req/s  p50 {row['p50_ms']:>6} ms  "
+                  f"p95 {row['p95_ms']:>6} ms  max {row['max_ms']:>6} ms  errors {row['errors']}  "
+                  f"empty {row['empty']}")
+    if args.json:
+        print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent /nearby load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=0, help="requests per level (default: 2 x concurrency)")
+    parser.add_argument("--radius", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
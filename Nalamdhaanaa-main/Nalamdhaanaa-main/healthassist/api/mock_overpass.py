@@ -0,0 +1,167 @@
+# api/mock_overpass.py
+"""
+Local stand-in for the Overpass API, for offline development and tests.
+
+Answers the amenity queries app.py sends (bbox or `around:` filters, nodes
+and ways, `out center`) in Overpass JSON. Facilities come either from an
+Overpass JSON file (--fixture) or from a deterministic synthetic world: a
+fixed lattice where each ~500 m cell may hold one facility, so the same
+area always returns the same places.
+
+    python mock_overpass.py --port 8001 [--delay 0.5] [--fixture export.json]
+    OVERPASS_URL=http://127.0.0.1:8001/api/interpreter python app.py
+
+GET /stats reports how many queries were answered.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from flask import Flask, Response, jsonify, request
+
+from osm import element_coordinates
+from tile_cache import bbox_around, haversine_m
+
+app = Flask(__name__)
+
+LATTICE_DEG = 0.005          # synthetic lattice spacing (~550 m)
+FACILITY_PROBABILITY = 0.35  # share of lattice cells holding a facility
+MAX_LATTICE_CELLS = 2_000_000
+AMENITY_WEIGHTS = (("pharmacy", 0.40), ("clinic", 0.25), ("doctors", 0.20), ("hospital", 0.15))
+STREETS = ("Main Street", "Station Road", "Park Avenue", "Hospital Road", "Market Street", "Lake View")
+
+_CLAUSE_RE = re.compile(r'(node|way)\["amenity"="([^"]+)"\]\(([^)]*)\)')
+
+settings = {"delay": float(os.environ.get("MOCK_OVERPASS_DELAY", "0")), "fixture": None}
+_stats = {"queries": 0, "elements": 0}
+_stats_lock = threading.Lock()
+
+
+def _cell_random(i, j):
+    """Four deterministic floats in [0, 1) for lattice cell (i, j)"""
+    digest = hashlib.blake2b(f"{i}:{j}".encode(), digest_size=16).digest()
+    return [int.from_bytes(digest[k:k + 4], "big") / 2 ** 32 for k in range(0, 16, 4)]
+
+
+def synthetic_element(i, j):
+    """The facility of lattice cell (i, j) as an Overpass element, or None"""
+    presence, kind, dx, dy = _cell_random(i, j)
+    if presence >= FACILITY_PROBABILITY:
+        return None
+
+    # presence is uniform in [0, FACILITY_PROBABILITY) here; reuse it to pick the amenity
+    pick = presence / FACILITY_PROBABILITY
+    cumulative = 0.0
+    for amenity, weight in AMENITY_WEIGHTS:
+        cumulative += weight
+        if pick < cumulative:
+            break
+
+    lat = (j + dy) * LATTICE_DEG
+    lon = (i + dx) * LATTICE_DEG
+    element_id = ((i & 0xFFFFF) << 20) | (j & 0xFFFFF)
+    tags = {
+        "amenity": amenity,
+        "name": f"{amenity.title()} {abs(i) % 1000}-{abs(j) % 1000}",
+        "addr:housenumber": str(1 + int(dx * 200)),
+        "addr:street": STREETS[int(dy * len(STREETS))],
+        "addr:city": "Mocktown",
+    }
+    if kind < 0.5:
+        tags["phone"] = f"+1 555 {int(kind * 1e4):04d}"
+    if kind < 0.3:
+        tags["opening_hours"] = "24/7" if amenity == "hospital" else "Mo-Sa 09:00-21:00"
+
+    # Hospitals are mapped as building outlines (ways), the rest as nodes
+    if amenity == "hospital":
+        return {"type": "way", "id": element_id, "center": {"lat": lat, "lon": lon}, "tags": tags}
+    return {"type": "node", "id": element_id, "lat": lat, "lon": lon, "tags": tags}
+
+
+def synthetic_elements(bbox):
+    south, west, north, east = bbox
+    i0, i1 = math.floor(west / LATTICE_DEG), math.floor(east / LATTICE_DEG)
+    j0, j1 = math.floor(south / LATTICE_DEG), math.floor(north / LATTICE_DEG)
+    if (i1 - i0 + 1) * (j1 - j0 + 1) > MAX_LATTICE_CELLS:
+        raise ValueError("query area too large")
+    for i in range(i0, i1 + 1):
+        for j in range(j0, j1 + 1):
+            element = synthetic_element(i, j)
+            if element is not None:
+                yield element
+
+
+def parse_area(area):
+    """(bbox, circle) for an Overpass filter; circle is (lat, lon, radius) for around:"""
+    if area.startswith("around:"):
+        radius, lat, lon = (float(v) for v in area[len("around:"):].split(","))
+        return bbox_around(lat, lon, radius), (lat, lon, radius)
+    south, west, north, east = (float(v) for v in area.split(","))
+    return (south, west, north, east), None
+
+
+def answer(query):
+    """Overpass JSON elements matching every amenity clause of a query"""
+    elements = {}
+    for element_type, amenity, area in _CLAUSE_RE.findall(query):
+        bbox, circle = parse_area(area)
+        south, west, north, east = bbox
+        source = settings["fixture"] if settings["fixture"] is not None else synthetic_elements(bbox)
+        for element in source:
+            if element.get("type") != element_type or element.get("tags", {}).get("amenity") != amenity:
+                continue
+            coordinates = element_coordinates(element)
+            if coordinates is None:
+                continue
+            lat, lon = coordinates
+            if not (south <= lat <= north and west <= lon <= east):
+                continue
+            if circle and haversine_m(circle[0], circle[1], lat, lon) > circle[2]:
+                continue
+            elements[(element_type, element["id"])] = element
+    return list(elements.values())
+
+
+@app.route("/api/interpreter", methods=["GET", "POST"])
+def interpreter():
+    query = request.values.get("data") or request.get_data(as_text=True)
+    if settings["delay"]:
+        time.sleep(settings["delay"])
+    try:
+        elements = answer(query)
+    except ValueError as e:
+        return Response(f"runtime error: {e}", status=400, mimetype="text/plain")
+
+    with _stats_lock:
+        _stats["queries"] += 1
+        _stats["elements"] += len(elements)
+    return jsonify({"version": 0.6, "generator": "mock_overpass", "elements": elements})
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    with _stats_lock:
+        return jsonify(dict(_stats))
+
+
+def load_fixture(path):
+    with open(path) as f:
+        return json.load(f).get("elements", [])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Overpass API stand-in")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=settings["delay"], help="seconds added to every query")
+    parser.add_argument("--fixture", help="Overpass JSON file to serve instead of synthetic data")
+    args = parser.parse_args()
+
+    settings["delay"] = args.delay
+    if args.fixture:
+        settings["fixture"] = load_fixture(args.fixture)
+    app.run(port=args.port, threaded=True)
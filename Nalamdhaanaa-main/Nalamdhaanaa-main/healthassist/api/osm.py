@@ -0,0 +1,184 @@
+# api/osm.py
+"""
+OpenStreetMap helpers shared by the API, the facility index builder and
+the Overpass stand-in: the amenities we serve, the Overpass query, and the
+conversion of Overpass elements into place dicts.
+"""
+import codecs
+import json
+import re
+
+HEALTHCARE_AMENITIES = ("hospital", "pharmacy", "clinic", "doctors")
+
+# Place categories returned to the frontend and the amenities behind them
+CATEGORY_AMENITIES = {
+    "hospital": ("hospital",),
+    "pharmacy": ("pharmacy",),
+    "clinic": ("clinic", "doctors"),
+}
+
+_ELEMENTS_START_RE = re.compile(r'"elements"\s*:\s*\[')
+
+
+def build_overpass_query(bbox, amenities=HEALTHCARE_AMENITIES):
+    """Overpass QL for nodes and ways of the given amenities inside a (south, west, north, east) bbox"""
+    south, west, north, east = bbox
+    area = f"({south:.7f},{west:.7f},{north:.7f},{east:.7f})"
+    clauses = "".join(
+        f'      node["amenity"="{amenity}"]{area};\n'
+        f'      way["amenity"="{amenity}"]{area};\n'
+        for amenity in amenities
+    )
+    return f"""
+    [out:json][timeout:25];
+    (
+{clauses}    );
+    out center;
+    """
+
+
+def amenities_for_categories(categories):
+    """Amenity tuple for a list of categories (all amenities if empty); KeyError on an unknown one"""
+    if not categories:
+        return HEALTHCARE_AMENITIES
+    wanted = set()
+    for category in categories:
+        wanted.update(CATEGORY_AMENITIES[category])
+    return tuple(amenity for amenity in HEALTHCARE_AMENITIES if amenity in wanted)
+
+
+def element_coordinates(element):
+    """(lat, lon) of a node, or of a way/relation's center (`out center`)"""
+    if 'lat' in element and 'lon' in element:
+        return element['lat'], element['lon']
+    if 'center' in element:
+        return element['center']['lat'], element['center']['lon']
+    return None
+
+
+def element_to_place(element):
+    """(amenity, place dict) for an Overpass element, or None if it has no coordinates"""
+    coordinates = element_coordinates(element)
+    if coordinates is None:
+        return None
+    place_lat, place_lon = coordinates
+
+    tags = element.get('tags', {})
+    amenity_type = tags.get('amenity', 'unknown')
+
+    # Map amenity types to categories
+    category = 'clinic'
+    if amenity_type == 'hospital':
+        category = 'hospital'
+    elif amenity_type == 'pharmacy':
+        category = 'pharmacy'
+    elif amenity_type in ['clinic', 'doctors']:
+        category = 'clinic'
+
+    place = {
+        'id': element.get('id'),
+        'name': tags.get('name', f'Unnamed {category.title()}'),
+        'address': format_address(tags),
+        'category': category,
+        'lat': place_lat,
+        'lon': place_lon,
+        'phone': tags.get('phone', ''),
+        'website': tags.get('website', ''),
+        'opening_hours': tags.get('opening_hours', ''),
+    }
+    return amenity_type, place
+
+
+def format_address(tags):
+    """Format address from OSM tags"""
+    address_parts = []
+
+    if 'addr:housenumber' in tags:
+        address_parts.append(tags['addr:housenumber'])
+    if 'addr:street' in tags:
+        address_parts.append(tags['addr:street'])
+    if 'addr:city' in tags:
+        address_parts.append(tags['addr:city'])
+    if 'addr:postcode' in tags:
+        address_parts.append(tags['addr:postcode'])
+
+    address = ', '.join(address_parts) if address_parts else tags.get('addr:full', 'Address not available')
+    return address
+
+
+class ElementStreamParser:
+    """
+    Incremental parser for the "elements" array of an Overpass JSON
+    response. `feed(chunk)` takes the next bytes of the body and returns
+    the elements completed by them; `close()` flushes the end of the body.
+    Only the element being decoded is held in memory, never the whole body.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_array = False
+        self.done = False
+
+    def feed(self, chunk):
+        if self.done:
+            return []
+        return self._parse(self._text_decoder.decode(chunk), final=False)
+
+    def close(self):
+        """Elements left at the end of the body; raises ValueError if it ends inside the array"""
+        if self.done:
+            return []
+        elements = self._parse(self._text_decoder.decode(b"", final=True), final=True)
+        if self._in_array and not self.done:
+            raise ValueError("Overpass response ended inside the elements array")
+        return elements
+
+    def _parse(self, text, final):
+        buffer = self._buffer + text
+        position = 0
+        elements = []
+
+        if not self._in_array:
+            match = _ELEMENTS_START_RE.search(buffer)
+            if match is None:
+                # No array yet (or an error response); keep a tail in case
+                # the key is split across chunks
+                self._buffer = buffer[-32:]
+                return elements
+            position = match.end()
+            self._in_array = True
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                self.done = True
+                break
+            try:
+                element, position = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # element incomplete: wait for the next chunk
+            elements.append(element)
+
+        self._buffer = "" if self.done else buffer[position:]
+        return elements
+
+
+def iter_elements(chunks):
+    """
+    Yield the objects of an Overpass JSON response's "elements" array one at
+    a time while the body is still arriving. `chunks` is an iterable of
+    bytes (e.g. response.iter_content()).
+    """
+    parser = ElementStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
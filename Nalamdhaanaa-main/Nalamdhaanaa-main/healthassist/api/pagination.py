@@ -0,0 +1,54 @@
+# api/pagination.py
+"""
+Cursor pagination over distance-sorted /nearby results.
+
+Places are ordered by (distance, id). A cursor encodes the position of
+the last place of a page plus the query it belongs to (center, radius and
+amenity filter), so the next page starts right after it even if the
+client resends it much later, and a cursor is never applied to a query
+whose results it was not taken from. Cursors
+are opaque URL-safe strings.
+"""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def sort_key(place):
+    return place["distance"], place.get("id") or 0
+
+
+def encode_cursor(place, lat, lon, radius, amenities):
+    distance, place_id = sort_key(place)
+    raw = json.dumps([distance, place_id, lat, lon, radius, list(amenities)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, lat, lon, radius, amenities):
+    """(distance, id) position of a cursor; raises InvalidCursor if it is malformed or for another query"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        distance, place_id, c_lat, c_lon, c_radius, c_amenities = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if (c_lat, c_lon, c_radius, c_amenities) != (lat, lon, radius, list(amenities)):
+        raise InvalidCursor("Cursor belongs to a different query")
+    return distance, place_id
+
+
+def paginate(places, lat, lon, radius, amenities, limit=None, after=None):
+    """
+    (page, next_cursor) from places sorted nearest first. `amenities` is
+    the query's amenity filter; `after` is a decoded cursor position;
+    next_cursor is None on the last page.
+    """
+    places = sorted(places, key=sort_key)
+    if after is not None:
+        places = [place for place in places if sort_key(place) > tuple(after)]
+    if limit is None or len(places) <= limit:
+        return places, None
+    page = places[:limit]
+    return page, encode_cursor(page[-1], lat, lon, radius, amenities)
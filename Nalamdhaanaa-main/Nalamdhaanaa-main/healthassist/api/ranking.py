@@ -0,0 +1,170 @@
+# api/ranking.py
+"""
+Post-processing of /nearby candidates: distances, radius filter, ranking
+and duplicate removal.
+
+Distances for the whole candidate list are computed in one vectorized
+NumPy haversine pass. Results are ranked nearest first (ties by OSM id, the
+order pagination uses).
+
+The same facility is often mapped twice in OSM: a node for the amenity and
+a way for its building, which Overpass returns with the way's center.
+Duplicates are detected with a spatial grid, so each place is only
+compared with places in the few cells around it rather than with every
+other place. Two places are the same facility when they
+share a category and normalized name and lie within `threshold_m` of each
+other. The nearer one is kept, and it takes over any contact details it
+lacks from the other.
+"""
+import math
+import re
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
+
+from tile_cache import EARTH_RADIUS_M, haversine_m
+
+DEDUPE_DISTANCE_M = 100.0
+# Unnamed places only merge when nearly on top of each other
+UNNAMED_DISTANCE_FRACTION = 0.25
+
+MERGED_FIELDS = ("phone", "website", "opening_hours")
+NO_ADDRESS = "Address not available"
+
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+_get_lat = itemgetter("lat")
+_get_lon = itemgetter("lon")
+
+
+def haversine_many(lat, lon, lats, lons):
+    """Great-circle distances in meters from (lat, lon) to arrays of coordinates"""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+@lru_cache(maxsize=65536)
+def _normalize_name(name):
+    if not name or name.startswith("Unnamed "):
+        return None
+    return _NON_ALNUM_RE.sub(" ", name.lower()).strip()
+
+
+def _name_key(place):
+    return _normalize_name(place.get("name"))
+
+
+class Deduplicator:
+    """
+    Incremental duplicate filter: `add(place)` returns True for a new
+    facility and False for a duplicate of one added before (whose empty
+    fields are then filled from it). Add places in order of preference.
+
+    Grid cells are twice the threshold wide, so every place within the
+    threshold of a point lies in the 2x2 cells nearest to it.
+    """
+
+    def __init__(self, threshold_m=DEDUPE_DISTANCE_M):
+        self.threshold_m = threshold_m
+        self.cell_lat = 2 * math.degrees(threshold_m / EARTH_RADIUS_M)
+        self._cells = {}
+        self._cell_lon = {}
+        self.duplicates = 0
+
+    def _lon_width(self, row):
+        """Cell width in longitude for a row, wide enough at its neighbour rows' latitudes too"""
+        width = self._cell_lon.get(row)
+        if width is None:
+            edge = min(90.0, max(abs(row - 1), abs(row + 2)) * self.cell_lat)
+            cos_edge = math.cos(math.radians(edge))
+            # 1% margin: a great circle is slightly shorter than the parallel
+            width = 360.0 if cos_edge < 1e-9 else min(360.0, 1.01 * self.cell_lat / cos_edge)
+            self._cell_lon[row] = width
+        return width
+
+    def add(self, place):
+        lat = place["lat"]
+        lon = place["lon"]
+        name = _name_key(place)
+        category = place.get("category")
+        limit = self.threshold_m if name is not None else self.threshold_m * UNNAMED_DISTANCE_FRACTION
+
+        y = lat / self.cell_lat
+        row = math.floor(y)
+        home = None
+        for r in (row, row - 1 if y - row < 0.5 else row + 1):
+            x = lon / self._lon_width(r)
+            col = math.floor(x)
+            if home is None:
+                home = (row, col)
+            for c in (col, col - 1 if x - col < 0.5 else col + 1):
+                for kept_name, kept_category, kept_lat, kept_lon, kept in self._cells.get((r, c), ()):
+                    if (kept_name == name and kept_category == category
+                            and haversine_m(lat, lon, kept_lat, kept_lon) <= limit):
+                        _merge(kept, place)
+                        self.duplicates += 1
+                        return False
+
+        self._cells.setdefault(home, []).append((name, category, lat, lon, place))
+        return True
+
+
+def _merge(kept, duplicate):
+    for field in MERGED_FIELDS:
+        if not kept.get(field) and duplicate.get(field):
+            kept[field] = duplicate[field]
+    if kept.get("address") in (None, "", NO_ADDRESS) and duplicate.get("address") not in (None, "", NO_ADDRESS):
+        kept["address"] = duplicate["address"]
+
+
+def dedupe(places, threshold_m=DEDUPE_DISTANCE_M):
+    """Places without duplicates, keeping the first of each facility (merged in place)"""
+    deduplicator = Deduplicator(threshold_m)
+    return [place for place in places if deduplicator.add(place)]
+
+
+def rank_places(lat, lon, radius_m, places, limit=None, threshold_m=DEDUPE_DISTANCE_M):
+    """
+    Places within `radius_m` of (lat, lon), without duplicates, nearest
+    first, at most `limit`; each a copy with a "distance" field in meters.
+    `threshold_m=0` disables duplicate removal.
+    """
+    if not places:
+        return []
+    lats = np.array(list(map(_get_lat, places)), dtype=np.float64)
+    lons = np.array(list(map(_get_lon, places)), dtype=np.float64)
+
+    distances = haversine_many(lat, lon, lats, lons)
+    inside = np.flatnonzero(distances <= radius_m)
+    # Rank on the reported (rounded) distance, ties by id, as pagination does
+    rounded = np.round(distances[inside], 1)
+    ids = np.array([places[i].get("id") or 0 for i in inside.tolist()], dtype=np.int64)
+    order = np.lexsort((ids, rounded))
+
+    # Copy (and de-duplicate) lazily: with a limit only the head is needed.
+    # Once the page is full, a later candidate can still duplicate a place
+    # on it only if it lies within threshold_m of it, so no farther than
+    # `horizon`; those are still fed to the deduplicator, so the page's
+    # places merge the same details as in the unlimited ranking.
+    deduplicator = Deduplicator(threshold_m) if threshold_m else None
+    ranked = []
+    horizon = None
+    for i, distance in zip(inside[order].tolist(), rounded[order].tolist()):
+        if horizon is not None and distance > horizon:
+            break
+        place = dict(places[i], distance=distance)
+        if deduplicator is not None and not deduplicator.add(place):
+            continue
+        if horizon is not None:
+            continue
+        ranked.append(place)
+        if limit is not None and len(ranked) >= limit:
+            if deduplicator is None:
+                break
+            # 0.1 m: both distances are rounded to 0.1 m
+            horizon = distance + threshold_m + 0.1
+    return ranked
@@ -0,0 +1,160 @@
+# api/shared.py
+"""
+Configuration, caches and request helpers used by both servers of the
+healthcare location API: app.py (Flask) and async_app.py (Quart).
+
+Importing this module builds no web app and no upstream clients; each
+server creates its own (requests in app.py, httpx in async_app.py), plus
+whatever only it serves (the drug index and profiler live in app.py).
+"""
+import os
+
+import requests
+
+from facility_index import FacilityIndex
+from geocode_cache import GeocodeCache
+from osm import CATEGORY_AMENITIES, amenities_for_categories
+from pagination import InvalidCursor, decode_cursor
+from structured_log import StructuredLogger
+from tile_cache import TileCache
+from upstream import CircuitOpenError, UpstreamBusyError
+
+# Using OpenStreetMap Nominatim and Overpass API for free healthcare location data
+# (override OVERPASS_URL to point at mock_overpass.py or a self-hosted instance)
+OVERPASS_URL = os.environ.get("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+
+# Persistent geocoding cache for /search (shared by workers on the host)
+geocode_cache = GeocodeCache(
+    os.environ.get(
+        "GEOCODE_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "geocode_cache.sqlite3")
+    ),
+    ttl=float(os.environ.get("GEOCODE_CACHE_TTL", str(30 * 24 * 3600))),
+    max_entries=int(os.environ.get("GEOCODE_CACHE_SIZE", "100000"))
+)
+
+# Facilities cached per (amenity, geohash cell); any radius or nearby center
+# is answered from cached cells and only uncached cells go to Overpass
+tile_cache = TileCache(
+    precision=int(os.environ.get("TILE_CACHE_PRECISION", "5")),
+    ttl=float(os.environ.get("TILE_CACHE_TTL", "3600")),
+    maxsize=int(os.environ.get("TILE_CACHE_SIZE", "50000"))
+)
+
+# Offline OSM snapshot (build_facility_index.py). Queries inside its coverage
+# are answered from memory; others go to Overpass unless OVERPASS_FALLBACK=0.
+FACILITY_INDEX_PATH = os.environ.get(
+    "FACILITY_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "facilities.json.gz")
+)
+OVERPASS_FALLBACK = os.environ.get("OVERPASS_FALLBACK", "1").lower() in ("1", "true", "yes")
+
+facility_index = FacilityIndex.load(FACILITY_INDEX_PATH) if os.path.exists(FACILITY_INDEX_PATH) else None
+
+# JSON-lines log written by a background thread, so a backed-up log pipe
+# never stalls a request (records are dropped and counted instead)
+log = StructuredLogger(
+    "nearby-api",
+    level=os.environ.get("LOG_LEVEL", "info").lower(),
+    sample_rate=float(os.environ.get("LOG_SAMPLE_RATE", "1")),
+    inputs=os.environ.get("LOG_INPUTS", "hash").lower(),
+    hash_key=os.environ.get("LOG_HASH_KEY", ""),
+    queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+)
+
+def parse_nearby_params(method, data, args):
+    """
+    Parameters of a /nearby request from the POST JSON body (`data`) or the
+    query string (`args`): a dict with lat, lon, radius, limit, after
+    (decoded cursor), stream and amenities (from the categories), or an
+    error message for a 400 response.
+    Returns (params, error).
+    """
+    if method == 'POST':
+        data = data or {}
+        lat = data.get('lat')
+        lon = data.get('lon')
+        radius = data.get('radius', 5000)
+        limit = data.get('limit')
+        cursor = data.get('cursor')
+        stream = bool(data.get('stream'))
+        categories = data.get('category') or []
+        if isinstance(categories, str):
+            categories = categories.split(',')
+    else:
+        lat = args.get('lat', type=float)
+        lon = args.get('lon', type=float)
+        radius = args.get('radius', default=5000, type=int)
+        limit = args.get('limit', type=int)
+        cursor = args.get('cursor')
+        stream = args.get('stream', '').lower() in ('1', 'true', 'yes')
+        categories = [c for value in args.getlist('category') for c in value.split(',')]
+
+    # Validate inputs
+    if lat is None or lon is None:
+        return None, 'Missing required parameters: lat and lon'
+
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return None, 'Invalid coordinates'
+
+    if not (100 <= radius <= 50000):
+        return None, 'Radius must be between 100 and 50000 meters'
+
+    if limit is not None and not (isinstance(limit, int) and not isinstance(limit, bool) and limit >= 1):
+        return None, 'Limit must be a positive integer'
+
+    try:
+        amenities = amenities_for_categories([c.strip().lower() for c in categories if c.strip()])
+    except (KeyError, AttributeError):
+        return None, f'Category must be one of: {", ".join(CATEGORY_AMENITIES)}'
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, lat, lon, radius, amenities)
+        except InvalidCursor as e:
+            return None, str(e)
+
+    return {'lat': lat, 'lon': lon, 'radius': radius, 'limit': limit,
+            'after': after, 'stream': stream, 'amenities': amenities}, None
+
+def nearby_response(params, places, next_cursor):
+    """JSON body of a non-streaming /nearby response"""
+    response = {
+        'success': True,
+        'count': len(places),
+        'places': places,
+        'center': {'lat': params['lat'], 'lon': params['lon']}
+    }
+    if params['limit'] is not None or params['after'] is not None:
+        response['next_cursor'] = next_cursor
+    return response
+
+NDJSON_HEADERS = {'X-Accel-Buffering': 'no', 'Cache-Control': 'no-store'}
+
+
+def upstream_error(error):
+    """
+    JSON body and status for a /nearby request whose upstream call failed:
+    503 while the client sheds load (circuit open, no free slot), 502 for
+    errors and timeouts of the upstream itself.
+    Returns (body, status).
+    """
+    if isinstance(error, (CircuitOpenError, UpstreamBusyError)):
+        return {'error': f'Nearby search temporarily unavailable: {error}'}, 503
+    if isinstance(error, requests.exceptions.Timeout):
+        return {'error': f'Upstream query timed out: {error}'}, 502
+    return {'error': f'Upstream query failed: {error}'}, 502
+
+def format_geocode_results(results):
+    """Nominatim results as {name, lat, lon} dicts"""
+    locations = []
+    for result in results:
+        locations.append({
+            'name': result.get('display_name'),
+            'lat': float(result.get('lat')),
+            'lon': float(result.get('lon'))
+        })
+    return locations
+
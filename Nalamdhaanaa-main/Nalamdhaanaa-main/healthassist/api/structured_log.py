@@ -0,0 +1,172 @@
+# structured_log.py: one module, vendored as Chatbot/backend/structured_log.py and
+# healthassist/api/structured_log.py. The two APIs are deployed separately, each from
+# its own directory with its own requirements, so each carries a copy.
+# Keep the copies byte-identical: change both, then check with
+#   cmp Chatbot/backend/structured_log.py healthassist/api/structured_log.py
+import atexit
+import hashlib
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Records written per stream write; bounds the writer's latency under bursts
+WRITE_BATCH = 256
+
+
+def _timestamp(seconds):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{int(seconds % 1 * 1000):03d}Z"
+
+
+class StructuredLogger:
+    """
+    JSON-lines logger that never blocks the request thread.
+
+    `log()` puts the record on a bounded queue and returns; a background
+    thread encodes queued records and writes them to `stream` (stdout by
+    default, looked up at write time) in batches. When the queue is full,
+    because the log pipe is backed up, records are dropped and counted
+    instead of stalling requests.
+
+    `sample_rate` keeps that fraction of debug/info records; warnings and
+    errors are always kept. `input_fields()` describes user text according
+    to `inputs`: "hash" (length and a 64-bit BLAKE2b digest keyed with
+    `hash_key`, so repeats can be correlated without storing the text),
+    "redact" (length only) or "raw" (the text itself, for local debugging
+    only).
+
+    The writer thread is started lazily in each process (safe with pre-fork
+    servers); records still queued at exit are flushed for up to a second.
+    """
+
+    def __init__(self, service, level="info", sample_rate=1.0, inputs="hash",
+                 hash_key="", queue_size=10000, stream=None):
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {', '.join(LEVELS)}")
+        if inputs not in ("hash", "redact", "raw"):
+            raise ValueError("inputs must be 'hash', 'redact' or 'raw'")
+        self.service = service
+        self.level = level
+        self.sample_rate = sample_rate
+        self.inputs = inputs
+        self.queue_size = queue_size
+        self.stream = stream
+
+        self._threshold = LEVELS[level]
+        # BLAKE2b keys are at most 64 bytes, so the secret is hashed to 32
+        self._hash_key = hashlib.sha256(hash_key.encode("utf-8")).digest()
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._writer_pid = None
+
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.write_errors = 0
+
+        atexit.register(self.flush)
+
+    # --- request side -----------------------------------------------------
+
+    def log(self, level, event, **fields):
+        severity = LEVELS[level]
+        if severity < self._threshold:
+            return
+        if severity < LEVELS["warning"] and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return
+        if self._writer_pid != os.getpid():
+            self._start_writer()
+        try:
+            self._queue.put_nowait((time.time(), level, event, fields))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def debug(self, event, **fields):
+        self.log("debug", event, **fields)
+
+    def info(self, event, **fields):
+        self.log("info", event, **fields)
+
+    def warning(self, event, **fields):
+        self.log("warning", event, **fields)
+
+    def error(self, event, **fields):
+        self.log("error", event, **fields)
+
+    def input_fields(self, text, prefix="input"):
+        """Loggable description of user-supplied text, per the `inputs` mode"""
+        fields = {f"{prefix}_chars": len(text)}
+        if self.inputs == "hash":
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8, key=self._hash_key)
+            fields[f"{prefix}_hash"] = digest.hexdigest()
+        elif self.inputs == "raw":
+            fields[prefix] = text
+        return fields
+
+    # --- writer -----------------------------------------------------------
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            # After a fork the parent's queue belongs to its writer thread,
+            # which does not exist here
+            self._queue = queue.Queue(self.queue_size)
+            self._writer_pid = os.getpid()
+            threading.Thread(target=self._run, args=(self._queue,), name="structured-log", daemon=True).start()
+
+    def _encode(self, record):
+        created, level, event, fields = record
+        return json.dumps(
+            {"ts": _timestamp(created), "level": level, "service": self.service,
+             "event": event, "pid": self._writer_pid, **fields},
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+
+    def _run(self, records):
+        while True:
+            batch = [records.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(records.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = "".join(self._encode(record) + "\n" for record in batch)
+                stream = self.stream or sys.stdout
+                stream.write(lines)
+                stream.flush()
+                self.written += len(batch)
+            except Exception:
+                self.write_errors += len(batch)
+            finally:
+                for _ in batch:
+                    records.task_done()
+
+    def flush(self, timeout=1.0):
+        """Wait up to `timeout` seconds for queued records to be written"""
+        if self._writer_pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def stats(self):
+        return {
+            "level": self.level,
+            "sample_rate": self.sample_rate,
+            "inputs": self.inputs,
+            "queued": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "write_errors": self.write_errors
+        }
@@ -0,0 +1,248 @@
+# api/tile_cache.py
+"""
+Geohash tile cache for healthcare facility lookups.
+
+The map is divided into geohash cells of a fixed precision. Facilities are
+cached per (amenity, geohash cell), so any query (any center, any radius)
+is answered from the cells its circle overlaps, then filtered locally by
+distance (ranking.rank_places). Only cells not yet cached are fetched upstream, in a
+single bounding-box query.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+EARTH_RADIUS_M = 6371008.8
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat, lon, radius_m):
+    """(south, west, north, east) enclosing a circle, clamped to valid coordinates"""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    return (max(-90.0, lat - dlat), max(-180.0, lon - dlon),
+            min(90.0, lat + dlat), min(180.0, lon + dlon))
+
+
+class GeohashGrid:
+    """
+    Integer view of the geohash cells at one precision: cell (ix, iy) is
+    column ix (longitude) and row iy (latitude); `geohash()` interleaves
+    their bits into the standard base32 geohash string.
+    """
+
+    def __init__(self, precision):
+        bits = 5 * precision
+        self.precision = precision
+        self.lon_bits = (bits + 1) // 2
+        self.lat_bits = bits // 2
+        self.cols = 1 << self.lon_bits
+        self.rows = 1 << self.lat_bits
+        self.cell_lon = 360.0 / self.cols
+        self.cell_lat = 180.0 / self.rows
+
+    def cell(self, lat, lon):
+        ix = min(self.cols - 1, max(0, int((lon + 180.0) / self.cell_lon)))
+        iy = min(self.rows - 1, max(0, int((lat + 90.0) / self.cell_lat)))
+        return ix, iy
+
+    def cell_range(self, bbox):
+        """Inclusive (ix0, iy0, ix1, iy1) of the cells overlapping a bbox"""
+        south, west, north, east = bbox
+        ix0, iy0 = self.cell(south, west)
+        ix1, iy1 = self.cell(north, east)
+        return ix0, iy0, ix1, iy1
+
+    def cell_bbox(self, ix0, iy0, ix1=None, iy1=None):
+        """(south, west, north, east) of one cell or an inclusive block of cells"""
+        ix1 = ix0 if ix1 is None else ix1
+        iy1 = iy0 if iy1 is None else iy1
+        return (iy0 * self.cell_lat - 90.0, ix0 * self.cell_lon - 180.0,
+                (iy1 + 1) * self.cell_lat - 90.0, (ix1 + 1) * self.cell_lon - 180.0)
+
+    def geohash(self, ix, iy):
+        value = 0
+        lon_bit = self.lon_bits - 1
+        lat_bit = self.lat_bits - 1
+        for position in range(5 * self.precision):
+            if position % 2 == 0:
+                value = (value << 1) | ((ix >> lon_bit) & 1)
+                lon_bit -= 1
+            else:
+                value = (value << 1) | ((iy >> lat_bit) & 1)
+                lat_bit -= 1
+        return "".join(
+            _GEOHASH_ALPHABET[(value >> shift) & 31]
+            for shift in range(5 * (self.precision - 1), -1, -5)
+        )
+
+
+class TileCache:
+    """
+    LRU + TTL cache of facility lists per (amenity, geohash cell).
+
+    `fetch(bbox, amenities)` is called on a miss and must return
+    (amenity, place) pairs for every facility inside the bbox; each place
+    needs "lat" and "lon". The default precision 5 gives cells of about
+    4.9 x 4.9 km at the equator. `maxsize` bounds the number of cached
+    (amenity, cell) entries; `ttl` is in seconds (0 = no expiry).
+    """
+
+    def __init__(self, precision=5, ttl=3600, maxsize=50000):
+        self.grid = GeohashGrid(precision)
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.upstream_queries = 0
+
+    def _lookup(self, key, now):
+        """Cached places for a key or None; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        places, stored_at = entry
+        if self.ttl and now - stored_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return places
+
+    def _store(self, key, places, now):
+        """Caller holds the lock"""
+        self._entries[key] = (places, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def split(self, bbox, amenities):
+        """
+        Cached places for the cells overlapping `bbox` and the block of cells
+        still to fetch: (places, block), where block is (ix0, iy0, ix1, iy1)
+        spanning every miss, or None when all cells are cached. `places`
+        only covers cells outside the block.
+        """
+        grid = self.grid
+        ix0, iy0, ix1, iy1 = grid.cell_range(bbox)
+        now = time.monotonic()
+
+        cells = {}
+        missing = []
+        with self._lock:
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    cell_hash = grid.geohash(ix, iy)
+                    for amenity in amenities:
+                        places = self._lookup((amenity, cell_hash), now)
+                        if places is None:
+                            missing.append((ix, iy))
+                            self.misses += 1
+                        else:
+                            cells.setdefault((ix, iy), []).extend(places)
+                            self.hits += 1
+
+        if not missing:
+            return [place for places in cells.values() for place in places], None
+
+        block = (min(ix for ix, _ in missing), min(iy for _, iy in missing),
+                 max(ix for ix, _ in missing), max(iy for _, iy in missing))
+        found = [
+            place
+            for cell, places in cells.items() if not self.in_block(block, cell)
+            for place in places
+        ]
+        return found, block
+
+    def block_bbox(self, block):
+        return self.grid.cell_bbox(*block)
+
+    def in_block(self, block, cell):
+        ix, iy = cell
+        return block[0] <= ix <= block[2] and block[1] <= iy <= block[3]
+
+    def place_in_block(self, block, place):
+        return self.in_block(block, self.grid.cell(place["lat"], place["lon"]))
+
+    def store_block(self, block, amenities, fetched):
+        """
+        Cache the complete (amenity, place) list fetched for a block, one
+        entry per (amenity, cell). Returns the places of the requested
+        amenities inside the block.
+        """
+        grid = self.grid
+        wanted = frozenset(amenities)
+        by_key = {}
+        in_block = []
+        for amenity, place in fetched:
+            cell = grid.cell(place["lat"], place["lon"])
+            if self.in_block(block, cell):
+                by_key.setdefault((amenity, cell), []).append(place)
+                if amenity in wanted:
+                    in_block.append(place)
+
+        now = time.monotonic()
+        bx0, by0, bx1, by1 = block
+        with self._lock:
+            self.upstream_queries += 1
+            for ix in range(bx0, bx1 + 1):
+                for iy in range(by0, by1 + 1):
+                    cell_hash = grid.geohash(ix, iy)
+                    for amenity in amenities:
+                        self._store((amenity, cell_hash), by_key.get((amenity, (ix, iy)), []), now)
+        return in_block
+
+    def places_in_bbox(self, bbox, amenities, fetch):
+        """
+        Every cached or freshly fetched place of the given amenities in the
+        cells overlapping `bbox` (a superset of the bbox; filter by distance).
+        Raises whatever `fetch` raises; nothing is cached for a failed fetch.
+        """
+        found, block = self.split(bbox, amenities)
+        if block is None:
+            return found
+
+        # One upstream query for the block of cells spanning every miss
+        fetched = fetch(self.block_bbox(block), amenities)
+        found.extend(self.store_block(block, amenities, fetched))
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "precision": self.grid.precision,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "upstream_queries": self.upstream_queries
+            }
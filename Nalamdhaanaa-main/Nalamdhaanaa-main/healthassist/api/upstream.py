@@ -0,0 +1,340 @@
+# api/upstream.py
+"""
+Shared HTTP client layer for the upstream OSM services (Overpass, Nominatim).
+
+One UpstreamClient per service provides:
+  * a pooled requests.Session (keep-alive; no new TCP/TLS handshake per call)
+  * single-flight: identical concurrent requests share one upstream call
+  * a concurrency limit, with a bounded wait for a free slot
+  * an optional rate limit (Nominatim allows at most 1 request per second)
+  * retries with exponential backoff on connection errors, timeouts and
+    429/5xx answers (honouring Retry-After)
+  * a circuit breaker: after repeated failures calls fail fast for a while
+    instead of tying up workers on a dead upstream
+
+Every error raised is a requests RequestException, so callers keep their
+existing `except requests.exceptions.RequestException` handling. Limits
+are per process; under gunicorn they apply to each worker separately.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "HealthcareLocator/1.0"
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def _is_client_error(error):
+    response = getattr(error, "response", None)
+    return response is not None and 400 <= response.status_code < 500 and response.status_code != 429
+
+
+class UpstreamBusyError(requests.exceptions.RequestException):
+    """No free concurrency slot within the wait limit"""
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """The upstream failed repeatedly; calls are rejected until it cools down"""
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart (thread-safe)"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CircuitBreaker:
+    """
+    Closed: calls pass. After `failure_threshold` consecutive failures it
+    opens and rejects calls for `reset_timeout` seconds, then lets a single
+    trial call through (half-open); its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Give back a half-open trial slot that was not used for a call"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class UpstreamClient:
+    """
+    Client for one upstream service; see the module docstring.
+
+    `request_json()` returns the decoded JSON body. Results shared through
+    single-flight are the same object for every caller: treat them as
+    read-only.
+    """
+
+    def __init__(self, name, max_concurrency=4, rate_per_second=None, retries=2,
+                 backoff=0.5, max_backoff=8.0, queue_timeout=10.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_timeout = queue_timeout
+
+        self.rate_limiter = RateLimiter(rate_per_second) if rate_per_second else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._flight = SingleFlight()
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+        self._counter_lock = threading.Lock()
+        self.calls = 0
+        self.upstream_requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.rejected_open = 0
+        self.rejected_busy = 0
+        self.in_flight = 0
+
+    def _get_session(self):
+        # Created lazily per process: a pool inherited across fork would share sockets
+        if self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers["User-Agent"] = USER_AGENT
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _count(self, name, delta=1):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def request_json(self, method, url, params=None, data=None, timeout=30):
+        """Perform (or join an identical in-flight) request and return its JSON body"""
+        self._count("calls")
+        key = (method, url, tuple(sorted((params or {}).items())), data)
+        return self._flight.do(key, lambda: self._call(method, url, params, data, timeout))
+
+    def _call(self, method, url, params, data, timeout):
+        self._acquire()
+        try:
+            body = self._send(method, url, params, data, timeout).json()
+        except requests.exceptions.RequestException as e:
+            self._record_failure(e)
+            raise
+        finally:
+            self._release()
+
+        self.breaker.record_success()
+        return body
+
+    @contextmanager
+    def stream(self, method, url, params=None, data=None, timeout=30):
+        """
+        Streaming request: yields the response with its body not yet read
+        (use iter_content). Not coalesced, and retried only until the body
+        starts; the concurrency slot is held until the block exits.
+        """
+        self._count("calls")
+        self._acquire()
+        response = None
+        try:
+            response = self._send(method, url, params, data, timeout, stream=True)
+            yield response
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self._record_failure(e)
+            raise
+        except BaseException:
+            self.breaker.release_trial()  # consumer stopped early (e.g. client went away)
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            if response is not None:
+                response.close()
+            self._release()
+
+    def _acquire(self):
+        """Pass the circuit breaker and take a concurrency slot, or raise"""
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise CircuitOpenError(f"{self.name}: circuit open after repeated failures")
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected_busy")
+            self.breaker.release_trial()  # not the upstream's fault
+            raise UpstreamBusyError(f"{self.name}: no free connection slot within {self.queue_timeout}s")
+        self._count("in_flight")
+
+    def _release(self):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _record_failure(self, error):
+        self._count("failures")
+        if _is_client_error(error):
+            self.breaker.record_success()  # the upstream answered; the request was bad
+        else:
+            self.breaker.record_failure()
+
+    def _send(self, method, url, params, data, timeout, stream=False):
+        """Send with retries; returns a successful (2xx/3xx) response"""
+        session = self._get_session()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
+            self._count("upstream_requests")
+
+            retry_after = None
+            try:
+                response = session.request(method, url, params=params, data=data,
+                                           timeout=timeout, stream=stream)
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        response.close()
+                    response.raise_for_status()
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                error = requests.exceptions.HTTPError(
+                    f"{self.name}: HTTP {response.status_code}", response=response
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            if attempt >= self.retries:
+                raise error
+            attempt += 1
+            self._count("retried")
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            if retry_after is not None and retry_after.isdigit():
+                delay = min(self.max_backoff, max(delay, float(retry_after)))
+            time.sleep(delay)
+
+    def stats(self):
+        with self._counter_lock:
+            counters = {
+                "calls": self.calls,
+                "upstream_requests": self.upstream_requests,
+                "shared_in_flight": self._flight.shared,
+                "retried": self.retried,
+                "failures": self.failures,
+                "rejected_circuit_open": self.rejected_open,
+                "rejected_busy": self.rejected_busy,
+                "in_flight": self.in_flight,
+            }
+        return {
+            "name": self.name,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": (1.0 / self.rate_limiter.interval) if self.rate_limiter else None,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            **counters
+        }
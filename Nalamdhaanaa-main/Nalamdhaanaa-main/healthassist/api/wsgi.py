@@ -0,0 +1,5 @@
+# api/wsgi.py
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+from app import app
+
+__all__ = ["app"]
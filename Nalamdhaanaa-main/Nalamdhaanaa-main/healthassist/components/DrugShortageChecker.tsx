@@ -46,29 +46,17 @@ const DrugShortageChecker: React.FC = () => {
     setError("");
 
     try {
-      const drugInfo = drugs.find(
-        (d) => d.name.toLowerCase() === inputValue.toLowerCase()
-      );
+      const prediction = await predictDrugShortage({ drugName: inputValue.trim() });
 
-      if (!drugInfo) {
-        setError(
-          `Drug "${inputValue}" not found in our database. Please check the spelling or try a different drug.`
-        );
+      if (!prediction.found) {
+        const hint = prediction.suggestions?.length
+          ? ` Did you mean ${prediction.suggestions.join(", ")}?`
+          : " Please check the spelling or try a different drug.";
+        setError(`Drug "${inputValue}" not found in our database.${hint}`);
         setResult(null);
         return;
       }
 
-      const input = {
-        drugName: drugInfo.name,
-        riskFactors: drugInfo.risk_factors,
-        alternatives: drugInfo.alternatives.map((alt) => ({
-          name: alt.name,
-          price: alt.price,
-          availability: alt.availability,
-        })),
-      };
-
-      const prediction = await predictDrugShortage(input);
       setResult(prediction);
       setInputValue("");
     } catch (err) {
@@ -12,6 +12,7 @@ import {
   Clock,
 } from "lucide-react";
 import "leaflet/dist/leaflet.css";
+import { streamNearbyPlaces } from "../services/nearbyStreamService";
 
 interface HealthcarePlace {
   id: number;
@@ -23,6 +24,7 @@ interface HealthcarePlace {
   phone?: string;
   website?: string;
   opening_hours?: string;
+  distance?: number;
 }
 
 interface UserLocation {
@@ -178,33 +180,29 @@ export const NearbyHealthcareLocator: React.FC = () => {
     setError(null);
 
     try {
-      const response = await fetch(`${API_BASE_URL}/nearby`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          lat,
-          lon,
-          radius: searchRadius,
-        }),
-      });
+      // Draw markers as the server finds them instead of waiting for all
+      let received: HealthcarePlace[] = [];
+      setPlaces([]);
+      const result = await streamNearbyPlaces<HealthcarePlace>(
+        API_BASE_URL,
+        { lat, lon, radius: searchRadius },
+        (batch) => {
+          received = received.concat(batch);
+          setPlaces(received);
+        }
+      );
 
-      if (!response.ok) {
-        throw new Error("Failed to fetch nearby places");
+      if (!result.sorted) {
+        setPlaces(
+          [...received].sort(
+            (a, b) => (a.distance ?? 0) - (b.distance ?? 0)
+          )
+        );
       }
-
-      const data = await response.json();
-
-      if (data.success) {
-        setPlaces(data.places);
-        if (data.places.length === 0) {
-          setError(
-            "No healthcare facilities found nearby. Try increasing the search radius."
-          );
-        }
-      } else {
-        setError(data.error || "Failed to fetch places");
+      if (result.count === 0) {
+        setError(
+          "No healthcare facilities found nearby. Try increasing the search radius."
+        );
       }
     } catch (err) {
       // Fallback to mock data if API is not available
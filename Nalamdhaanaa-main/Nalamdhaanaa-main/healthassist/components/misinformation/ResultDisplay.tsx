@@ -93,17 +93,24 @@ export const ResultDisplay: React.FC<ResultDisplayProps> = ({ result }) => {
             <p className="text-lg text-gray-900 font-medium">
               "{result.matched_claim}"
             </p>
-            <div className="mt-3">
-              <div className="flex justify-between mb-1">
-                <span className="text-base font-medium text-primary-700">
-                  Similarity Score
-                </span>
-                <span className="text-sm font-medium text-primary-700">
-                  {result.similarity_score.toFixed(1)}%
-                </span>
+            {result.match_source === "keyword_fallback" ? (
+              <p className="mt-3 text-sm text-gray-500">
+                Matched by offline keyword rules because the claim matcher is
+                unavailable; no similarity score was computed.
+              </p>
+            ) : (
+              <div className="mt-3">
+                <div className="flex justify-between mb-1">
+                  <span className="text-base font-medium text-primary-700">
+                    Similarity Score
+                  </span>
+                  <span className="text-sm font-medium text-primary-700">
+                    {result.similarity_score.toFixed(1)}%
+                  </span>
+                </div>
+                <ScoreBar score={result.similarity_score} />
               </div>
-              <ScoreBar score={result.similarity_score} />
-            </div>
+            )}
           </div>
         )}
 
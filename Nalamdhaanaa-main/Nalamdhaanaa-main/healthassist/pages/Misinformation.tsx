@@ -25,7 +25,11 @@ const Misinformation: React.FC = () => {
       const response = await checkMedicalClaim(claimText);
       setResult(response);
     } catch (err) {
-      setError("An error occurred while checking the claim. Please try again.");
+      setError(
+        err instanceof Error && err.message
+          ? `Could not check the claim: ${err.message}`
+          : "An error occurred while checking the claim. Please try again."
+      );
       console.error(err);
     } finally {
       setIsLoading(false);
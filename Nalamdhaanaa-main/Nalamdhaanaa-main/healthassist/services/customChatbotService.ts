@@ -5,14 +5,55 @@ const CUSTOM_CHATBOT_API_URL = "http://localhost:5000/api/predict-symptoms";
 export interface SymptomPrediction {
   condition: string;
   confidence: number;
+  confidence_percentage: string;
   specialty: string;
+  reliability: "Low" | "Moderate" | "High";
+  needs_followup_questions: boolean;
+}
+
+export interface EmergencySeverity {
+  esi_level: number;
+  severity: string;
+  action: string;
+  wait_time: string;
+  warning: string | null;
+  color_code: string;
 }
 
 export interface CustomChatbotResponse {
-  input: string;
+  timestamp: string;
+  user_input: string;
+  emergency_severity: EmergencySeverity;
   predictions: SymptomPrediction[];
+  disclaimer: string;
+  model_info: {
+    accuracy: number | string;
+    training_date: string;
+  };
+  model_version: string;
+  session_id?: string;
+  turns?: number;
+  new_session?: boolean;
 }
 
+// One backend session per conversation, so predictions take every symptom
+// described so far into account. A new conversation (empty history) starts
+// a new session. The messages already sent in the session go along as
+// `history`: session state lives in one backend worker, and the next
+// message may reach another one, which rebuilds the session from them.
+const MAX_SESSION_HISTORY = 50;
+
+let sessionId: string | null = null;
+let sessionMessages: string[] = [];
+
+const conversationSessionId = (chatHistory: ChatMessage[]): string => {
+  if (sessionId === null || chatHistory.length === 0) {
+    sessionId = crypto.randomUUID();
+    sessionMessages = [];
+  }
+  return sessionId;
+};
+
 export const getCustomChatbotResponse = async (
   chatHistory: ChatMessage[],
   newUserMessage: string
@@ -25,6 +66,8 @@ export const getCustomChatbotResponse = async (
       },
       body: JSON.stringify({
         symptoms: newUserMessage,
+        session_id: conversationSessionId(chatHistory),
+        history: sessionMessages,
       }),
     });
 
@@ -33,20 +76,39 @@ export const getCustomChatbotResponse = async (
     }
 
     const data: CustomChatbotResponse = await response.json();
+    sessionMessages = [...sessionMessages, newUserMessage].slice(
+      -MAX_SESSION_HISTORY
+    );
 
     // Format the response in a user-friendly way
-    let formattedResponse = `Based on your symptoms: "${data.input}"\n\n`;
+    let formattedResponse =
+      data.turns && data.turns > 1
+        ? `Based on the ${data.turns} symptom descriptions in this conversation, most recently: "${data.user_input}"\n\n`
+        : `Based on your symptoms: "${data.user_input}"\n\n`;
+
+    const severity = data.emergency_severity;
+    if (severity.esi_level <= 3) {
+      formattedResponse += `**${severity.severity}:** ${severity.action}\n`;
+      if (severity.warning) {
+        formattedResponse += `${severity.warning}\n`;
+      }
+      formattedResponse += "\n";
+    }
     formattedResponse +=
       "Here are the possible conditions I've identified:\n\n";
 
     data.predictions.forEach((prediction, index) => {
-      const confidencePercentage = (prediction.confidence * 100).toFixed(1);
       formattedResponse += `${index + 1}. **${
         prediction.condition
-      }** (${confidencePercentage}% confidence)\n`;
+      }** (${prediction.confidence_percentage} confidence, ${prediction.reliability.toLowerCase()} reliability)\n`;
       formattedResponse += `   Recommended specialist: ${prediction.specialty}\n\n`;
     });
 
+    if (data.predictions[0]?.needs_followup_questions) {
+      formattedResponse +=
+        "The prediction is uncertain. Describing more symptoms (how long, where, how severe) will help narrow it down.\n\n";
+    }
+
     formattedResponse += "**General Recommendations:**\n";
     formattedResponse += "• Monitor your symptoms and note any changes\n";
     formattedResponse += "• Stay hydrated and get adequate rest\n";
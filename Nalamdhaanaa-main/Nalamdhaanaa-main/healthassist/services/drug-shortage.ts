@@ -1,16 +1,80 @@
-import { DrugShortageInput, DrugShortageOutput } from "../types/drug-shortage";
+import {
+  DrugShortageBatchOutput,
+  DrugShortageInput,
+  DrugShortageOutput,
+} from "../types/drug-shortage";
 import { drugs } from "../lib/drugs";
 
-// Mock AI prediction service - in a real app, this would call an AI API
+// Indexed catalogue served by the healthcare API (api/app.py, /drugs/*):
+// exact, generic-name and typo-tolerant lookup, batch lookup of a
+// prescription. Without the API the bundled catalogue answers exact names.
+const DRUG_API_URL = "http://localhost:8000/drugs";
+
+const drugsByName = new Map(drugs.map((d) => [d.name.toLowerCase(), d]));
+
+// The API returns the shortage date as YYYY-MM-DD
+function withLocalDate(output: DrugShortageOutput): DrugShortageOutput {
+  if (!output.estimatedShortageDate) return output;
+  const [year, month, day] = output.estimatedShortageDate.split("-").map(Number);
+  return {
+    ...output,
+    estimatedShortageDate: new Date(year, month - 1, day).toLocaleDateString(),
+  };
+}
+
 export async function predictDrugShortage(
   input: DrugShortageInput
 ): Promise<DrugShortageOutput> {
-  // Simulate API delay
-  await new Promise((resolve) => setTimeout(resolve, 1000));
+  try {
+    const response = await fetch(
+      `${DRUG_API_URL}/shortage?name=${encodeURIComponent(input.drugName)}`
+    );
+    if (response.ok) {
+      return withLocalDate(await response.json());
+    }
+  } catch {
+    // API not running: fall back to the bundled catalogue
+  }
+  return predictLocally(input);
+}
+
+export async function predictPrescriptionShortages(
+  drugNames: string[]
+): Promise<DrugShortageBatchOutput> {
+  try {
+    const response = await fetch(`${DRUG_API_URL}/shortage/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ drugs: drugNames }),
+    });
+    if (response.ok) {
+      const batch: DrugShortageBatchOutput = await response.json();
+      return { ...batch, results: batch.results.map(withLocalDate) };
+    }
+  } catch {
+    // API not running: fall back to the bundled catalogue
+  }
+  const results = drugNames.map((drugName) => predictLocally({ drugName }));
+  const found = results.filter((r) => r.found);
+  return {
+    count: results.length,
+    results,
+    summary: {
+      found: found.length,
+      not_found: results.length - found.length,
+      high_risk: [
+        ...new Set(
+          found
+            .filter((r) => r.shortageRisk.level === "HIGH")
+            .map((r) => r.drugName)
+        ),
+      ].sort(),
+    },
+  };
+}
 
-  const drugInfo = drugs.find(
-    (d) => d.name.toLowerCase() === input.drugName.toLowerCase()
-  );
+function predictLocally(input: DrugShortageInput): DrugShortageOutput {
+  const drugInfo = drugsByName.get(input.drugName.trim().toLowerCase());
 
   if (!drugInfo) {
     return {
@@ -54,14 +118,15 @@ export async function predictDrugShortage(
   const shortageDate = new Date();
   shortageDate.setDate(shortageDate.getDate() + daysUntilShortage);
 
-  const cheapestAlt = drugInfo.alternatives.reduce((prev, curr) =>
-    prev.price < curr.price ? prev : curr
-  );
+  const cheapestAlt = drugInfo.alternatives.length
+    ? drugInfo.alternatives.reduce((prev, curr) =>
+        prev.price < curr.price ? prev : curr
+      )
+    : undefined;
 
-  const monthlySavings = Math.max(
-    0,
-    (drugInfo.average_price - cheapestAlt.price) * 30
-  );
+  const monthlySavings = cheapestAlt
+    ? Math.max(0, (drugInfo.average_price - cheapestAlt.price) * 30)
+    : 0;
 
   return {
     found: true,
@@ -79,7 +144,7 @@ export async function predictDrugShortage(
     estimatedShortageDate: shortageDate.toLocaleDateString(),
     pricing: {
       currentPrice: `₹${drugInfo.average_price}`,
-      cheapestAlternative: cheapestAlt.name,
+      cheapestAlternative: cheapestAlt?.name ?? "",
       monthlySavings: `₹${monthlySavings.toFixed(0)}`,
     },
     alternatives: drugInfo.alternatives,
@@ -1,6 +1,12 @@
 import type { FactCheckResponse } from "../types";
 import { Verdict } from "../types";
 
+// Claim matcher of the custom chatbot backend (Chatbot/backend/app.py):
+// TF-IDF similarity against fact_checks.json. When the backend cannot be
+// reached, the keyword rules below answer the claims they know; errors the
+// backend returns are reported as errors.
+const CLAIM_CHECK_API_URL = "http://localhost:5000/api/claims/check";
+
 const MOCK_DB: Record<string, FactCheckResponse> = {
   "5G_FALSE": {
     user_claim: "5G towers spread coronavirus",
@@ -156,56 +162,78 @@ const MOCK_DB: Record<string, FactCheckResponse> = {
 export const checkMedicalClaim = async (
   claim: string
 ): Promise<FactCheckResponse> => {
-  console.log("Checking claim:", claim);
-
-  // Simulate network delay
-  await new Promise((resolve) => setTimeout(resolve, 1500));
+  let response: Response;
+  try {
+    response = await fetch(CLAIM_CHECK_API_URL, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ claim }),
+    });
+  } catch {
+    // Backend not reachable: fall back to the keyword rules
+    return matchLocally(claim);
+  }
+  if (!response.ok) {
+    const body = await response.json().catch(() => null);
+    throw new Error(
+      body?.error ?? `Claim check failed with HTTP status ${response.status}`
+    );
+  }
+  const result: FactCheckResponse = await response.json();
+  return { ...result, match_source: "matcher" };
+};
 
+const matchLocally = (claim: string): FactCheckResponse => {
   const lowerCaseClaim = claim.toLowerCase();
+  const local = (key: string): FactCheckResponse => ({
+    ...MOCK_DB[key],
+    user_claim: claim,
+    match_source: "keyword_fallback",
+  });
 
   if (lowerCaseClaim.includes("5g")) {
-    return { ...MOCK_DB["5G_FALSE"], user_claim: claim };
+    return local("5G_FALSE");
   }
   if (lowerCaseClaim.includes("wash") && lowerCaseClaim.includes("hand")) {
-    return { ...MOCK_DB["HANDWASHING_TRUE"], user_claim: claim };
+    return local("HANDWASHING_TRUE");
   }
   if (lowerCaseClaim.includes("ivermectin")) {
-    return { ...MOCK_DB["IVERMECTIN_MISLEADING"], user_claim: claim };
+    return local("IVERMECTIN_MISLEADING");
   }
   if (lowerCaseClaim.includes("vaccine") && lowerCaseClaim.includes("autism")) {
-    return { ...MOCK_DB["VACCINE_AUTISM_FALSE"], user_claim: claim };
+    return local("VACCINE_AUTISM_FALSE");
   }
   if (
     lowerCaseClaim.includes("alkaline") &&
     lowerCaseClaim.includes("cancer")
   ) {
-    return { ...MOCK_DB["ALKALINE_DIET_FALSE"], user_claim: claim };
+    return local("ALKALINE_DIET_FALSE");
   }
   if (
     lowerCaseClaim.includes("vitamin c") &&
     (lowerCaseClaim.includes("cold") || lowerCaseClaim.includes("prevent"))
   ) {
-    return { ...MOCK_DB["VITAMIN_C_MISLEADING"], user_claim: claim };
+    return local("VITAMIN_C_MISLEADING");
   }
   if (
     lowerCaseClaim.includes("sunscreen") &&
     lowerCaseClaim.includes("cancer")
   ) {
-    return { ...MOCK_DB["SUNSCREEN_TRUE"], user_claim: claim };
+    return local("SUNSCREEN_TRUE");
   }
   if (
     lowerCaseClaim.includes("detox") &&
     (lowerCaseClaim.includes("tea") || lowerCaseClaim.includes("cleanse"))
   ) {
-    return { ...MOCK_DB["DETOX_TEA_FALSE"], user_claim: claim };
+    return local("DETOX_TEA_FALSE");
   }
   if (
     lowerCaseClaim.includes("microwave") &&
     (lowerCaseClaim.includes("nutrient") || lowerCaseClaim.includes("kill"))
   ) {
-    return { ...MOCK_DB["MICROWAVE_NUTRIENTS_FALSE"], user_claim: claim };
+    return local("MICROWAVE_NUTRIENTS_FALSE");
   }
 
   // Return "UNVERIFIED" if no match is found
-  return { ...MOCK_DB["UNVERIFIED"], user_claim: claim };
+  return local("UNVERIFIED");
 };
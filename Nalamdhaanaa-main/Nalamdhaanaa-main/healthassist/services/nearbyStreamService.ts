@@ -0,0 +1,81 @@
+export interface NearbyStreamOptions {
+  lat: number;
+  lon: number;
+  radius: number;
+  limit?: number;
+  cursor?: string;
+  category?: string[];
+  signal?: AbortSignal;
+}
+
+export interface NearbyStreamResult {
+  count: number;
+  nextCursor: string | null;
+  sorted: boolean;
+}
+
+/**
+ * Streams /nearby results (NDJSON) from the healthcare locator API.
+ * `onPlaces` is called with each batch of places as it arrives, so markers
+ * can be drawn before the whole result is in.
+ */
+export const streamNearbyPlaces = async <T>(
+  baseUrl: string,
+  options: NearbyStreamOptions,
+  onPlaces: (places: T[]) => void
+): Promise<NearbyStreamResult> => {
+  const { signal, ...query } = options;
+  const response = await fetch(`${baseUrl}/nearby`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ ...query, stream: true }),
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result: NearbyStreamResult | null = null;
+
+  const handleLines = (lines: string[]) => {
+    const batch: T[] = [];
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const record = JSON.parse(line);
+      if (record.type === "place") {
+        const { type, ...place } = record;
+        batch.push(place as T);
+      } else if (record.type === "end") {
+        result = {
+          count: record.count,
+          nextCursor: record.next_cursor ?? null,
+          sorted: record.sorted,
+        };
+      } else if (record.type === "error") {
+        throw new Error(record.error);
+      }
+    }
+    if (batch.length > 0) onPlaces(batch);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+    handleLines(lines);
+  }
+  handleLines([buffer + decoder.decode()]);
+
+  if (!result) {
+    throw new Error("Nearby stream ended unexpectedly");
+  }
+  return result;
+};
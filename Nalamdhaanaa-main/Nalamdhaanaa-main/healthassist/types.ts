@@ -106,4 +106,10 @@ export interface FactCheckResponse {
   evidence_score: number;
   recommendation: string;
   date_fact_checked: string | null;
+  // Best matching fact checks, best first (claim matcher API only)
+  matches?: FactCheckResponse[];
+  // "matcher" for claim matcher API results; "keyword_fallback" when the
+  // backend was unreachable and the offline keyword rules answered (their
+  // similarity_score is not a measured similarity)
+  match_source?: "matcher" | "keyword_fallback";
 }
@@ -1,7 +1,7 @@
 export interface DrugShortageInput {
   drugName: string;
-  riskFactors: string[];
-  alternatives: Array<{
+  riskFactors?: string[];
+  alternatives?: Array<{
     name: string;
     price: number;
     availability: string;
@@ -38,4 +38,22 @@ export interface DrugShortageOutput {
     action: string;
     details: string;
   }>;
+  // Set by the drug API (api/app.py): how the query matched a catalogue entry
+  query?: string;
+  match?: {
+    type: "name" | "generic" | "fuzzy";
+    score: number;
+  };
+  // Close catalogue names when nothing matched
+  suggestions?: string[];
+}
+
+export interface DrugShortageBatchOutput {
+  count: number;
+  results: DrugShortageOutput[];
+  summary: {
+    found: number;
+    not_found: number;
+    high_risk: string[];
+  };
 }